@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import BrokenExecutor, Future, as_completed
 from pathlib import Path
 
 import click
@@ -10,7 +12,31 @@ from .models.article import Article
 from .models.user import User
 from .models.db import db
 from .services import articles as article_service
-from .services import news_feed, risk
+from .services import (
+    canonical_url,
+    fetch_metrics,
+    ingest_bench,
+    jobs,
+    news_feed,
+    parse_cache,
+    parse_pool,
+    parser_bench,
+    pipeline,
+    parsing,
+    raw_store,
+    risk,
+    scraping,
+    sources,
+    synthetic_origin,
+)
+
+
+def _format_parse_paths() -> str:
+    paths = parsing.path_stats()
+    return "parse paths: json-ld fast={fast} dom={slow} (fast {ratio:.0%})".format(
+        fast=paths["fast"], slow=paths["slow"], ratio=paths["fast_ratio"]
+    )
+
 
 def register_cli_commands(app: Flask) -> None:
     """Flask CLIに便利コマンドを登録。"""
@@ -55,7 +81,36 @@ def register_cli_commands(app: Flask) -> None:
         type=click.Choice(["yahoo", "nifty"]),
         help="対象ニュースプロバイダ（複数指定可）。省略時は有効な全プロバイダ。",
     )
-    def scrape_feed(limit: int, force: bool, skip_ai: bool, force_ai: bool, providers: tuple[str, ...]) -> None:
+    @click.option(
+        "--concurrency",
+        type=click.IntRange(min=1),
+        default=None,
+        help="同時取得数の上限。省略時は SCRAPE_MAX_IN_FLIGHT。",
+    )
+    @click.option(
+        "--parse-workers",
+        type=click.IntRange(min=0),
+        default=None,
+        help="パースを行うワーカープロセス数（0でその場でパース）。省略時は PARSE_WORKERS。",
+    )
+    @click.option(
+        "--pipeline",
+        "use_pipeline",
+        is_flag=True,
+        help="取得・パース・保存・AIを段ごとに並行させるパイプラインで取り込みます。",
+    )
+    @click.option("--timings", is_flag=True, help="終了時にホスト別の取得フェーズ計測を表示します。")
+    def scrape_feed(
+        limit: int,
+        force: bool,
+        skip_ai: bool,
+        force_ai: bool,
+        providers: tuple[str, ...],
+        concurrency: int | None,
+        parse_workers: int | None,
+        use_pipeline: bool,
+        timings: bool,
+    ) -> None:
         """最新RSSをまとめて取り込み。"""
 
         if limit <= 0:
@@ -63,43 +118,461 @@ def register_cli_commands(app: Flask) -> None:
 
         with app.app_context():
             target_providers = providers or news_feed.enabled_providers()
-            stats = {"created": 0, "updated": 0, "cached": 0, "errors": 0}
-            for provider in target_providers:
+            stats = {"created": 0, "updated": 0, "unchanged": 0, "cached": 0, "not_modified": 0, "errors": 0}
+            parsing.reset_path_stats()
+            sources.reset_timings()
+            parse_cache.reset_stats()
+            scraping.reset_stream_stats()
+
+            workers = parse_pool.configured_workers() if parse_workers is None else parse_workers
+
+            pipeline_stats: list[str] = []
+
+            def _report(item, error, status=None, ai_error=None) -> None:
+                if error is not None:
+                    stats["errors"] += 1
+                    click.echo(f"[ERROR] {item.url} - {error}", err=True)
+                    return
+
+                stats[status] += 1
+                published = article_service.format_timestamp(item.published_at)
+                click.echo(
+                    f"[{status.upper():12}] {item.title} "
+                    f"({published or '日時不明'})"
+                )
+
+                if ai_error:
+                    click.echo(f"    ↳ AI: {ai_error}", err=True)
+
+            def _latest_items(provider):
                 items = news_feed.fetch_latest_articles(limit=limit, provider=provider)
                 if not items:
                     click.echo(f"{news_feed.provider_label(provider)} のRSSを取得できませんでした。")
-                    continue
+                return items
+
+            if use_pipeline:
+                # 全プロバイダ分を先に投入し、結果はプロバイダごとに表示する
+                with pipeline.IngestPipeline(app, max_in_flight=concurrency, pool_workers=workers) as ingest:
+                    groups = []
+                    for provider in target_providers:
+                        items = _latest_items(provider)
+                        if not items:
+                            continue
+                        submitted = []
+                        seen: set[str] = set()
+                        for item in items:
+                            if item.url in seen:
+                                continue
+                            seen.add(item.url)
+                            try:
+                                job = ingest.submit(item.url, force=force, run_ai=not skip_ai, force_ai=force_ai)
+                            except article_service.ArticleIngestionError as exc:
+                                job = exc
+                            submitted.append((item, job))
+                        groups.append((provider, items, submitted))
+
+                    for provider, items, submitted in groups:
+                        click.echo(f"=== {news_feed.provider_label(provider)} ({len(items)} 件) ===")
+                        for item, job in submitted:
+                            if isinstance(job, article_service.ArticleIngestionError):
+                                _report(item, job)
+                                continue
+                            job.wait()
+                            _report(item, job.error, job.status, job.ai_error)
+                pipeline_stats = ingest.format_stats()
+            else:
+                for provider in target_providers:
+                    items = _latest_items(provider)
+                    if not items:
+                        continue
+
+                    click.echo(f"=== {news_feed.provider_label(provider)} ({len(items)} 件) ===")
+
+                    # 記事 URL はトラッキング用クエリ等を除いた形で保存・比較する
+                    by_url: dict[str, news_feed.NewsFeedItem] = {}
+                    for item in items:
+                        by_url.setdefault(canonical_url.canonicalize(item.url), item)
 
-                click.echo(f"=== {news_feed.provider_label(provider)} ({len(items)} 件) ===")
+                    existing = {
+                        row.url: (row.etag, row.last_modified)
+                        for row in db.session.execute(
+                            select(Article.url, Article.etag, Article.last_modified).where(
+                                Article.url.in_(list(by_url))
+                            )
+                        )
+                    }
+
+                    to_fetch = {url: item for url, item in by_url.items() if url not in existing or force}
+
+                    # 取得は並行で行い、パースワーカーがあれば完了したものから本文をプールへ渡す。
+                    # 保存は最後に ingest_many でまとめて行う
+                    responses = {}
+                    parsed_results = {}
+                    failed: set[str] = set()
+                    parsing_jobs: dict[Future, str] = {}
+
+                    def _collect_parsed(job: Future) -> None:
+                        url = parsing_jobs.pop(job)
+                        try:
+                            parsed_results[url] = job.result()
+                        except (parsing.ParseError, BrokenExecutor):
+                            # ingest_many がその場でパースし直し、エラーもそちらで扱う
+                            pass
+
+                    # ストリーミング解析では取得スレッドで木を組み立てるので、パースワーカーには渡さない
+                    streams = {}
+                    for url in to_fetch:
+                        source = article_service.source_for(url)
+                        stream = article_service.stream_for(source) if source else None
+                        if stream is not None:
+                            streams[url] = stream
+
+                    fetched_results = scraping.fetch_many(
+                        to_fetch,
+                        max_in_flight=concurrency,
+                        validators={url: existing[url] for url in to_fetch if url in existing},
+                        streams=streams,
+                    )
+                    for fetched in fetched_results:
+                        item = to_fetch[fetched.url]
+                        if not fetched.ok:
+                            failed.add(fetched.url)
+                            stats["errors"] += 1
+                            click.echo(f"[ERROR] {item.url} - {fetched.error}", err=True)
+                            continue
+                        responses[fetched.url] = fetched.response
+                        stream = streams.get(fetched.url)
+                        if (stream is not None and stream.bytes_fed) or scraping.is_not_modified(fetched.response):
+                            continue
+                        source = article_service.source_for(item.url)
+                        job = parse_pool.submit(source, fetched.response, workers=workers) if source else None
+                        if job is not None:
+                            parsing_jobs[job] = fetched.url
+                        for done in [job for job in parsing_jobs if job.done()]:
+                            _collect_parsed(done)
+
+                    for done in as_completed(list(parsing_jobs)):
+                        _collect_parsed(done)
+
+                    outcomes = article_service.ingest_many(
+                        [url for url in by_url if url not in failed],
+                        force=force,
+                        run_ai=not skip_ai,
+                        force_ai=force_ai,
+                        responses=responses,
+                        parsed=parsed_results,
+                        streams=streams,
+                    )
+                    for outcome in outcomes:
+                        result = outcome.result
+                        if result is None:
+                            _report(by_url[outcome.url], outcome.error)
+                        else:
+                            _report(by_url[outcome.url], None, result.status, result.ai_error)
 
-                for item in items:
+            click.echo(
+                "created={created} updated={updated} unchanged={unchanged} "
+                "cached={cached} not_modified={not_modified} errors={errors}".format(**stats)
+            )
+
+            if timings:
+                for line in fetch_metrics.format_summary():
+                    click.echo(line)
+                click.echo(_format_parse_paths())
+                click.echo(parse_cache.format_stats())
+                for line in sources.format_timings():
+                    click.echo(line)
+                for line in pipeline_stats:
+                    click.echo(line)
+                streamed = scraping.stream_stats()
+                if streamed["streamed"]:
+                    click.echo(
+                        "stream parse: {streamed} docs, stopped early {stopped}"
+                        " (read {bytes_read} bytes, skipped {bytes_skipped} bytes)".format(**streamed)
+                    )
+            parse_pool.shutdown()
+
+    @app.cli.command("reparse")
+    @click.option("--url", "urls", multiple=True, help="対象URL（複数指定可）。省略時はストア内の全件。")
+    @click.option("--limit", default=0, type=click.IntRange(min=0), help="処理件数の上限（0で無制限）。")
+    def reparse(urls: tuple[str, ...], limit: int) -> None:
+        """生HTMLストアから記事を再解析して保存（ネットワーク不使用）。"""
+
+        with app.app_context():
+            if urls:
+                targets = [(url, raw_store.get(url)) for url in urls]
+            else:
+                targets = [(entry.url, entry) for entry in raw_store.iter_entries()]
+            if limit:
+                targets = targets[:limit]
+
+            # 同じ URL を別の取り込みが処理中なら "cached" なども返る
+            stats = {
+                "created": 0,
+                "updated": 0,
+                "unchanged": 0,
+                "cached": 0,
+                "not_modified": 0,
+                "skipped": 0,
+                "errors": 0,
+            }
+            parsing.reset_path_stats()
+            sources.reset_timings()
+            parse_cache.reset_stats()
+            previous_replay = app.config.get("SCRAPE_REPLAY", False)
+            app.config["SCRAPE_REPLAY"] = True
+            started = time.perf_counter()
+            try:
+                for url, entry in targets:
+                    if entry is None:
+                        stats["errors"] += 1
+                        click.echo(f"[ERROR] {url} - ストアに保存されていません。", err=True)
+                        continue
+                    source = sources.resolve(entry.url)
+                    if source is not None and source.should_follow(entry.final_url):
+                        # トピックスページの記事本体は記事URLとして別に保存されている
+                        stats["skipped"] += 1
+                        continue
                     try:
                         result = article_service.ingest_article(
-                            item.url,
-                            force=force,
-                            run_ai=not skip_ai,
-                            force_ai=force_ai,
+                            entry.url,
+                            force=True,
+                            run_ai=False,
+                            response=raw_store.to_response(entry),
+                            # ストアから組み立て直すのが目的なので、内容が同じでも書き戻す
+                            skip_unchanged=False,
                         )
-                    except article_service.ArticleIngestionError as exc:
+                    except (article_service.ArticleIngestionError, OSError) as exc:
                         stats["errors"] += 1
-                        click.echo(f"[ERROR] {item.url} - {exc}", err=True)
+                        click.echo(f"[ERROR] {entry.url} - {exc}", err=True)
                         continue
-
                     stats[result.status] += 1
-                    published = article_service.format_timestamp(item.published_at)
-                    click.echo(
-                        f"[{result.status.upper():7}] {item.title} "
-                        f"({published or '日時不明'})"
-                    )
+                    click.echo(f"[{result.status.upper():12}] {result.article.title}")
+            finally:
+                app.config["SCRAPE_REPLAY"] = previous_replay
 
-                    if result.ai_error:
-                        click.echo(f"    ↳ AI: {result.ai_error}", err=True)
+            elapsed = time.perf_counter() - started
+            parsed = stats["created"] + stats["updated"]
+            rate = parsed / elapsed if elapsed > 0 else 0.0
+            click.echo(
+                "created={created} updated={updated} unchanged={unchanged} cached={cached} "
+                "not_modified={not_modified} skipped={skipped} errors={errors}".format(**stats)
+                + f" ({elapsed:.2f}s, {rate:.1f} docs/sec)"
+            )
+            click.echo(_format_parse_paths())
+            click.echo(parse_cache.format_stats())
+            for line in sources.format_timings():
+                click.echo(line)
+
+    @app.cli.command("canonicalize-urls")
+    @click.option("--dry-run", is_flag=True, help="件数を表示するだけで変更しない。")
+    def canonicalize_urls(dry_run: bool) -> None:
+        """保存済み記事の URL を正規化し、同じ URL になる記事を1件にまとめます。"""
+
+        with app.app_context():
+            stats = article_service.canonicalize_stored_urls(dry_run=dry_run)
+        prefix = "[DRY RUN] " if dry_run else ""
+        click.echo(prefix + "checked={checked} renamed={renamed} merged={merged}".format(**stats))
+
+    @app.cli.command("bench-parsers")
+    @click.option(
+        "--corpus",
+        default=str(parser_bench.DEFAULT_CORPUS),
+        show_default=True,
+        type=click.Path(exists=True, file_okay=False, path_type=Path),
+        help="<ソース名>__<種別>.html を置いたディレクトリ。",
+    )
+    @click.option(
+        "--baseline",
+        default=str(parser_bench.DEFAULT_BASELINE),
+        show_default=True,
+        type=click.Path(dir_okay=False, path_type=Path),
+        help="比較するベースライン JSON。",
+    )
+    @click.option(
+        "--threshold",
+        default=parser_bench.DEFAULT_THRESHOLD,
+        show_default=True,
+        type=click.FloatRange(min=0, max=1),
+        help="許容する docs/sec の低下割合。",
+    )
+    @click.option("--source", "only", multiple=True, help="計測するソース名（複数指定可）。省略時は全ソース。")
+    @click.option("--rounds", default=5, show_default=True, type=click.IntRange(min=1), help="計測ラウンド数。")
+    @click.option("--update-baseline", is_flag=True, help="比較せず結果をベースラインとして保存します。")
+    def bench_parsers(
+        corpus: Path,
+        baseline: Path,
+        threshold: float,
+        only: tuple[str, ...],
+        rounds: int,
+        update_baseline: bool,
+    ) -> None:
+        """パーサーのスループットを計測し、ベースラインからの低下を検出します。"""
+
+        try:
+            docs = parser_bench.load_corpus(corpus)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        results = parser_bench.run(docs, only=only, rounds=rounds)
+        if not results:
+            raise click.ClickException("計測対象の文書がありません。")
+
+        if update_baseline:
+            parser_bench.save_baseline(results, baseline)
+            for line in parser_bench.format_results(results):
+                click.echo(line)
+            click.echo(f"Saved baseline to {baseline}")
+            return
 
+        expected = parser_bench.load_baseline(baseline)
+        for line in parser_bench.format_results(results, expected):
+            click.echo(line)
+        for line in parser_bench.format_decode_results(parser_bench.bench_decode(docs, only=only, rounds=rounds)):
+            click.echo(line)
+        regressions = parser_bench.compare(results, expected, threshold)
+        for regression in regressions:
             click.echo(
-                "created={created} updated={updated} "
-                "cached={cached} errors={errors}".format(**stats)
+                f"[REGRESSION] {regression.source}: {regression.current:.1f} docs/sec"
+                f" < baseline {regression.baseline:.1f} ({regression.change:+.0%})",
+                err=True,
+            )
+        if regressions:
+            raise click.ClickException(
+                f"{len(regressions)} 件のソースでスループットが {threshold:.0%} を超えて低下しました。"
             )
 
+    @app.cli.command("bench-ingest")
+    @click.option(
+        "--articles",
+        default=ingest_bench.DEFAULT_ARTICLES,
+        show_default=True,
+        type=click.IntRange(min=1),
+        help="取り込む記事数。",
+    )
+    @click.option(
+        "--threads",
+        default=ingest_bench.DEFAULT_THREADS,
+        show_default=True,
+        type=click.IntRange(min=1),
+        help="同時に取り込むスレッド数。",
+    )
+    @click.option(
+        "--ai-latency",
+        default=ingest_bench.DEFAULT_AI_LATENCY,
+        show_default=True,
+        type=click.FloatRange(min=0),
+        help="AI 呼び出しの代わりに待つ秒数。",
+    )
+    @click.option(
+        "--mode",
+        "modes",
+        multiple=True,
+        type=click.Choice(ingest_bench.MODES),
+        help="計測する方式（複数指定可）。省略時は両方。",
+    )
+    def bench_ingest(articles: int, threads: int, ai_latency: float, modes: tuple[str, ...]) -> None:
+        """AI をトランザクション内で呼ぶ場合と外で呼ぶ場合の取り込みスループットを比べます。"""
+
+        results = ingest_bench.run(
+            articles=articles, threads=threads, ai_latency=ai_latency, modes=modes or ingest_bench.MODES
+        )
+        for line in ingest_bench.format_results(results):
+            click.echo(line)
+
+    @app.cli.command("synthetic-origin")
+    @click.option("--host", default="127.0.0.1", show_default=True, help="待ち受けアドレス。")
+    @click.option("--port", default=8800, show_default=True, type=click.IntRange(min=0), help="待ち受けポート。")
+    @click.option("--articles", default=1000, show_default=True, type=click.IntRange(min=1), help="記事数。")
+    @click.option("--per-page", default=50, show_default=True, type=click.IntRange(min=1), help="一覧1ページの件数。")
+    @click.option(
+        "--latency", default=0.0, show_default=True, type=click.FloatRange(min=0), help="応答ごとの遅延（秒）。"
+    )
+    @click.option(
+        "--jitter", default=0.0, show_default=True, type=click.FloatRange(min=0), help="遅延に加える最大ゆらぎ（秒）。"
+    )
+    @click.option(
+        "--error-rate",
+        default=0.0,
+        show_default=True,
+        type=click.FloatRange(min=0, max=1),
+        help="5xxを返す記事の割合。",
+    )
+    @click.option(
+        "--body-bytes", default=2000, show_default=True, type=click.IntRange(min=0), help="本文のおおよそのバイト数。"
+    )
+    @click.option("--seed", default=0, show_default=True, help="記事生成の乱数シード。")
+    def synthetic_origin_command(
+        host: str,
+        port: int,
+        articles: int,
+        per_page: int,
+        latency: float,
+        jitter: float,
+        error_rate: float,
+        body_bytes: int,
+        seed: int,
+    ) -> None:
+        """負荷計測用の合成ニュースオリジンを起動します（Ctrl+Cで終了）。"""
+
+        settings = synthetic_origin.OriginSettings(
+            articles=articles,
+            per_page=per_page,
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            body_bytes=body_bytes,
+            seed=seed,
+        )
+        server = synthetic_origin.SyntheticOriginServer(settings, host, port)
+        click.echo(f"Serving {articles} synthetic articles at {server.base_url}/virtual-news/")
+        click.echo(f"  VIRTUAL_NEWS_FEED_URLS={server.base_url}/virtual-news/feed.xml")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    @app.cli.group("jobs")
+    def jobs_group() -> None:
+        """取り込みジョブキュー関連のコマンド群。"""
+
+    @jobs_group.command("worker")
+    @click.option(
+        "--processes",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=1),
+        help="ワーカープロセス数（2以上なら子プロセスを起動）。",
+    )
+    @click.option("--max-jobs", type=click.IntRange(min=1), help="この件数を処理したら終了します。")
+    @click.option("--once", is_flag=True, help="実行できるジョブが無くなったら終了します。")
+    @click.option("--poll-interval", type=click.FloatRange(min=0), help="ジョブが無いときの待ち秒数。")
+    def jobs_worker(processes: int, max_jobs: int | None, once: bool, poll_interval: float | None) -> None:
+        """jobs テーブルの取り込みジョブを処理します（Ctrl+Cで終了）。"""
+
+        if processes > 1:
+            if once:
+                raise click.BadParameter("--once は --processes 1 でのみ使えます。")
+            click.echo(f"Starting {processes} job workers")
+            jobs.start_workers(processes, max_jobs=max_jobs, poll_interval=poll_interval)
+            return
+
+        with app.app_context():
+            try:
+                processed = jobs.work(max_jobs=max_jobs, until_idle=once, poll_interval=poll_interval)
+            except KeyboardInterrupt:
+                return
+            click.echo(f"processed {processed} jobs")
+
+    @jobs_group.command("status")
+    def jobs_status() -> None:
+        """状態ごとのジョブ数を表示します。"""
+
+        with app.app_context():
+            counts = jobs.stats()
+        click.echo(" ".join(f"{status}={count}" for status, count in counts.items()))
+
     @app.cli.group("ai")
     def ai_group() -> None:
         """AI関連のバッチ処理。"""
@@ -43,12 +43,82 @@ class Config:
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "10"))
     SCRAPE_RETRY_TOTAL = int(os.getenv("SCRAPE_RETRY_TOTAL", "2"))
     SCRAPE_RETRY_BACKOFF = float(os.getenv("SCRAPE_RETRY_BACKOFF", "0.5"))
+    SCRAPE_POOL_CONNECTIONS = int(os.getenv("SCRAPE_POOL_CONNECTIONS", "10"))
+    SCRAPE_POOL_MAXSIZE = int(os.getenv("SCRAPE_POOL_MAXSIZE", "10"))
+    SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(5 * 1024 * 1024)))
+    SCRAPE_ALLOWED_CONTENT_TYPES = tuple(
+        token.strip().lower()
+        for token in os.getenv("SCRAPE_ALLOWED_CONTENT_TYPES", "text/html,application/xhtml+xml").split(",")
+        if token.strip()
+    )
+    # 本文をチャンクごとにパーサーへ渡し、記事コンテナを読み終えたら残りのダウンロードを打ち切る
+    SCRAPE_STREAM_PARSE = os.getenv("SCRAPE_STREAM_PARSE", "0") not in {"0", "false", "False"}
+    SCRAPE_MAX_IN_FLIGHT = int(os.getenv("SCRAPE_MAX_IN_FLIGHT", "8"))
+    SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", "4"))
+    # ホストごとの許容レート（req/s, 0で無制限）とバースト。robots.txt の Crawl-delay が優先される。
+    # バッチやフィードの URL はほぼ同じホストなので、既定では制限せず同時接続数
+    # （SCRAPE_PER_HOST_LIMIT）だけで抑える。必要なホストは OVERRIDES で絞る
+    SCRAPE_HOST_RATE = float(os.getenv("SCRAPE_HOST_RATE", "0"))
+    SCRAPE_HOST_BURST = int(os.getenv("SCRAPE_HOST_BURST", "2"))
+    SCRAPE_HOST_RATE_OVERRIDES = {
+        host.strip().lower(): float(rate)
+        for host, _, rate in (
+            token.partition("=")
+            for token in os.getenv("SCRAPE_HOST_RATE_OVERRIDES", "").split(",")
+            if "=" in token
+        )
+    }
+    # サーキットブレーカーと適応タイムアウト
+    SCRAPE_BREAKER_THRESHOLD = int(os.getenv("SCRAPE_BREAKER_THRESHOLD", "5"))
+    SCRAPE_BREAKER_COOLDOWN = float(os.getenv("SCRAPE_BREAKER_COOLDOWN", "30"))
+    SCRAPE_ADAPTIVE_TIMEOUT = os.getenv("SCRAPE_ADAPTIVE_TIMEOUT", "1") not in {"0", "false", "False"}
+    SCRAPE_TIMEOUT_PERCENTILE = float(os.getenv("SCRAPE_TIMEOUT_PERCENTILE", "0.95"))
+    SCRAPE_TIMEOUT_MULTIPLIER = float(os.getenv("SCRAPE_TIMEOUT_MULTIPLIER", "3.0"))
+    SCRAPE_TIMEOUT_MIN = float(os.getenv("SCRAPE_TIMEOUT_MIN", "1.0"))
+    SCRAPE_TIMEOUT_MIN_SAMPLES = int(os.getenv("SCRAPE_TIMEOUT_MIN_SAMPLES", "20"))
+    SCRAPE_RESPECT_ROBOTS = os.getenv("SCRAPE_RESPECT_ROBOTS", "1") not in {"0", "false", "False"}
+    SCRAPE_ROBOTS_AGENT = os.getenv("SCRAPE_ROBOTS_AGENT", "ScraperApp")
+    SCRAPE_ROBOTS_TTL = float(os.getenv("SCRAPE_ROBOTS_TTL", "3600"))
     USER_AGENT = os.getenv(
         "SCRAPER_USER_AGENT",
         "Mozilla/5.0 (compatible; ScraperApp/1.0; +https://example.com/bot)",
     )
     RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
-    
+
+    # パースを行うワーカープロセス数（0 ならプロセスプールを使わずその場でパース）
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+    # パース結果のキャッシュ（メモリ上の件数。0 で無効）と任意のディスク保存先
+    PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "256"))
+    PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", "")
+    # ingest_many で何件ごとにコミットするか
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "100"))
+    # 取り込みパイプライン（段ごとのキュー上限とワーカー数、API が結果を待つ秒数）
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+    PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", "2"))
+    PIPELINE_AI_WORKERS = int(os.getenv("PIPELINE_AI_WORKERS", "4"))
+    # POST /api/articles/batch が結果を待つ上限。gunicorn の --timeout（120秒）より短くすること
+    PIPELINE_WAIT_TIMEOUT = float(os.getenv("PIPELINE_WAIT_TIMEOUT", "30"))
+    # API/フォームからの取り込みを jobs テーブルに積み、flask jobs worker に任せる
+    # （ワーカーを起動する環境でだけ有効にする。docker-compose.yml は有効）
+    INGEST_ASYNC = os.getenv("INGEST_ASYNC", "0") not in {"0", "false", "False"}
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))
+    JOBS_LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "300"))
+    JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    JOBS_RETRY_BACKOFF = float(os.getenv("JOBS_RETRY_BACKOFF", "30"))
+    # 同じ URL の同時取り込みを1回にまとめる（待つ上限秒数。CROSS_PROCESS を有効にすると
+    # PostgreSQL ではプロセス間でも。記事のコミットまで接続を1本使う）
+    SINGLEFLIGHT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_TIMEOUT", "120"))
+    SINGLEFLIGHT_CROSS_PROCESS = os.getenv("SINGLEFLIGHT_CROSS_PROCESS", "0") not in {"0", "false", "False"}
+    # URL 正規化で除くクエリ（utm_* や fbclid などの既定に追加）
+    URL_STRIP_PARAMS = tuple(
+        token.strip().lower() for token in os.getenv("URL_STRIP_PARAMS", "").split(",") if token.strip()
+    )
+
+    # Raw HTML store / replay（容量上限や自動削除が無いので既定は無効）
+    RAW_STORE_ENABLED = os.getenv("RAW_STORE_ENABLED", "0") not in {"0", "false", "False"}
+    RAW_STORE_DIR = os.getenv("RAW_STORE_DIR", str(BASE_DIR / "instance" / "raw_store"))
+    SCRAPE_REPLAY = os.getenv("SCRAPE_REPLAY", "0") not in {"0", "false", "False"}
+
     # News sources
     YAHOO_NEWS_URL_PREFIX = "https://news.yahoo.co.jp/articles/"
     NIFTY_NEWS_URL_PREFIX = "https://news.nifty.com/topics/"
@@ -99,6 +169,10 @@ class Config:
         ).split(",")
         if token.strip()
     )
+    # 空なら組み込みの Virtual News 記事を使う（合成オリジンの feed.xml などを指定）
+    VIRTUAL_NEWS_FEED_URLS = tuple(
+        token.strip() for token in os.getenv("VIRTUAL_NEWS_FEED_URLS", "").split(",") if token.strip()
+    )
     ENABLED_FEED_PROVIDERS = tuple(
         slug.strip().lower()
         for slug in os.getenv("ENABLED_FEED_PROVIDERS", "yahoo,nifty").split(",")
@@ -129,6 +203,11 @@ class TestConfig(Config):
     BASIC_AUTH_USERNAME = "test"
     BASIC_AUTH_PASSWORD = "test"
     ENABLE_AI = False
+    RAW_STORE_ENABLED = False
+    PARSE_CACHE_SIZE = 0
+    INGEST_ASYNC = False
+    SCRAPE_HOST_RATE = 0.0
+    SCRAPE_RESPECT_ROBOTS = False
     API_ACCESS_TOKENS = ("test-token",)
     RATE_LIMIT_PER_MINUTE = 1000
     NEWS_FEED_URLS: tuple[str, ...] = ()
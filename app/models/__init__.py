@@ -1,5 +1,6 @@
 from .article import Article, InferenceResult
 from .db import db
+from .job import Job
 from .user import User
 
-__all__ = ["Article", "InferenceResult", "User", "db"]
+__all__ = ["Article", "InferenceResult", "Job", "User", "db"]
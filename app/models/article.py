@@ -19,6 +19,10 @@ class Article(db.Model):
     title: Mapped[str] = mapped_column(db.Text, nullable=False)
     published_at: Mapped[datetime | None] = mapped_column(db.DateTime(timezone=True))
     body: Mapped[str] = mapped_column(db.Text, nullable=False)
+    etag: Mapped[str | None] = mapped_column(db.String(256))
+    last_modified: Mapped[str | None] = mapped_column(db.String(64))
+    # 正規化したタイトル+本文の SHA-256（再取得で内容が変わったかの判定用）
+    content_hash: Mapped[str | None] = mapped_column(db.String(64))
     created_at: Mapped[datetime] = mapped_column(
         db.DateTime(timezone=True),
         nullable=False,
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .db import db
+
+
+class Job(db.Model):
+    """バックグラウンドで処理する取り込みジョブ。"""
+
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+    id: Mapped[str] = mapped_column(
+        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    kind: Mapped[str] = mapped_column(db.String(32), nullable=False, default="ingest")
+    url: Mapped[str] = mapped_column(db.String(512), nullable=False, index=True)
+    options: Mapped[dict[str, Any]] = mapped_column(db.JSON, nullable=False, default=dict)
+    # queued → running → succeeded / failed（再試行時は running → queued）
+    status: Mapped[str] = mapped_column(db.String(16), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(db.Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(db.Integer, nullable=False, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    locked_by: Mapped[str | None] = mapped_column(db.String(64))
+    locked_until: Mapped[datetime | None] = mapped_column(db.DateTime(timezone=True))
+    result: Mapped[dict[str, Any] | None] = mapped_column(db.JSON)
+    error: Mapped[str | None] = mapped_column(db.Text)
+    created_at: Mapped[datetime] = mapped_column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    started_at: Mapped[datetime | None] = mapped_column(db.DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(db.DateTime(timezone=True))
+
+    def __repr__(self) -> str:  # pragma: no cover - デバッグ用
+        return f"<Job {self.id} {self.status} {self.url!r}>"
@@ -4,11 +4,11 @@ import base64
 import csv
 import io
 import os
+import time
 from functools import wraps
 from datetime import datetime, timezone
 from typing import Any
 
-from dateutil import tz
 from sqlalchemy import select
 
 from flask import (
@@ -28,9 +28,24 @@ from .auth import session_manager
 from .models.article import Article
 from .models.db import db
 from .models.user import User
-from .services import analytics, news_feed, risk, scraping
+from .services import (
+    analytics,
+    circuit_breaker,
+    datetimes,
+    fetch_metrics,
+    jobs,
+    news_feed,
+    parse_cache,
+    pipeline,
+    risk,
+    scraping,
+    singleflight,
+)
 from .services import articles as article_service
 
+# /api/articles/batch で1リクエストに受け付ける URL 数の上限
+BATCH_MAX_URLS = 100
+
 bp = Blueprint("main", __name__)
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -235,6 +250,15 @@ def scrape():
         flash("Virtual Newsの記事URLのみ対応しています。", "error")
         return redirect(url_for("main.index"))
 
+    if jobs.is_async():
+        try:
+            job = jobs.enqueue(url)
+        except article_service.ArticleIngestionError as exc:
+            flash(str(exc), "error")
+            return redirect(url_for("main.index"))
+        flash(f"取り込みを受け付けました（ジョブID: {job.id}）。完了すると一覧に表示されます。", "info")
+        return redirect(url_for("main.index"))
+
     try:
         result = article_service.ingest_article(url)
     except article_service.ArticleIngestionError as exc:
@@ -247,6 +271,8 @@ def scrape():
         flash("記事を保存しました。", "success")
     elif result.status == "updated":
         flash("記事を更新しました。", "info")
+    elif result.status in ("not_modified", "unchanged"):
+        flash("記事に変更はありませんでした。", "info")
     else:
         flash("既存の記事を表示します。", "info")
 
@@ -383,6 +409,15 @@ def api_create_article():
     if not scraping.is_allowed(url):
         return jsonify({"error": "Virtual Newsの記事URLのみ対応しています。"}), 400
 
+    if jobs.is_async():
+        # 取り込みはワーカーに任せ、ジョブIDだけ返して Web ワーカーを空ける
+        try:
+            job = jobs.enqueue(url, force=force, run_ai=run_ai, force_ai=force_ai)
+        except article_service.ArticleIngestionError as exc:
+            return jsonify({"error": str(exc)}), exc.status_code
+        status_url = url_for("api.api_get_job", job_id=job.id)
+        return jsonify({"job": jobs.job_to_dict(job), "status_url": status_url}), 202, {"Location": status_url}
+
     try:
         result = article_service.ingest_article(
             url,
@@ -407,6 +442,121 @@ def api_create_article():
     return jsonify(response_body), 201 if result.status == "created" else 200
 
 
+@api_bp.get("/jobs/<job_id>")
+@requires_basic_auth
+def api_get_job(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "ジョブが見つかりません。"}), 404
+    payload: dict[str, Any] = {"job": jobs.job_to_dict(job)}
+    article_id = (job.result or {}).get("article_id")
+    if job.status == "succeeded" and article_id:
+        article = db.session.get(Article, article_id)
+        if article is not None:
+            payload["article"] = article_service.article_to_dict(article)
+    return jsonify(payload)
+
+
+def _pipeline_job_payload(url: str, job: pipeline.IngestJob | None, error: str | None = None) -> dict[str, Any]:
+    if job is None:
+        return {"url": url, "status": "error", "error": error}
+    if not job.done:
+        return {"url": url, "status": "pending", "error": None}
+    if job.error is not None:
+        return {"url": url, "status": "error", "error": str(job.error)}
+    return {
+        "url": url,
+        "status": job.status,
+        "article_id": job.article_id,
+        "title": job.title,
+        "ai": {"enabled": job.ai_enabled, "run": job.ai_ran, "error": job.ai_error},
+        "error": None,
+    }
+
+
+@api_bp.post("/articles/batch")
+@requires_basic_auth
+def api_create_articles_batch():
+    """複数URLを取り込む。
+
+    ``INGEST_ASYNC`` なら URL ごとにジョブを積んで 202 とジョブの ``status_url`` を返す。
+    そうでなければ取り込みパイプラインに投入し、``PIPELINE_WAIT_TIMEOUT`` 秒まで待って
+    結果（終わらなかったものは pending）を返す。
+    """
+
+    payload = request.get_json(silent=True) or {}
+    urls = payload.get("urls")
+    if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+        return jsonify({"error": "urls は URL 文字列の配列で指定してください。"}), 400
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({"error": f"urls は {BATCH_MAX_URLS} 件以内で指定してください。"}), 400
+    options = {
+        "force": bool(payload.get("force")),
+        "run_ai": bool(payload.get("run_ai", True)),
+        "force_ai": bool(payload.get("force_ai")),
+    }
+
+    if jobs.is_async():
+        return _enqueue_batch(urls, options)
+
+    ingest = pipeline.get_pipeline()
+    submitted: list[tuple[str, pipeline.IngestJob | None, str | None]] = []
+    for url in (url.strip() for url in urls):
+        if not scraping.is_allowed(url):
+            submitted.append((url, None, "Virtual Newsの記事URLのみ対応しています。"))
+            continue
+        try:
+            submitted.append((url, ingest.submit(url, **options), None))
+        except article_service.ArticleIngestionError as exc:
+            submitted.append((url, None, str(exc)))
+
+    # gunicorn の --timeout（120秒）より十分短く待ち、残りは pending として返す
+    deadline = time.monotonic() + current_app.config.get("PIPELINE_WAIT_TIMEOUT", 30)
+    for _, job, _ in submitted:
+        if job is not None:
+            job.wait(max(0.0, deadline - time.monotonic()))
+    return jsonify({"results": [_pipeline_job_payload(*entry) for entry in submitted]})
+
+
+def _enqueue_batch(urls: list[str], options: dict[str, bool]):
+    results: list[dict[str, Any]] = []
+    for url in (url.strip() for url in urls):
+        if not scraping.is_allowed(url):
+            results.append({"url": url, "status": "error", "error": "Virtual Newsの記事URLのみ対応しています。"})
+            continue
+        try:
+            job = jobs.enqueue(url, **options)
+        except article_service.ArticleIngestionError as exc:
+            results.append({"url": url, "status": "error", "error": str(exc)})
+            continue
+        results.append(
+            {
+                "url": url,
+                "status": job.status,
+                "job": jobs.job_to_dict(job),
+                "status_url": url_for("api.api_get_job", job_id=job.id),
+                "error": None,
+            }
+        )
+    return jsonify({"results": results}), 202
+
+
+@api_bp.get("/metrics/fetch")
+@requires_basic_auth
+def api_fetch_metrics():
+    """取得処理のフェーズ別レイテンシ・バイト数・ステータス（プロセス内集計）。"""
+    return jsonify(
+        {
+            "hosts": fetch_metrics.snapshot(),
+            "pools": scraping.pool_stats(),
+            "aborts": scraping.abort_stats(),
+            "parse_cache": parse_cache.stats(),
+            "pipeline": pipeline.stats(),
+            "singleflight": singleflight.stats(),
+        }
+    )
+
+
 @api_bp.get("/reports/summary")
 @requires_basic_auth
 def api_report_summary():
@@ -434,9 +584,6 @@ def api_report_summary():
     )
 
 
-_TOKYO_TZ = tz.gettz("Asia/Tokyo")
-
-
 def _latest_articles_for_view(limit: int, provider: str, search_query: str = "") -> list[dict[str, Any]]:
     items = news_feed.fetch_latest_articles(
         limit=limit * 3, provider=provider)  # Fetch more for filtering
@@ -452,16 +599,7 @@ def _latest_articles_for_view(limit: int, provider: str, search_query: str = "")
             if not (title_match or source_match):
                 continue
 
-        published_display = None
-        published_iso = None
-        if item.published_at:
-            try:
-                local_dt = item.published_at.astimezone(_TOKYO_TZ)
-            except (ValueError, AttributeError):
-                local_dt = None
-            if local_dt:
-                published_display = local_dt.strftime("%Y-%m-%d %H:%M")
-                published_iso = local_dt.isoformat()
+        published_display, published_iso = datetimes.display_fields(item.published_at)
 
         latest.append(
             {
@@ -522,29 +660,7 @@ def latest_feed():
             source_match = search_lower in item.source.lower()
             if not (title_match or source_match):
                 continue
-
-        published_display = None
-        published_iso = None
-        if item.published_at:
-            try:
-                local_dt = item.published_at.astimezone(_TOKYO_TZ)
-            except (ValueError, AttributeError):
-                local_dt = None
-            if local_dt:
-                published_display = local_dt.strftime("%Y-%m-%d %H:%M")
-                published_iso = local_dt.isoformat()
-
-        filtered_items.append(
-            {
-                "title": item.title,
-                "url": item.url,
-                "source": item.source,
-                "published_display": published_display,
-                "published_iso": published_iso,
-                "provider": selected_provider,
-                "provider_label": news_feed.provider_label(selected_provider),
-            }
-        )
+        filtered_items.append(item)
 
     # Manual pagination
     total_items = len(filtered_items)
@@ -554,7 +670,24 @@ def latest_feed():
 
     start_idx = (page - 1) * per_page
     end_idx = start_idx + per_page
-    page_items = filtered_items[start_idx:end_idx]
+    page_slice = filtered_items[start_idx:end_idx]
+
+    # 日時の表示変換は表示するページ分だけ行う
+    provider_label = news_feed.provider_label(selected_provider)
+    page_items = [
+        {
+            "title": item.title,
+            "url": item.url,
+            "source": item.source,
+            "published_display": published_display,
+            "published_iso": published_iso,
+            "provider": selected_provider,
+            "provider_label": provider_label,
+        }
+        for item, (published_display, published_iso) in zip(
+            page_slice, datetimes.display_fields_many(item.published_at for item in page_slice)
+        )
+    ]
 
     pagination_info = {
         "page": page,
@@ -604,6 +737,9 @@ def health_check():
         health_status["openai_configured"] = False
         health_status["status"] = "degraded"
 
+    # 取得先ホストのサーキット状態（外部オリジンの劣化なので全体ステータスには反映しない）
+    health_status["scrape_circuits"] = circuit_breaker.snapshot()
+
     status_code = 200 if health_status["status"] == "ok" else 503
     return jsonify(health_status), status_code
 
@@ -1,25 +1,35 @@
 from __future__ import annotations
 
+import hashlib
+import unicodedata
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Literal
+from typing import Any, Iterable, Literal, Mapping
 
-from dateutil import parser as dateparser, tz
 from flask import current_app
-from sqlalchemy import Select, or_, select
+from requests import Response
+from sqlalchemy import Select, delete, inspect as sa_inspect, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import aliased
 
 from app.models.article import Article, InferenceResult
 from app.models.db import db
 
 from . import ai as ai_service
-from . import nifty_news, parsing, risk, scraping, virtual_news_parser
+from . import canonical_url, datetimes, parsing, risk, scraping, singleflight, sources
+
+
+IngestionStatus = Literal["created", "updated", "unchanged", "cached", "not_modified"]
+
+DEFAULT_INGEST_BATCH_SIZE = 100
+# SQLite のバインド変数の上限（999）を超えないよう IN 句を分ける
+IN_CLAUSE_CHUNK = 500
 
 
 @dataclass(slots=True)
 class ArticleIngestionResult:
     article: Article
-    status: Literal["created", "updated", "cached"]
+    status: IngestionStatus
     ai_enabled: bool
     ai_ran: bool
     ai_error: str | None
@@ -34,12 +44,7 @@ class ArticleIngestionError(RuntimeError):
 
 
 def parse_date(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    try:
-        return dateparser.parse(value)
-    except (ValueError, TypeError, OverflowError):
-        return None
+    return datetimes.parse(value, default_tz=None)
 
 
 def article_select(
@@ -131,120 +136,363 @@ def article_to_dict(article: Article) -> dict[str, Any]:
     }
 
 
-def ingest_article(
+def source_for(url: str) -> str | None:
+    """URLに応じたパーサー種別。対応外なら ``None``。"""
+
+    source = sources.resolve(url)
+    return source.name if source is not None else None
+
+
+def stream_for(source: str) -> parsing.StreamingParse | None:
+    """``SCRAPE_STREAM_PARSE`` が有効で、ソースが対応していれば取得用の ``StreamingParse``。"""
+
+    if not current_app.config.get("SCRAPE_STREAM_PARSE", False):
+        return None
+    return sources.get(source).streaming()
+
+
+def _parse_response(
+    source: str,
     url: str,
-    *,
-    force: bool = False,
-    run_ai: bool = True,
-    force_ai: bool = False,
-) -> ArticleIngestionResult:
-    """Fetch, parse, persist, and optionally run AI for a news article (Yahoo!/Nifty)."""
+    response: Response,
+    stream: parsing.StreamingParse | None = None,
+) -> tuple[parsing.ParsedArticle, Response]:
+    """ソース別のパーサーで解析し、(解析結果, 実際に解析したレスポンス) を返す。
+
+    ``stream`` が取得中に本文を受け取っていれば、組み立て済みの木をそのまま使う。
+    """
+
+    spec = sources.get(source)
+    # トピックスページなどの場合、記事URLを抽出して記事ページを再取得
+    if spec.should_follow(response.url):
+        html = parsing.response_html(response)
+        article_url = spec.spec.follow(html)
+        if article_url:
+            current_app.logger.info(f"Extracted article URL: {article_url}")
+            article_response = scraping.fetch(article_url)
+            return spec.parse(article_response.url, parsing.response_html(article_response)), article_response
+        # 記事URL取得失敗時はそのままパース
+        current_app.logger.warning(f"Could not extract article URL from topics page: {url}")
+        return spec.parse(response.url, html), response
+    if stream is not None and stream.bytes_fed:
+        return spec.parse_stream(response.url, stream), response
+    content_type = parsing.response_content_type(response)
+    return spec.parse_bytes(response.url, response.content or b"", content_type), response
+
+
+def require_source(url: str) -> str:
+    """URL のパーサー種別。空や対応外なら ``ArticleIngestionError``（400）。"""
 
     if not url:
         raise ArticleIngestionError("URLを指定してください。", status_code=400)
 
-    # マルチソース対応: URLに応じてパーサーを選択
-    if nifty_news.is_nifty_news_url(url):
-        source = "nifty_news"
-        is_valid = True
-    elif virtual_news_parser.VirtualNewsParser.is_virtual_news_url(url):
-        source = "virtual_news"
-        is_valid = True
-    elif scraping.is_allowed(url):
-        source = "yahoo_news"
-        is_valid = True
-    else:
-        is_valid = False
-
-    if not is_valid:
+    source = source_for(url)
+    if source is None:
         raise ArticleIngestionError(
             "対応していないニュースサイトです。Yahoo!ニュースまたは@niftyニュースの記事URLを指定してください。",
             status_code=400
         )
+    return source
+
+
+def validators_of(article: Article | None) -> tuple[str | None, str | None] | None:
+    """条件付きGETに使う ``(etag, last_modified)``。記事が未保存なら ``None``。"""
+
+    return None if article is None else (article.etag, article.last_modified)
+
+
+def fetch_and_parse(
+    source: str,
+    url: str,
+    validators: tuple[str | None, str | None] | None,
+    *,
+    response: Response | None = None,
+    parsed: parsing.ParsedArticle | None = None,
+    stream: parsing.StreamingParse | None = None,
+) -> tuple[parsing.ParsedArticle | None, Response]:
+    """必要なら取得してパースする。304 Not Modified なら解析結果は ``None``。
+
+    ``validators`` は保存済み記事の ``validators_of``（未保存なら ``None``）。
+    失敗は ``ArticleIngestionError`` にして送出する。
+    """
+
+    try:
+        if response is None:
+            if validators is not None:
+                etag, last_modified = validators
+                response = scraping.fetch(url, etag=etag, last_modified=last_modified, stream=stream)
+            else:
+                response = scraping.fetch(url, stream=stream)
+
+        if scraping.is_not_modified(response):
+            if validators is None:
+                raise scraping.ScrapeError(f"Unexpected 304 Not Modified for {url}")
+            return None, response
+        if parsed is None:
+            parsed, response = _parse_response(source, url, response, stream)
+        return parsed, response
+    except scraping.ScrapeError as exc:
+        current_app.logger.warning("Scraping failed for %s: %s", url, exc)
+        raise ArticleIngestionError(str(exc), status_code=502) from exc
+    except parsing.ParseError as exc:
+        current_app.logger.warning("Parsing failed for %s: %s", url, exc)
+        raise ArticleIngestionError("記事の本文を解析できませんでした。", status_code=422) from exc
+
+
+def content_hash(title: str, body: str) -> str:
+    """タイトルと本文を正規化（NFKC、空白の連続は1つに）した SHA-256。"""
+
+    normalized = "\n".join(" ".join(unicodedata.normalize("NFKC", text).split()) for text in (title, body))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _store_parsed(
+    article: Article | None,
+    parsed: parsing.ParsedArticle,
+    response: Response,
+    *,
+    skip_unchanged: bool = True,
+) -> tuple[Article, IngestionStatus]:
+    status: IngestionStatus
+    digest = content_hash(parsed.title, parsed.body)
+    url = canonical_url.canonicalize(parsed.url)
+    if article is None:
+        article = Article(
+            url=url,
+            title=parsed.title,
+            published_at=parsed.published_at,
+            body=parsed.body,
+            content_hash=digest,
+        )
+        db.session.add(article)
+        status = "created"
+    elif skip_unchanged and article.content_hash == digest and article.url == url:
+        # 内容が同じなら書き戻さない（検証子が変わったときだけ更新される）
+        status = "unchanged"
+    else:
+        article.url = url
+        article.title = parsed.title
+        article.published_at = parsed.published_at
+        article.body = parsed.body
+        article.content_hash = digest
+        status = "updated"
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if article.etag != etag:
+        article.etag = etag
+    if article.last_modified != last_modified:
+        article.last_modified = last_modified
+    return article, status
+
+
+def _wants_ai(*, has_inference: bool, refetched: bool, run_ai: bool, force_ai: bool) -> tuple[bool, bool]:
+    """(AI が有効か, この記事で AI を実行するか)。"""
+
+    ai_enabled = current_app.config.get("ENABLE_AI", True)
+    return ai_enabled, bool(run_ai and ai_enabled and (force_ai or not has_inference or refetched))
+
+
+def _run_ai(article_id: str, title: str, body: str) -> tuple[bool, str | None]:
+    """AI 要約/リスク算出を行い、推論結果を独立した短いトランザクションで保存する。
+
+    AI API の応答待ちの間に書き込みロック（SQLite）や接続（PostgreSQL）を
+    握らないよう、記事はコミット済みで、トランザクションを開いていない状態で呼ぶ。
+    (実行したか, エラー) を返す。
+    """
+
+    try:
+        ai_result = ai_service.summarize_and_score(title, body[:4000])
+    except ai_service.AIServiceUnavailable as exc:
+        return False, str(exc)
+
+    db.session.add(inference_from(article_id, ai_result))
+    try:
+        db.session.commit()
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        current_app.logger.exception("Saving the inference for %s failed", article_id)
+        return False, f"推論結果を保存できませんでした: {exc}"
+    return True, None
+
+
+def inference_from(article_id: str, ai_result: ai_service.AIResult) -> InferenceResult:
+    """``ai_service.summarize_and_score`` の結果から保存用の ``InferenceResult`` を作る。"""
+
+    return InferenceResult(
+        article_id=article_id,
+        risk_score=ai_result.risk_score,
+        summary=ai_result.summary,
+        model=ai_result.model,
+        prompt_version=ai_result.prompt_version,
+    )
+
+
+def ingest_article(
+    url: str,
+    *,
+    force: bool = False,
+    run_ai: bool = True,
+    force_ai: bool = False,
+    response: Response | None = None,
+    parsed: parsing.ParsedArticle | None = None,
+    stream: parsing.StreamingParse | None = None,
+    skip_unchanged: bool = True,
+) -> ArticleIngestionResult:
+    """Fetch, parse, persist, and optionally run AI for a news article (Yahoo!/Nifty).
+
+    ``response`` に取得済みのレスポンス（``scraping.fetch_many`` の結果など）を渡すと、
+    再取得せずにそれをパースする。さらに ``parsed`` に解析済みの結果
+    （``parse_pool`` のワーカーの戻り値など）を渡すとパースも省略する。
+    ``stream`` には ``response`` の取得時に使った ``StreamingParse`` を渡せる。
+    再取得した内容のハッシュ（``content_hash``）が保存済みと同じなら記事を更新せず、
+    AI も再実行しないで ``unchanged`` を返す。``skip_unchanged=False`` なら常に書き戻す。
+
+    URL は ``canonical_url.canonicalize`` で正規化してから扱う。同じ URL の取り込みが
+    既に走っていれば、取得も AI 推論もせずにその完了を待って結果を共有する
+    （``singleflight``）。
+    複数URLをまとめて取り込む場合は ``ingest_many`` を使う。
+    """
+
+    url = canonical_url.canonicalize(url)
+    source = require_source(url)
+
+    flight, leader = singleflight.begin(("ingest", url))
+    if not leader:
+        return _shared_result(flight, run_ai=run_ai)
+    try:
+        # 別プロセスとの直列化は記事のコミットまで。AI 推論の間はロック（と接続）を持たない
+        with singleflight.cross_process(("ingest", url)) as waited:
+            if waited:
+                # 別プロセスが取り込み終えた直後なので、取り直しと AI の再実行は省く
+                force = force_ai = False
+            result, ai_input = _store_article(
+                url,
+                source,
+                force=force,
+                run_ai=run_ai,
+                force_ai=force_ai,
+                response=response,
+                parsed=parsed,
+                stream=stream,
+                skip_unchanged=skip_unchanged,
+            )
+            if waited and result.status == "cached":
+                # AI は先に取り込んだプロセスに任せる
+                ai_input = None
+        if ai_input:
+            result.ai_ran, result.ai_error = _run_ai(*ai_input)
+    except BaseException as exc:
+        singleflight.finish(flight, error=exc)
+        raise
+    singleflight.finish(flight, value=_shared_value(result))
+    return result
+
+
+def _store_article(
+    url: str,
+    source: str,
+    *,
+    force: bool,
+    run_ai: bool,
+    force_ai: bool,
+    response: Response | None,
+    parsed: parsing.ParsedArticle | None,
+    stream: parsing.StreamingParse | None,
+    skip_unchanged: bool,
+) -> tuple[ArticleIngestionResult, tuple[str, str, str] | None]:
+    """記事を取得・保存してコミットする。AI はまだ呼ばず、呼ぶ場合はその入力を返す。"""
 
     article = db.session.scalar(select(Article).where(Article.url == url))
     needs_fetch = force or article is None
-    parsed = None
-    status: Literal["created", "updated", "cached"] = "cached"
+    if response is None:
+        # 解析結果は渡されたレスポンスに対するものなので、ここで取得する場合は使わない
+        parsed = None
+        stream = stream_for(source) if needs_fetch else None
+    status: IngestionStatus = "cached"
 
     if needs_fetch:
         try:
-            response = scraping.fetch(url)
-
-            # ソースに応じてパーサーを選択
-            if source == "nifty_news":
-                # トピックスページの場合、記事URLを抽出
-                if '/topics/' in response.url:
-                    article_url = nifty_news.NiftyNewsParser.extract_article_url(response.text)
-                    if article_url:
-                        current_app.logger.info(f"Extracted article URL: {article_url}")
-                        # 記事ページを再取得
-                        article_response = scraping.fetch(article_url)
-                        parsed = nifty_news.NiftyNewsParser.parse_article(
-                            article_response.text, article_response.url
-                        )
-                    else:
-                        # 記事URL取得失敗時はトピックスページをそのままパース
-                        current_app.logger.warning(f"Could not extract article URL from topics page: {url}")
-                        parsed = nifty_news.NiftyNewsParser.parse_article(response.text, response.url)
-                else:
-                    # 記事URLを直接指定された場合
-                    parsed = nifty_news.NiftyNewsParser.parse_article(response.text, response.url)
-            elif source == "virtual_news":
-                parsed = virtual_news_parser.VirtualNewsParser.parse_article(response.text, response.url)
-            else:
-                parsed = parsing.parse_article(response.url, response.text)
-        except scraping.ScrapeError as exc:
-            db.session.rollback()
-            current_app.logger.warning("Scraping failed for %s: %s", url, exc)
-            raise ArticleIngestionError(str(exc), status_code=502) from exc
-        except parsing.ParseError as exc:
+            parsed, response = fetch_and_parse(
+                source, url, validators_of(article), response=response, parsed=parsed, stream=stream
+            )
+        except ArticleIngestionError:
             db.session.rollback()
-            current_app.logger.warning("Parsing failed for %s: %s", url, exc)
-            raise ArticleIngestionError("記事の本文を解析できませんでした。", status_code=422) from exc
+            raise
 
-        if article is None:
-            article = Article(
-                url=parsed.url,
-                title=parsed.title,
-                published_at=parsed.published_at,
-                body=parsed.body,
-            )
-            db.session.add(article)
-            status = "created"
+        if parsed is None:
+            # 304: 本文は変わっていないのでパース・更新・AI再実行を省略
+            status = "not_modified"
+            needs_fetch = False
         else:
-            article.url = parsed.url
-            article.title = parsed.title
-            article.published_at = parsed.published_at
-            article.body = parsed.body
-            status = "updated"
+            article, status = _store_parsed(article, parsed, response, skip_unchanged=skip_unchanged)
+            if status == "unchanged":
+                needs_fetch = False
 
     db.session.flush()
 
-    ai_enabled = current_app.config.get("ENABLE_AI", True)
-    ai_ran = False
-    ai_error: str | None = None
+    ai_enabled, wants_ai = _wants_ai(
+        has_inference=article.latest_inference is not None,
+        refetched=needs_fetch,
+        run_ai=run_ai,
+        force_ai=force_ai,
+    )
+    # コミットで属性が失効するので、AI に渡す値は先に取り出しておく
+    ai_input = (article.id, article.title, article.body) if wants_ai else None
+    stored_url = article.url
 
-    latest = article.latest_inference
+    # 記事を先にコミットし、AI はトランザクションの外で呼ぶ
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 別プロセスが同じ URL を先に保存した。そちらの記事を返し、AI もそちらに任せる
+        db.session.rollback()
+        article = db.session.scalar(select(Article).where(Article.url == stored_url))
+        if article is None:
+            raise
+        status, ai_input = "cached", None
 
-    if run_ai and ai_enabled and (force_ai or latest is None or needs_fetch):
-        try:
-            ai_result = ai_service.summarize_and_score(article.title, article.body[:4000])
-        except ai_service.AIServiceUnavailable as exc:
-            ai_error = str(exc)
-        else:
-            inference = InferenceResult(
-                article_id=article.id,
-                risk_score=ai_result.risk_score,
-                summary=ai_result.summary,
-                model=ai_result.model,
-                prompt_version=ai_result.prompt_version,
-            )
-            db.session.add(inference)
-            ai_ran = True
+    result = ArticleIngestionResult(
+        article=article,
+        status=status,
+        ai_enabled=ai_enabled,
+        ai_ran=False,
+        ai_error=None,
+    )
+    return result, ai_input
 
-    db.session.commit()
 
+def _shared_value(result: ArticleIngestionResult) -> tuple[str, IngestionStatus, bool, bool, str | None]:
+    # 他のスレッドに渡すので ORM オブジェクトではなく ID を渡す（失効していても SQL は発行しない）
+    article_id = sa_inspect(result.article).identity[0]
+    return article_id, result.status, result.ai_enabled, result.ai_ran, result.ai_error
+
+
+def _shared_result(flight: singleflight.Flight, *, run_ai: bool) -> ArticleIngestionResult:
+    """同じ URL を処理中の呼び出しの完了を待ち、その結果をこのセッションで組み立て直す。"""
+
+    try:
+        article_id, status, ai_enabled, ai_ran, ai_error = singleflight.wait(flight)
+    except ArticleIngestionError as exc:
+        raise ArticleIngestionError(str(exc), status_code=exc.status_code) from exc
+    except TimeoutError as exc:
+        raise ArticleIngestionError("同じURLの取り込みが完了しませんでした。", status_code=503) from exc
+    except Exception as exc:
+        raise ArticleIngestionError(f"記事を取り込めませんでした: {exc}", status_code=500) from exc
+
+    article = db.session.get(Article, article_id)
+    if article is None:
+        raise ArticleIngestionError("記事が見つかりません。", status_code=500)
+    if not ai_ran and ai_error is None:
+        # 先行の呼び出しが AI を試さなかった（run_ai=False など）場合は、推論が無ければここで行う。
+        # 試して失敗した場合（ai_error あり）はそのエラーを共有し、呼び出し直さない
+        ai_enabled, wants_ai = _wants_ai(
+            has_inference=article.latest_inference is not None, refetched=False, run_ai=run_ai, force_ai=False
+        )
+        if wants_ai:
+            ai_input = (article.id, article.title, article.body)
+            db.session.commit()
+            ai_ran, ai_error = _run_ai(*ai_input)
     return ArticleIngestionResult(
         article=article,
         status=status,
@@ -254,12 +502,294 @@ def ingest_article(
     )
 
 
+@dataclass(slots=True)
+class BatchIngestItem:
+    """``ingest_many`` の URL ごとの結果。成功なら ``result``、失敗なら ``error``。"""
+
+    url: str
+    result: ArticleIngestionResult | None = None
+    error: ArticleIngestionError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _articles_by_url(urls: list[str]) -> dict[str, Article]:
+    found: dict[str, Article] = {}
+    for start in range(0, len(urls), IN_CLAUSE_CHUNK):
+        chunk = urls[start:start + IN_CLAUSE_CHUNK]
+        for article in db.session.scalars(select(Article).where(Article.url.in_(chunk))):
+            found[article.url] = article
+    return found
+
+
+def ids_with_inference(article_ids: list[str]) -> set[str]:
+    """推論結果が1件以上ある記事の ID。"""
+
+    found: set[str] = set()
+    for start in range(0, len(article_ids), IN_CLAUSE_CHUNK):
+        chunk = article_ids[start:start + IN_CLAUSE_CHUNK]
+        stmt = select(InferenceResult.article_id).where(InferenceResult.article_id.in_(chunk)).distinct()
+        found.update(db.session.scalars(stmt))
+    return found
+
+
+def ingest_many(
+    urls: Iterable[str],
+    *,
+    force: bool = False,
+    run_ai: bool = True,
+    force_ai: bool = False,
+    responses: Mapping[str, Response] | None = None,
+    parsed: Mapping[str, parsing.ParsedArticle] | None = None,
+    streams: Mapping[str, parsing.StreamingParse] | None = None,
+    batch_size: int | None = None,
+    max_in_flight: int | None = None,
+) -> list[BatchIngestItem]:
+    """複数URLをまとめて取り込む（``ingest_article`` のバッチ版）。
+
+    既存記事と推論の有無は ``IN (...)`` でまとめて引き、新規記事の INSERT と
+    更新は ``batch_size`` 件（既定は ``INGEST_BATCH_SIZE``）ごとに1回の flush と
+    commit で行う。``responses`` / ``parsed`` / ``streams`` は URL ごとの
+    ``ingest_article`` の同名引数で、レスポンスの無い取得対象は
+    ``scraping.fetch_many`` で並行取得する。
+    結果は正規化した URL（``canonical_url.canonicalize``）で重複を除いた入力順で返し、
+    URL ごとの失敗は例外にせず ``error`` に入れる。
+    他の呼び出しが取り込み中の URL は、自分の分を終えてからその完了を待って結果を共有する。
+    """
+
+    canonicalize = canonical_url.canonicalize
+    responses = {canonicalize(url): response for url, response in (responses or {}).items()}
+    parsed = {canonicalize(url): result for url, result in (parsed or {}).items()}
+    streams = {canonicalize(url): stream for url, stream in (streams or {}).items()}
+    if batch_size is None:
+        batch_size = int(current_app.config.get("INGEST_BATCH_SIZE", DEFAULT_INGEST_BATCH_SIZE))
+    batch_size = max(1, batch_size)
+
+    items = {url: BatchIngestItem(url) for url in map(canonicalize, urls)}
+    sources_by_url: dict[str, str] = {}
+    for url, item in items.items():
+        try:
+            sources_by_url[url] = require_source(url)
+        except ArticleIngestionError as exc:
+            item.error = exc
+
+    led: dict[str, singleflight.Flight] = {}
+    shared: dict[str, singleflight.Flight] = {}
+    for url in sources_by_url:
+        flight, leader = singleflight.begin(("ingest", url))
+        (led if leader else shared)[url] = flight
+
+    try:
+        _ingest_batch(
+            items,
+            {url: sources_by_url[url] for url in led},
+            force=force,
+            run_ai=run_ai,
+            force_ai=force_ai,
+            responses=responses,
+            parsed=parsed,
+            streams=streams,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+        )
+    except BaseException as exc:
+        for flight in led.values():
+            singleflight.finish(flight, error=exc)
+        raise
+    for url, flight in led.items():
+        item = items[url]
+        if item.ok:
+            singleflight.finish(flight, value=_shared_value(item.result))
+        else:
+            singleflight.finish(flight, error=item.error)
+
+    # 自分のフライトを終えてから待つので、互いに待ち合うことはない
+    for url, flight in shared.items():
+        try:
+            items[url].result = _shared_result(flight, run_ai=run_ai)
+        except ArticleIngestionError as exc:
+            items[url].error = exc
+
+    return list(items.values())
+
+
+def _ingest_batch(
+    items: dict[str, BatchIngestItem],
+    sources_by_url: dict[str, str],
+    *,
+    force: bool,
+    run_ai: bool,
+    force_ai: bool,
+    responses: dict[str, Response],
+    parsed: dict[str, parsing.ParsedArticle],
+    streams: dict[str, parsing.StreamingParse],
+    batch_size: int,
+    max_in_flight: int | None,
+) -> None:
+    targets = list(sources_by_url)
+    by_url = _articles_by_url(targets)
+    # コミット後は属性が失効するので、ID と検証子は最初に取り出しておく
+    article_ids = {url: article.id for url, article in by_url.items()}
+    validators = {url: (article.etag, article.last_modified) for url, article in by_url.items()}
+    with_inference = ids_with_inference(list(article_ids.values()))
+
+    to_fetch = [url for url in targets if (force or url not in by_url) and url not in responses]
+    if to_fetch:
+        fetch_streams = {}
+        for url in to_fetch:
+            stream = streams.get(url) or stream_for(sources_by_url[url])
+            if stream is not None:
+                streams[url] = fetch_streams[url] = stream
+        for fetched in scraping.fetch_many(
+            to_fetch,
+            max_in_flight=max_in_flight,
+            validators={url: validators[url] for url in to_fetch if url in validators},
+            streams=fetch_streams,
+        ):
+            if fetched.ok:
+                responses[fetched.url] = fetched.response
+            else:
+                current_app.logger.warning("Scraping failed for %s: %s", fetched.url, fetched.error)
+                items[fetched.url].error = ArticleIngestionError(str(fetched.error), status_code=502)
+
+    pending: list[tuple[BatchIngestItem, Article, IngestionStatus, bool, bool]] = []
+    for index, url in enumerate(targets):
+        item = items[url]
+        if item.error is not None:
+            continue
+        article = by_url.get(url)
+        has_inference = article_ids.get(url) in with_inference
+        needs_fetch = force or article is None
+        status: IngestionStatus = "cached"
+
+        if needs_fetch:
+            try:
+                result, response = fetch_and_parse(
+                    sources_by_url[url],
+                    url,
+                    validators.get(url),
+                    response=responses.get(url),
+                    parsed=parsed.get(url),
+                    stream=streams.get(url),
+                )
+            except ArticleIngestionError as exc:
+                item.error = exc
+                continue
+            if result is None:
+                status = "not_modified"
+                needs_fetch = False
+            else:
+                result_url = canonical_url.canonicalize(result.url)
+                if article is None and result_url != url:
+                    # トピックス経由などで解析後の URL が別の記事と同じになる場合
+                    article = by_url.get(result_url) or db.session.scalar(
+                        select(Article).where(Article.url == result_url)
+                    )
+                article, status = _store_parsed(article, result, response)
+                by_url[result_url] = article
+                if status == "unchanged":
+                    needs_fetch = False
+
+        pending.append((item, article, status, has_inference, needs_fetch))
+        if len(pending) >= batch_size:
+            _commit_batch(pending, run_ai=run_ai, force_ai=force_ai)
+            # コミットで失効した残りの既存記事を1件ずつ読み直さないよう、まとめて読み込む
+            remaining = [later for later in targets[index + 1:] if later in article_ids]
+            if remaining:
+                by_url.update(_articles_by_url(remaining))
+    if pending:
+        _commit_batch(pending, run_ai=run_ai, force_ai=force_ai)
+
+
+def _commit_batch(
+    pending: list[tuple[BatchIngestItem, Article, IngestionStatus, bool, bool]],
+    *,
+    run_ai: bool,
+    force_ai: bool,
+) -> None:
+    ai_inputs: list[tuple[BatchIngestItem, tuple[str, str, str]]] = []
+    try:
+        # 新規記事はここでまとめて INSERT される（ID もここで確定する）
+        db.session.flush()
+        for item, article, status, has_inference, refetched in pending:
+            ai_enabled, wants_ai = _wants_ai(
+                has_inference=has_inference, refetched=refetched, run_ai=run_ai, force_ai=force_ai
+            )
+            if wants_ai:
+                ai_inputs.append((item, (article.id, article.title, article.body)))
+            item.result = ArticleIngestionResult(
+                article=article,
+                status=status,
+                ai_enabled=ai_enabled,
+                ai_ran=False,
+                ai_error=None,
+            )
+        db.session.commit()
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        current_app.logger.exception("Saving a batch of %d articles failed", len(pending))
+        for item, *_ in pending:
+            item.result = None
+            item.error = ArticleIngestionError(f"記事を保存できませんでした: {exc}", status_code=500)
+        ai_inputs.clear()
+    pending.clear()
+
+    # 記事はコミット済み。AI の結果は1件ずつ短いトランザクションで保存する
+    for item, ai_input in ai_inputs:
+        item.result.ai_ran, item.result.ai_error = _run_ai(*ai_input)
+
+
+def canonicalize_stored_urls(*, dry_run: bool = False) -> dict[str, int]:
+    """保存済みの ``Article.url`` を ``canonical_url.canonicalize`` の形に揃える。
+
+    正規化の導入前に ``utm_*`` やフラグメント付きで保存された記事は、正規化した URL
+    での検索に当たらず、次の取り込みで重複して作られてしまう。正規化後の URL が
+    同じになる記事は1件にまとめる（既に正規形で保存された記事、無ければ最も新しい
+    記事を残し、他の記事の推論結果を付け替えて削除する）。まとめる単位ごとにコミットする。
+    ``dry_run`` なら件数を数えるだけで変更しない。
+    """
+
+    groups: dict[str, list[tuple[str, str, datetime]]] = {}
+    checked = 0
+    for article_id, url, created_at in db.session.execute(select(Article.id, Article.url, Article.created_at)):
+        checked += 1
+        groups.setdefault(canonical_url.canonicalize(url), []).append((article_id, url, created_at))
+
+    stats = {"checked": checked, "renamed": 0, "merged": 0}
+    for canonical, members in groups.items():
+        if all(url == canonical for _, url, _ in members):
+            continue
+        exact = [member for member in members if member[1] == canonical]
+        keeper = exact[0] if exact else max(members, key=lambda member: (member[2], member[0]))
+        duplicates = [article_id for article_id, _, _ in members if article_id != keeper[0]]
+        stats["merged"] += len(duplicates)
+        if keeper[1] != canonical:
+            stats["renamed"] += 1
+        if dry_run:
+            continue
+        if duplicates:
+            db.session.execute(
+                update(InferenceResult)
+                .where(InferenceResult.article_id.in_(duplicates))
+                .values(article_id=keeper[0])
+                .execution_options(synchronize_session=False)
+            )
+            db.session.execute(
+                delete(Article).where(Article.id.in_(duplicates)).execution_options(synchronize_session=False)
+            )
+        if keeper[1] != canonical:
+            db.session.execute(
+                update(Article)
+                .where(Article.id == keeper[0])
+                .values(url=canonical)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    return stats
+
+
 def format_timestamp(dt: datetime | None) -> str | None:
     """Utility for CLI/UI to show timestamps in JST."""
-    if dt is None:
-        return None
-    tokyo = tz.gettz("Asia/Tokyo")
-    try:
-        return dt.astimezone(tokyo).strftime("%Y-%m-%d %H:%M")
-    except (ValueError, OSError):
-        return None
+    return datetimes.format_local(dt)
@@ -0,0 +1,65 @@
+"""記事 URL の正規化。
+
+同じ記事でも、フィードや共有リンク経由ではトラッキング用のクエリ（``utm_*``・
+``fbclid`` など）やフラグメントが付いた URL で届く。``Article.url`` の検索・保存、
+ジョブや取り込みの重複判定の前に ``canonicalize`` で揃えておく。
+
+揃えるのはスキームとホストの大文字小文字、既定ポート、フラグメント、空のパス、
+除去対象のクエリだけで、パスの大文字小文字や末尾の ``/`` は変えない
+（サーバーによって別のページになりうるため）。残りのクエリは順序を保つ。
+"""
+from __future__ import annotations
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from flask import current_app, has_app_context
+
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_PARAMS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl"}
+)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _extra_params() -> frozenset[str]:
+    if has_app_context():
+        return frozenset(name.lower() for name in current_app.config.get("URL_STRIP_PARAMS", ()))
+    return frozenset()
+
+
+def _is_tracking(name: str, extra: frozenset[str]) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name in extra or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize(url: str) -> str:
+    """比較・保存用の URL。http(s) 以外や解釈できない URL は前後の空白だけ除いて返す。"""
+
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    if parts.username or parts.password:
+        userinfo = parts.netloc.rpartition("@")[0]
+        host = f"{userinfo}@{host}"
+
+    query = parts.query
+    if query:
+        extra = _extra_params()
+        pairs = parse_qsl(query, keep_blank_values=True)
+        kept = [(name, value) for name, value in pairs if not _is_tracking(name, extra)]
+        if len(kept) != len(pairs):
+            query = urlencode(kept)
+
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
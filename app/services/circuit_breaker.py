@@ -0,0 +1,150 @@
+"""ホスト単位のサーキットブレーカーと適応タイムアウト。
+
+連続失敗が ``SCRAPE_BREAKER_THRESHOLD`` に達したホストは ``open`` になり、
+``SCRAPE_BREAKER_COOLDOWN`` 秒の間は即座に失敗させる。クールダウン後は
+1件だけ試行（``half_open``）させ、成功すれば ``closed`` に戻す。
+タイムアウトは成功時のレイテンシ分布から算出し、劣化したホストで
+毎回 ``REQUEST_TIMEOUT`` いっぱいまで待たないようにする。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Final, Literal
+
+from flask import current_app, has_app_context
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+DEFAULT_THRESHOLD: Final[int] = 5
+DEFAULT_COOLDOWN: Final[float] = 30.0
+DEFAULT_PERCENTILE: Final[float] = 0.95
+DEFAULT_MULTIPLIER: Final[float] = 3.0
+DEFAULT_MIN_TIMEOUT: Final[float] = 1.0
+DEFAULT_MIN_SAMPLES: Final[int] = 20
+LATENCY_WINDOW: Final[int] = 200
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+@dataclass(slots=True)
+class HostCircuit:
+    state: CircuitState = "closed"
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+_CIRCUITS: dict[str, HostCircuit] = {}
+_LOCK = threading.Lock()
+
+
+def reset() -> None:
+    with _LOCK:
+        _CIRCUITS.clear()
+
+
+def _circuit(host: str) -> HostCircuit:
+    circuit = _CIRCUITS.get(host)
+    if circuit is None:
+        circuit = _CIRCUITS[host] = HostCircuit()
+    return circuit
+
+
+def allow(host: str) -> bool:
+    """リクエストを送ってよいか。クールダウン明けの最初の1件は試行として通す。"""
+
+    cooldown = float(_config_get("SCRAPE_BREAKER_COOLDOWN", DEFAULT_COOLDOWN))
+    with _LOCK:
+        circuit = _circuit(host)
+        if circuit.state == "closed":
+            return True
+        if circuit.state == "open" and time.monotonic() - circuit.opened_at >= cooldown:
+            circuit.state = "half_open"
+            circuit.probe_in_flight = False
+        if circuit.state == "half_open" and not circuit.probe_in_flight:
+            circuit.probe_in_flight = True
+            return True
+        return False
+
+
+def record_success(host: str, elapsed: float) -> None:
+    with _LOCK:
+        circuit = _circuit(host)
+        circuit.latencies.append(elapsed)
+        if circuit.state == "open":
+            # open になる前に送ったリクエストの遅れた成功。閉じるのは half_open の試行だけ
+            return
+        circuit.state = "closed"
+        circuit.consecutive_failures = 0
+        circuit.probe_in_flight = False
+
+
+def record_failure(host: str) -> None:
+    threshold = int(_config_get("SCRAPE_BREAKER_THRESHOLD", DEFAULT_THRESHOLD))
+    with _LOCK:
+        circuit = _circuit(host)
+        circuit.consecutive_failures += 1
+        circuit.probe_in_flight = False
+        if circuit.state == "half_open" or (threshold > 0 and circuit.consecutive_failures >= threshold):
+            circuit.state = "open"
+            circuit.opened_at = time.monotonic()
+
+
+def release(host: str) -> None:
+    """成功・失敗を記録しないまま終わった試行の枠を戻し、次の試行を通せるようにする。"""
+
+    with _LOCK:
+        circuit = _CIRCUITS.get(host)
+        if circuit is not None:
+            circuit.probe_in_flight = False
+
+
+def _percentile(values: list[float], ratio: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(ratio * len(ordered))) - 1))
+    return ordered[index]
+
+
+def timeout_for(host: str, default: float) -> float:
+    """観測レイテンシの上位パーセンタイル × 係数を、[最小値, default] に収めて返す。"""
+
+    if not _config_get("SCRAPE_ADAPTIVE_TIMEOUT", True):
+        return default
+    min_samples = int(_config_get("SCRAPE_TIMEOUT_MIN_SAMPLES", DEFAULT_MIN_SAMPLES))
+    with _LOCK:
+        circuit = _CIRCUITS.get(host)
+        samples = list(circuit.latencies) if circuit else []
+    if len(samples) < max(min_samples, 1):
+        return default
+
+    ratio = float(_config_get("SCRAPE_TIMEOUT_PERCENTILE", DEFAULT_PERCENTILE))
+    multiplier = float(_config_get("SCRAPE_TIMEOUT_MULTIPLIER", DEFAULT_MULTIPLIER))
+    floor = float(_config_get("SCRAPE_TIMEOUT_MIN", DEFAULT_MIN_TIMEOUT))
+    return min(float(default), max(floor, _percentile(samples, ratio) * multiplier))
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    """``/health`` 向けにホストごとの状態を返す。"""
+
+    with _LOCK:
+        items = [
+            (host, circuit.state, circuit.consecutive_failures, len(circuit.latencies))
+            for host, circuit in _CIRCUITS.items()
+        ]
+    return {
+        host: {
+            "state": state,
+            "consecutive_failures": failures,
+            "samples": samples,
+            "timeout": round(timeout_for(host, float(_config_get("REQUEST_TIMEOUT", 10))), 3),
+        }
+        for host, state, failures, samples in items
+    }
@@ -0,0 +1,164 @@
+"""日時文字列の正規化と表示用変換。
+
+記事・フィードに現れる形式（ISO-8601、RSS の RFC 822、``2025年11月30日 10:00``）は
+正規表現で判定して標準ライブラリで直接組み立て、それ以外だけ汎用の
+``dateutil.parser`` に回す。タイムゾーンは名前ごとに一度だけ解決して使い回す。
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone, tzinfo
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Iterable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as dateparser, tz
+
+_ISO = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?(?:Z|[+-]\d{2}(?::?\d{2})?)?"
+)
+_RFC822 = re.compile(r"(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+\d{1,2}:\d{2}(?::\d{2})?(?:\s+\S+)?")
+# strptime('%Y年%m月%d日 %H:%M') と同じく月日時分は1〜2桁、日付と時刻の間は空白
+_JAPANESE = re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日(?:\s+(\d{1,2}):(\d{1,2}))?")
+
+_UNSET = object()
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str) -> tzinfo | None:
+    """IANA 名のタイムゾーン。``zoneinfo`` で見つからなければ ``dateutil`` で探す。"""
+
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return tz.gettz(name)
+
+
+TOKYO = get_tz("Asia/Tokyo")
+
+
+def parse_iso(value: str | None) -> datetime | None:
+    """ISO-8601 文字列を ``fromisoformat`` で読む（末尾 ``Z`` 可）。オフセットが無ければ naive のまま。"""
+
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_japanese(value: str | None, *, require_time: bool = False) -> datetime | None:
+    """``2025年11月30日 10:00`` 形式（時刻は省略可）を naive な datetime にする。"""
+
+    if not isinstance(value, str):
+        return None
+    match = _JAPANESE.fullmatch(value.strip())
+    if match is None:
+        return None
+    year, month, day, hour, minute = match.groups()
+    if hour is None and require_time:
+        return None
+    try:
+        return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0))
+    except ValueError:
+        return None
+
+
+def parse(value: str | None, default_tz: tzinfo | None = TOKYO) -> datetime | None:
+    """日時文字列を datetime にする。解釈できなければ ``None``。
+
+    タイムゾーンを含まない値には ``default_tz`` を付ける（``None`` なら naive のまま）。
+    """
+
+    if not value or not isinstance(value, str):
+        return None
+    dt = _parse_cached(value)
+    if dt is not None and dt.tzinfo is None and default_tz is not None:
+        dt = dt.replace(tzinfo=default_tz)
+    return dt
+
+
+# フィードの再取得などで同じ文字列が繰り返し現れるため結果をキャッシュする
+# （datetime は不変なので共有してよい）
+@lru_cache(maxsize=4096)
+def _parse_cached(value: str) -> datetime | None:
+    text = value.strip()
+    dt = None
+    if _ISO.fullmatch(text):
+        dt = parse_iso(text)
+    elif _RFC822.fullmatch(text):
+        try:
+            dt = parsedate_to_datetime(text)
+        except (ValueError, TypeError, IndexError):
+            dt = None
+        # "-0000" は UTC（送信側のローカル時刻が不明）。``JST`` など解釈できない
+        # ゾーン名や省略時も naive で返るので、そちらは ``parse`` の default_tz に任せる
+        if dt is not None and dt.tzinfo is None and text.endswith("-0000"):
+            dt = dt.replace(tzinfo=timezone.utc)
+    elif "年" in text:
+        dt = parse_japanese(text)
+    if dt is None:
+        try:
+            dt = dateparser.parse(text)
+        except (ValueError, TypeError, OverflowError):
+            return None
+    return dt
+
+
+def parse_many(values: Iterable[str | None], default_tz: tzinfo | None = TOKYO) -> list[datetime | None]:
+    """``parse`` の一括版。"""
+
+    return [parse(value, default_tz) for value in values]
+
+
+def to_local(dt: datetime | None, zone: tzinfo | None = TOKYO) -> datetime | None:
+    """``zone`` の現地時刻に変換する。変換できなければ ``None``。"""
+
+    if dt is None:
+        return None
+    try:
+        return dt.astimezone(zone)
+    except (ValueError, OverflowError, OSError, AttributeError):
+        return None
+
+
+def format_local(dt: datetime | None, zone: tzinfo | None = TOKYO) -> str | None:
+    """画面・CLI 表示用の ``YYYY-MM-DD HH:MM``（現地時刻）。"""
+
+    local = to_local(dt, zone)
+    return None if local is None else _display(local)
+
+
+def display_fields(dt: datetime | None, zone: tzinfo | None = TOKYO) -> tuple[str | None, str | None]:
+    """表示用文字列と ISO 文字列（どちらも現地時刻）。"""
+
+    local = to_local(dt, zone)
+    if local is None:
+        return None, None
+    return _display(local), local.isoformat()
+
+
+def _display(local: datetime) -> str:
+    # strftime("%Y-%m-%d %H:%M") と同じ文字列
+    return f"{local.year:04d}-{local.month:02d}-{local.day:02d} {local.hour:02d}:{local.minute:02d}"
+
+
+def display_fields_many(
+    values: Iterable[datetime | None],
+    zone: tzinfo | None = TOKYO,
+) -> list[tuple[str | None, str | None]]:
+    """``display_fields`` の一括版。同じ時刻は一度だけ変換する。"""
+
+    seen: dict[datetime, tuple[str | None, str | None]] = {}
+    results = []
+    for value in values:
+        if value is None:
+            results.append((None, None))
+            continue
+        fields = seen.get(value, _UNSET)
+        if fields is _UNSET:
+            fields = seen[value] = display_fields(value, zone)
+        results.append(fields)
+    return results
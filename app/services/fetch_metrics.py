@@ -0,0 +1,223 @@
+"""取得処理のフェーズ別計測（DNS / 接続 / TLS / 最初のバイトまで / ダウンロード）。
+
+``TimedHTTPAdapter`` が新規接続時の DNS・TCP 接続・TLS ハンドシェイクの時間を
+スレッドローカルに書き込み、``scraping.fetch`` が応答ヘッダー到着と本文読了の
+時刻と合わせてホスト単位のヒストグラムへ記録する。
+"""
+from __future__ import annotations
+
+import bisect
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Final
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+PHASES: Final[tuple[str, ...]] = ("dns", "connect", "tls", "ttfb", "download", "total")
+
+# 秒単位のバケット上限（最後は +Inf）
+BUCKETS: Final[tuple[float, ...]] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"),
+)
+
+_local = threading.local()
+
+
+def begin() -> dict[str, float]:
+    """このスレッドで始まるリクエストのフェーズ記録を初期化して返す。"""
+
+    phases: dict[str, float] = {}
+    _local.phases = phases
+    return phases
+
+
+def _note(phase: str, elapsed: float) -> None:
+    phases = getattr(_local, "phases", None)
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + elapsed
+
+
+class _TimedConnectionMixin:
+    """名前解決と TCP 接続を分けて計測する。"""
+
+    def _new_conn(self) -> socket.socket:
+        started = time.perf_counter()
+        dns_host = self._dns_host  # type: ignore[attr-defined]
+        try:
+            infos = socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)  # type: ignore[attr-defined]
+        except OSError:
+            infos = []
+        resolved = time.perf_counter()
+        _note("dns", resolved - started)
+
+        # 解決済みアドレスを順に試す（urllib3 の create_connection と同じく、
+        # 先頭のアドレスに届かなければ次へ。IPv6 だけ不通なホストなど）
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            sock = super()._new_conn()  # type: ignore[misc]
+        else:
+            error: Exception | None = None
+            try:
+                for address in addresses:
+                    self._dns_host = address
+                    try:
+                        sock = super()._new_conn()  # type: ignore[misc]
+                        break
+                    except (NewConnectionError, ConnectTimeoutError, OSError) as exc:
+                        error = exc
+                else:
+                    assert error is not None
+                    raise error
+            finally:
+                self._dns_host = dns_host
+        _note("connect", time.perf_counter() - resolved)
+        return sock
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        phases = getattr(_local, "phases", None)
+        before = dict(phases) if phases is not None else {}
+        started = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - started
+        if phases is not None:
+            spent = sum(phases.get(name, 0.0) - before.get(name, 0.0) for name in ("dns", "connect"))
+            _note("tls", max(total - spent, 0.0))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """接続フェーズを計測するコネクションを使う ``HTTPAdapter``。"""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+@dataclass(slots=True)
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, ratio: float) -> float:
+        """バケット上限で近似したパーセンタイル。"""
+
+        if not self.count:
+            return 0.0
+        rank = ratio * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.maximum,
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(BUCKETS, self.counts)
+            },
+        }
+
+
+@dataclass(slots=True)
+class HostMetrics:
+    phases: dict[str, Histogram] = field(default_factory=dict)
+    statuses: dict[str, int] = field(default_factory=dict)
+    bytes_total: int = 0
+    requests: int = 0
+
+
+_REGISTRY: dict[str, HostMetrics] = {}
+_LOCK = threading.Lock()
+
+
+def reset() -> None:
+    with _LOCK:
+        _REGISTRY.clear()
+
+
+def record(host: str, phases: dict[str, float], *, status: int | str, size: int) -> None:
+    """1リクエスト分の計測値をホストのヒストグラムに加える。"""
+
+    _local.phases = None
+    with _LOCK:
+        metrics = _REGISTRY.get(host)
+        if metrics is None:
+            metrics = _REGISTRY[host] = HostMetrics()
+        metrics.requests += 1
+        metrics.bytes_total += size
+        key = str(status)
+        metrics.statuses[key] = metrics.statuses.get(key, 0) + 1
+        for phase, value in phases.items():
+            histogram = metrics.phases.get(phase)
+            if histogram is None:
+                histogram = metrics.phases[phase] = Histogram()
+            histogram.observe(value)
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    with _LOCK:
+        return {
+            host: {
+                "requests": metrics.requests,
+                "bytes": metrics.bytes_total,
+                "statuses": dict(metrics.statuses),
+                "phases": {
+                    phase: metrics.phases[phase].to_dict() for phase in PHASES if phase in metrics.phases
+                },
+            }
+            for host, metrics in _REGISTRY.items()
+        }
+
+
+def format_summary(data: dict[str, dict[str, Any]] | None = None) -> list[str]:
+    """CLI 向けの表形式サマリー（ミリ秒）。"""
+
+    data = snapshot() if data is None else data
+    lines: list[str] = []
+    for host, entry in sorted(data.items()):
+        statuses = " ".join(f"{status}={count}" for status, count in sorted(entry["statuses"].items()))
+        lines.append(f"{host}  requests={entry['requests']} bytes={entry['bytes']} {statuses}")
+        lines.append(f"  {'phase':<9}{'count':>7}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for phase, hist in entry["phases"].items():
+            lines.append(
+                f"  {phase:<9}{hist['count']:>7}{hist['p50'] * 1000:>10.1f}"
+                f"{hist['p95'] * 1000:>10.1f}{hist['max'] * 1000:>10.1f}"
+            )
+    return lines
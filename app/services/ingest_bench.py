@@ -0,0 +1,176 @@
+"""AI 推論をトランザクションの外に出したことによる取り込みスループットの計測。
+
+スレッドごとに記事を1件ずつ取り込み、AI 呼び出しは ``ai_latency`` 秒待つだけの
+代替に差し替えて、次の2通りを比べる。
+
+- ``held``: 以前の ``ingest_article`` の順序。記事を flush してから AI を呼び、
+  推論結果と一緒にコミットする。AI の応答待ちの間も書き込みトランザクションが
+  開いたままになる。
+- ``split``: 現在の ``ingest_article``。記事を先にコミットし、AI の結果は
+  短い別トランザクションで保存する。
+
+計測用の SQLite ファイルを一時ディレクトリに作るので、設定中の DB には触れない。
+SQLite では開いた書き込みトランザクションが他の書き込みを止めるため、
+``held`` のスループットはスレッド数を増やしてもほぼ ``1 / ai_latency`` に留まる。
+"""
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+from unittest import mock
+
+from requests import Response
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.article import Article
+from app.models.db import db
+
+from . import ai as ai_service
+from . import articles, synthetic_origin
+
+MODES = ("held", "split")
+DEFAULT_ARTICLES = 40
+DEFAULT_THREADS = 8
+DEFAULT_AI_LATENCY = 0.2
+
+
+@dataclass(slots=True)
+class IngestBenchResult:
+    mode: str
+    articles: int
+    threads: int
+    seconds: float
+    errors: int
+
+    @property
+    def per_sec(self) -> float:
+        return (self.articles - self.errors) / self.seconds if self.seconds > 0 else 0.0
+
+
+def _pages(count: int) -> list[tuple[str, Response]]:
+    settings = synthetic_origin.OriginSettings(body_bytes=2000)
+    pages = []
+    for article_id in range(1, count + 1):
+        url = f"http://localhost:5000/virtual-news/article/{article_id}"
+        response = Response()
+        response.status_code = 200
+        response.url = url
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response._content = synthetic_origin.render_article(synthetic_origin.article(settings, article_id)).encode(
+            "utf-8"
+        )
+        pages.append((url, response))
+    return pages
+
+
+def _fake_ai(latency: float):
+    def summarize_and_score(title: str, body: str) -> ai_service.AIResult:
+        time.sleep(latency)
+        return ai_service.AIResult(summary=title, risk_score=50, model="bench", prompt_version="bench")
+
+    return summarize_and_score
+
+
+def _ingest_held(url: str, response: Response) -> None:
+    source = articles.require_source(url)
+    parsed, response = articles.fetch_and_parse(source, url, None, response=response)
+    article = Article(url=parsed.url, title=parsed.title, published_at=parsed.published_at, body=parsed.body)
+    db.session.add(article)
+    db.session.flush()
+    ai_result = ai_service.summarize_and_score(article.title, article.body[:4000])
+    db.session.add(articles.inference_from(article.id, ai_result))
+    db.session.commit()
+
+
+def _ingest_split(url: str, response: Response) -> None:
+    result = articles.ingest_article(url, response=response)
+    if not result.ai_ran:
+        raise RuntimeError(result.ai_error or "AI was not run")
+
+
+def _bench_app(database: Path):
+    from app import create_app
+    from app.config import Config
+
+    config = type(
+        "IngestBenchConfig",
+        (Config,),
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}",
+            # ロック待ちでエラーにせず、待った時間をそのまま計測に含める
+            "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 120}},
+            "ENABLE_AI": True,
+            "RAW_STORE_ENABLED": False,
+            "PARSE_CACHE_SIZE": 0,
+            "INGEST_ASYNC": False,
+        },
+    )
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _run_mode(mode: str, pages: list[tuple[str, Response]], threads: int, workdir: Path) -> IngestBenchResult:
+    ingest = _ingest_held if mode == "held" else _ingest_split
+    app = _bench_app(workdir / f"{mode}.db")
+    errors = 0
+    lock = threading.Lock()
+
+    def work(page: tuple[str, Response]) -> None:
+        nonlocal errors
+        with app.app_context():
+            try:
+                ingest(*page)
+            except (SQLAlchemyError, articles.ArticleIngestionError, RuntimeError):
+                db.session.rollback()
+                with lock:
+                    errors += 1
+            finally:
+                db.session.remove()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, pages))
+    elapsed = time.perf_counter() - started
+    with app.app_context():
+        db.engine.dispose()
+    return IngestBenchResult(mode=mode, articles=len(pages), threads=threads, seconds=elapsed, errors=errors)
+
+
+def run(
+    *,
+    articles: int = DEFAULT_ARTICLES,
+    threads: int = DEFAULT_THREADS,
+    ai_latency: float = DEFAULT_AI_LATENCY,
+    modes: Iterable[str] = MODES,
+) -> dict[str, IngestBenchResult]:
+    """``modes`` ごとに ``articles`` 件を ``threads`` 本のスレッドで取り込み、所要時間を測る。"""
+
+    pages = _pages(articles)
+    results: dict[str, IngestBenchResult] = {}
+    with tempfile.TemporaryDirectory(prefix="ingest-bench-") as tmp, mock.patch.object(
+        ai_service, "summarize_and_score", _fake_ai(ai_latency)
+    ):
+        for mode in modes:
+            if mode not in MODES:
+                raise ValueError(f"unknown mode: {mode}")
+            results[mode] = _run_mode(mode, pages, threads, Path(tmp))
+    return results
+
+
+def format_results(results: dict[str, IngestBenchResult]) -> list[str]:
+    lines = [
+        f"{result.mode}: {result.articles} articles / {result.threads} threads"
+        f" in {result.seconds:.2f}s ({result.per_sec:.1f} articles/sec, errors={result.errors})"
+        for result in results.values()
+    ]
+    held, split = results.get("held"), results.get("split")
+    if held and split and held.per_sec:
+        lines.append(f"split/held: {split.per_sec / held.per_sec:.1f}x")
+    return lines
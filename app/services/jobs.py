@@ -0,0 +1,299 @@
+"""DB のテーブルを使った取り込みジョブのキュー。
+
+``POST /api/articles`` と ``/scrape`` は、取得・パース・AI 推論（最大
+``OPENAI_TIMEOUT`` 秒）が終わるまで Web ワーカーを占有していた。``INGEST_ASYNC``
+が有効なら、リクエストでは ``enqueue`` で ``jobs`` テーブルに1行追加するだけに
+して、実際の取り込みは別プロセスの ``flask jobs worker`` が ``ingest_article``
+で行う。状態は ``GET /api/jobs/<id>`` で参照できる。
+
+ワーカーは ``claim`` でジョブを1件取り、``JOBS_LEASE_SECONDS`` の間だけ
+自分のものにする。取り合いは ``status`` を条件にした UPDATE の件数で判定するので
+（PostgreSQL では ``FOR UPDATE SKIP LOCKED`` も使う）、複数プロセスで動かしても
+同じジョブを二重に処理しない。リースが切れた実行中ジョブ（ワーカーが落ちた場合）は
+再び取得対象になる。取得失敗など 5xx 相当の失敗は ``JOBS_MAX_ATTEMPTS`` 回まで
+``JOBS_RETRY_BACKOFF`` 秒（指数的に延ばす）後に再試行する。
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.db import db
+from app.models.job import Job
+
+from . import articles as article_service
+from . import canonical_url
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "succeeded", "failed")
+ACTIVE_STATUSES = ("queued", "running")
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 30.0
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def is_async() -> bool:
+    return bool(_config_get("INGEST_ASYNC", False))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(dt: datetime | None) -> str | None:
+    if dt is None:
+        return None
+    # SQLite からは naive で返るが、保存しているのは UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.isoformat()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"[:64]
+
+
+def enqueue(url: str, *, force: bool = False, run_ai: bool = True, force_ai: bool = False) -> Job:
+    """取り込みジョブを追加する。正規化した URL・同じ指定の未完了ジョブがあればそれを返す。"""
+
+    url = canonical_url.canonicalize(url)
+    article_service.require_source(url)
+    options = {"force": bool(force), "run_ai": bool(run_ai), "force_ai": bool(force_ai)}
+
+    active = db.session.scalars(
+        select(Job)
+        .where(Job.url == url, Job.status.in_(ACTIVE_STATUSES))
+        .order_by(Job.created_at)
+    )
+    for job in active:
+        if job.options == options:
+            return job
+
+    job = Job(
+        url=url,
+        options=options,
+        max_attempts=max(1, int(_config_get("JOBS_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))),
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    return db.session.get(Job, job_id)
+
+
+def job_to_dict(job: Job) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "url": job.url,
+        "options": job.options,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+    }
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        # ワーカーが落ちてリースが切れたもの
+        and_(Job.status == "running", Job.locked_until < now),
+    )
+
+
+def claim(worker_id: str, *, now: datetime | None = None) -> Job | None:
+    """実行できるジョブを1件取り、``worker_id`` のリースを付けて返す。無ければ ``None``。"""
+
+    now = now or _now()
+    lease = timedelta(seconds=float(_config_get("JOBS_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)))
+    # 候補を他のワーカーに先に取られたら次の候補を探す
+    for _ in range(5):
+        candidate = db.session.scalar(
+            select(Job.id)
+            .where(_claimable(now))
+            .order_by(Job.run_after, Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if candidate is None:
+            db.session.commit()
+            return None
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == candidate, _claimable(now))
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + lease,
+                started_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(Job, candidate)
+    return None
+
+
+def run(job: Job, worker_id: str) -> None:
+    """``claim`` したジョブを実行し、結果（または再試行予定）を保存する。"""
+
+    try:
+        result = article_service.ingest_article(job.url, **job.options)
+    except article_service.ArticleIngestionError as exc:
+        # 4xx 相当（対象外の URL・本文を解析できない）は何度やっても同じ
+        _finish_failed(job, worker_id, str(exc), retry=exc.status_code >= 500)
+    except Exception as exc:  # noqa: BLE001 - ワーカーを止めずに記録する
+        logger.exception("Job %s failed unexpectedly", job.id)
+        db.session.rollback()
+        _finish_failed(job, worker_id, f"取り込み中にエラーが発生しました: {exc}", retry=True)
+    else:
+        if not _still_owned(job, worker_id):
+            return
+        job.status = "succeeded"
+        job.result = {
+            "article_id": result.article.id,
+            "status": result.status,
+            "ai": {"enabled": result.ai_enabled, "run": result.ai_ran, "error": result.ai_error},
+        }
+        job.error = None
+        job.finished_at = _now()
+        job.locked_by = None
+        job.locked_until = None
+        db.session.commit()
+
+
+def _still_owned(job: Job, worker_id: str) -> bool:
+    db.session.refresh(job)
+    if job.locked_by == worker_id:
+        return True
+    # リースが切れて他のワーカーが取り直した。結果はそちらに任せる
+    logger.warning("Job %s lease was taken over by %s", job.id, job.locked_by)
+    return False
+
+
+def _finish_failed(job: Job, worker_id: str, message: str, *, retry: bool) -> None:
+    if not _still_owned(job, worker_id):
+        return
+    job.error = message
+    job.locked_by = None
+    job.locked_until = None
+    if retry and job.attempts < job.max_attempts:
+        backoff = float(_config_get("JOBS_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF))
+        job.status = "queued"
+        job.run_after = _now() + timedelta(seconds=backoff * 2 ** (job.attempts - 1))
+    else:
+        job.status = "failed"
+        job.finished_at = _now()
+    db.session.commit()
+
+
+def work(
+    worker_id: str | None = None,
+    *,
+    max_jobs: int | None = None,
+    until_idle: bool = False,
+    poll_interval: float | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """ジョブを取り出して処理し続ける。処理した件数を返す。
+
+    ``until_idle`` なら実行できるジョブが無くなった時点で戻る。そうでなければ
+    ``poll_interval`` 秒ごとにテーブルを見に行く。
+    """
+
+    worker_id = worker_id or default_worker_id()
+    if poll_interval is None:
+        poll_interval = float(_config_get("JOBS_POLL_INTERVAL", DEFAULT_POLL_INTERVAL))
+    processed = 0
+    while not (stop is not None and stop.is_set()):
+        if max_jobs is not None and processed >= max_jobs:
+            break
+        try:
+            job = claim(worker_id)
+        except SQLAlchemyError as exc:
+            logger.warning("Could not claim a job: %s", exc)
+            db.session.rollback()
+            job = None
+            if until_idle:
+                break
+        if job is None:
+            if until_idle:
+                break
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        run(job, worker_id)
+        processed += 1
+        # 記事や推論をセッションに溜め込まない
+        db.session.remove()
+    return processed
+
+
+def worker_main(max_jobs: int | None = None, poll_interval: float | None = None) -> None:
+    """``flask jobs worker --processes`` で起動する子プロセスの入口。"""
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        work(max_jobs=max_jobs, poll_interval=poll_interval)
+
+
+def start_workers(processes: int, *, max_jobs: int | None = None, poll_interval: float | None = None) -> None:
+    """ワーカーを ``processes`` 個の別プロセスで動かし、終わるまで待つ。"""
+
+    context = multiprocessing.get_context("spawn")
+    children = [
+        context.Process(target=worker_main, args=(max_jobs, poll_interval), name=f"jobs-worker-{n}")
+        for n in range(processes)
+    ]
+    for child in children:
+        child.start()
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        for child in children:
+            child.terminate()
+        for child in children:
+            child.join()
+
+
+def stats() -> dict[str, int]:
+    """状態ごとのジョブ数。"""
+
+    counts = dict.fromkeys(STATUSES, 0)
+    rows = db.session.execute(select(Job.status, func.count()).group_by(Job.status))
+    for status, count in rows:
+        counts[status] = count
+    return counts
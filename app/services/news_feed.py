@@ -9,9 +9,10 @@ from datetime import datetime, timezone
 from typing import Iterable, List, Sequence
 
 import requests
-from dateutil import parser as dateparser
 from flask import current_app
 
+from . import datetimes
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,8 +88,70 @@ def _request_timeout() -> int:
     return int(current_app.config.get("NEWS_FEED_TIMEOUT", 5))
 
 
+_ATOM_NEXT = "{http://www.w3.org/2005/Atom}link"
+
+
+def _fetch_paged_feed(feed_url: str, limit: int, provider: str) -> list[NewsFeedItem]:
+    """RSSを ``atom:link rel="next"`` をたどりながら ``limit`` 件まで読む。"""
+
+    items: list[NewsFeedItem] = []
+    provider_name = provider_label(provider)
+    next_url: str | None = feed_url
+    while next_url and len(items) < limit:
+        try:
+            response = requests.get(next_url, timeout=_request_timeout())
+            response.raise_for_status()
+            channel = ET.fromstring(response.content).find("channel")
+        except (requests.RequestException, ET.ParseError) as exc:
+            logger.warning("Failed to read feed %s: %s", next_url, exc)
+            break
+        if channel is None:
+            break
+
+        entries = []
+        for entry in channel.iterfind("item"):
+            link = (entry.findtext("link") or "").strip()
+            if not link:
+                continue
+            entries.append((entry, link))
+            if len(items) + len(entries) >= limit:
+                break
+        # pubDate はページ単位でまとめて正規化する
+        published = datetimes.parse_many((entry.findtext("pubDate") for entry, _ in entries), timezone.utc)
+        for (entry, link), published_at in zip(entries, published):
+            items.append(
+                NewsFeedItem(
+                    title=(entry.findtext("title") or "").strip(),
+                    url=link,
+                    published_at=datetimes.to_local(published_at, timezone.utc),
+                    source=provider_name,
+                    provider=provider,
+                )
+            )
+
+        next_url = None
+        for link in channel.iterfind(_ATOM_NEXT):
+            if link.get("rel") == "next":
+                next_url = link.get("href")
+                break
+    return items
+
+
 def fetch_latest_articles(limit: int = 6, provider: str = "virtual_news") -> list[NewsFeedItem]:
-    """指定したニュースプロバイダのRSSから最新記事をまとめて返す（モック版）。"""
+    """指定したニュースプロバイダのRSSから最新記事をまとめて返す（モック版）。
+
+    ``VIRTUAL_NEWS_FEED_URLS`` が設定されていれば（合成オリジンなど）そのRSSを
+    ページ送りしながら読み、未設定なら組み込みの ``ARTICLES`` を返す。
+    """
+
+    feed_urls = current_app.config.get("VIRTUAL_NEWS_FEED_URLS") or ()
+    if provider == "virtual_news" and feed_urls:
+        items: list[NewsFeedItem] = []
+        for feed_url in feed_urls:
+            items.extend(_fetch_paged_feed(feed_url, limit - len(items), provider))
+            if len(items) >= limit:
+                break
+        return items
 
     # Virtual Newsのデータを直接使用
     items = []
@@ -101,13 +164,12 @@ def fetch_latest_articles(limit: int = 6, provider: str = "virtual_news") -> lis
 
     for article in articles_list[:limit]:
         # published_atはISO文字列なのでdatetimeに変換
-        try:
-            published_at = datetime.fromisoformat(article['published_at'])
-            # タイムゾーン情報がない場合はUTCとする（簡易的）
-            if published_at.tzinfo is None:
-                published_at = published_at.replace(tzinfo=timezone.utc)
-        except ValueError:
+        # タイムゾーン情報がない場合はUTCとする（簡易的）
+        published_at = datetimes.parse_iso(article['published_at'])
+        if published_at is None:
             published_at = datetime.now(timezone.utc)
+        elif published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
 
         items.append(
             NewsFeedItem(
@@ -4,13 +4,38 @@
 from __future__ import annotations
 
 import json
+import logging
 import re
 from datetime import datetime
 
+from typing import Any
+
 from bs4 import BeautifulSoup
 from flask import current_app
+from lxml import etree
+
+from . import datetimes
+from .parsing import ParsedArticle, Selectors, class_xpath, compile_selectors, node_text, parse_tree
+
+logger = logging.getLogger(__name__)
+
+# 抽出結果が変わる修正をしたら上げる（パース結果のキャッシュが無効になる）
+PARSER_VERSION = 1
 
-from .parsing import ParsedArticle
+_ARTICLE_LINK = re.compile(r'/article/')
+_FEED_CHUNK = 16 * 1024
+
+# 本文は body_sentence 内の <p>、無ければ article 内の <p>
+SELECTORS = {
+    "json_ld": "//script[@type='application/ld+json']",
+    "og_title": "(//meta[@property='og:title'])[1]",
+    "h1": "(//h1)[1]",
+    "body_sentence": (
+        f"(//div[{class_xpath('article_body_text')}])[1]//div[@id='article_body_text_sentence']"
+    ),
+    "article": f"(//article[{class_xpath('article')}])[1]",
+}
+_SELECTORS = compile_selectors(SELECTORS)
 
 
 class NiftyNewsParser:
@@ -26,9 +51,53 @@ class NiftyNewsParser:
             url.startswith("https://news.nifty.com/article/")
         )
 
+    @staticmethod
+    def _absolute(href: str | None) -> str | None:
+        if href and href.startswith('/'):
+            return f"{NiftyNewsParser.BASE_URL}{href}"
+        return href or None
+
     @staticmethod
     def extract_article_url(html: str) -> str | None:
-        """トピックスページから記事URLを抽出"""
+        """トピックスページから記事URLを抽出
+
+        木は作らず ``meta`` と ``a`` の開始タグだけを先頭から順に調べ、
+        ``article_url`` メタタグが見つかった時点で解析を打ち切る。
+        """
+        parser = etree.HTMLPullParser(events=('start',), tag=('meta', 'a'))
+        meta_seen = False
+        first_link: str | None = None
+
+        def _scan() -> str | None:
+            nonlocal meta_seen, first_link
+            for _, element in parser.read_events():
+                if element.tag == 'meta':
+                    if meta_seen or element.get('name') != 'article_url':
+                        continue
+                    # 最初の article_url メタタグだけを見る
+                    meta_seen = True
+                    if element.get('content'):
+                        return element.get('content')
+                elif first_link is None:
+                    href = element.get('href')
+                    if href and _ARTICLE_LINK.search(href):
+                        first_link = href
+            return None
+
+        for offset in range(0, len(html), _FEED_CHUNK):
+            parser.feed(html[offset:offset + _FEED_CHUNK])
+            found = _scan()
+            if found:
+                return found
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        return _scan() or NiftyNewsParser._absolute(first_link)
+
+    @staticmethod
+    def extract_article_url_soup(html: str) -> str | None:
+        """BeautifulSoup による従来の ``extract_article_url``（同等性確認用）。"""
         soup = BeautifulSoup(html, 'lxml')
         
         # article_urlメタタグから取得
@@ -47,17 +116,88 @@ class NiftyNewsParser:
         return None
 
     @staticmethod
-    def parse_article(html: str, url: str) -> ParsedArticle:
+    def parse_article(html: str, url: str, selectors: Selectors | None = None) -> ParsedArticle:
         """
         @niftyニュース記事をパース
-        
+
+        JSON-LD、og:title、最初の h1、``article_body_text`` 内の段落だけを
+        コンパイル済み XPath で取り出す。結果は ``parse_article_soup`` と同じ。
+
         Args:
             html: HTML文字列
             url: 記事URL
-            
+            selectors: ``SELECTORS`` と同じキーのコンパイル済み XPath（ソース登録時に渡す）
+
         Returns:
             ParsedArticle: パース結果
         """
+        selectors = selectors or _SELECTORS
+        root = parse_tree(html)
+
+        title = None
+        published_at = None
+        description = None
+        if root is not None:
+            title, published_at, description = NiftyNewsParser._from_json_ld(selectors["json_ld"](root))
+
+        # タイトルフォールバック
+        if not title and root is not None:
+            og_title = selectors["og_title"](root)
+            if og_title and og_title[0].get('content'):
+                title = og_title[0].get('content').replace('｜ニフティニュース', '').strip()
+            if not title:
+                h1_tag = selectors["h1"](root)
+                if h1_tag:
+                    title = node_text(h1_tag[0])
+
+        # 本文取得
+        body_parts: list[str] = []
+        if root is not None:
+            sentence = selectors["body_sentence"](root)
+            if sentence:
+                for p in sentence[0].iter('p'):
+                    text = node_text(p)
+                    # リンクテキストやキーワードを除外
+                    if text and len(text) > 15 and not text.startswith('【'):
+                        body_parts.append(text)
+
+            # フォールバック: article タグ内のpタグ
+            if not body_parts:
+                article_tag = selectors["article"](root)
+                if article_tag:
+                    for p in article_tag[0].iter('p'):
+                        text = node_text(p)
+                        if text and len(text) > 15:
+                            body_parts.append(text)
+
+        body = '\n\n'.join(body_parts) if body_parts else description or ""
+
+        return ParsedArticle(
+            url=url,
+            title=title or "タイトル不明",
+            published_at=published_at,
+            body=body or "本文取得失敗"
+        )
+
+    @staticmethod
+    def _from_json_ld(scripts: list[Any]) -> tuple[str | None, datetime | None, str | None]:
+        for script in scripts:
+            try:
+                if not script.text:
+                    continue
+                data = json.loads(script.text)
+                if isinstance(data, dict) and data.get('@type') == 'NewsArticle':
+                    published_at = datetimes.parse_iso(data.get('datePublished'))
+                    return data.get('headline'), published_at, data.get('description', '')
+            except (json.JSONDecodeError, ValueError, AttributeError) as e:
+                # プロセスプールのワーカーからも呼ばれるのでアプリのロガーは使わない
+                logger.debug("JSON-LD parse error: %s", e)
+                continue
+        return None, None, None
+
+    @staticmethod
+    def parse_article_soup(html: str, url: str) -> ParsedArticle:
+        """BeautifulSoup による従来の ``parse_article``（同等性確認用）。"""
         soup = BeautifulSoup(html, 'lxml')
 
         # JSON-LDから情報取得（最優先）
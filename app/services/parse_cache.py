@@ -0,0 +1,189 @@
+"""パース結果のメモ化。
+
+同じ HTML を同じパーサーで読み直すと結果も同じなので、（パーサーID, パーサー
+バージョン, HTML の SHA-256）をキーに ``ParsedArticle`` を保存して使い回す。
+プロセス内の LRU（``PARSE_CACHE_SIZE`` 件）と、``PARSE_CACHE_DIR`` を指定した
+ときだけ使うディスク上の JSON の2段構成。
+
+パーサーを直したらそのモジュールの ``PARSER_VERSION`` を上げる。バージョン（と
+セレクタ）はキーに含まれるため、古い結果は参照されなくなる。ディスク上では
+バージョンごとにディレクトリが分かれるので、古いディレクトリは消してよい。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from flask import current_app, has_app_context
+
+from . import parsing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = 256
+
+
+class CacheKey(NamedTuple):
+    parser: str
+    version: str
+    sha256: str
+
+
+_ENTRIES: OrderedDict[CacheKey, parsing.ParsedArticle] = OrderedDict()
+_STATS = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+_LOCK = threading.Lock()
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def max_entries() -> int:
+    return max(0, int(_config_get("PARSE_CACHE_SIZE", DEFAULT_SIZE)))
+
+
+def cache_dir() -> Path | None:
+    configured = _config_get("PARSE_CACHE_DIR", "")
+    return Path(configured) if configured else None
+
+
+def is_enabled() -> bool:
+    return max_entries() > 0 or cache_dir() is not None
+
+
+def key(parser: str, version: str, html: str) -> CacheKey:
+    return CacheKey(parser, version, hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest())
+
+
+def get(cache_key: CacheKey, url: str) -> parsing.ParsedArticle | None:
+    """保存済みの結果（``url`` は今回の値に差し替えたコピー）。無ければ ``None``。"""
+
+    with _LOCK:
+        parsed = _ENTRIES.get(cache_key)
+        if parsed is not None:
+            _ENTRIES.move_to_end(cache_key)
+            _STATS["hits"] += 1
+    if parsed is None:
+        root = cache_dir()
+        parsed = _read_disk(root, cache_key) if root is not None else None
+        with _LOCK:
+            if parsed is None:
+                _STATS["misses"] += 1
+                return None
+            _STATS["disk_hits"] += 1
+        _remember(cache_key, parsed, max_entries())
+    # 呼び出し側が書き換えても保存済みの値に影響しないようにコピーを返す
+    return replace(parsed, url=url)
+
+
+def put(cache_key: CacheKey, parsed: parsing.ParsedArticle) -> None:
+    parsed = replace(parsed)
+    _remember(cache_key, parsed, max_entries())
+    root = cache_dir()
+    if root is not None:
+        try:
+            _write_disk(root, cache_key, parsed)
+        except OSError as exc:
+            logger.warning("Could not write parse cache entry %s: %s", cache_key.sha256, exc)
+    with _LOCK:
+        _STATS["stores"] += 1
+
+
+def _remember(cache_key: CacheKey, parsed: parsing.ParsedArticle, limit: int) -> None:
+    if limit <= 0:
+        return
+    with _LOCK:
+        _ENTRIES[cache_key] = parsed
+        _ENTRIES.move_to_end(cache_key)
+        while len(_ENTRIES) > limit:
+            _ENTRIES.popitem(last=False)
+
+
+def _disk_path(root: Path, cache_key: CacheKey) -> Path:
+    return root / cache_key.parser / cache_key.version / cache_key.sha256[:2] / f"{cache_key.sha256}.json"
+
+
+def _read_disk(root: Path, cache_key: CacheKey) -> parsing.ParsedArticle | None:
+    try:
+        data = json.loads(_disk_path(root, cache_key).read_text(encoding="utf-8"))
+        published_at = data["published_at"]
+        return parsing.ParsedArticle(
+            url=data["url"],
+            title=data["title"],
+            published_at=datetime.fromisoformat(published_at) if published_at else None,
+            body=data["body"],
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable parse cache entry %s: %s", cache_key.sha256, exc)
+        return None
+
+
+def _write_disk(root: Path, cache_key: CacheKey, parsed: parsing.ParsedArticle) -> None:
+    path = _disk_path(root, cache_key)
+    data = {
+        "url": parsed.url,
+        "title": parsed.title,
+        "published_at": parsed.published_at.isoformat() if parsed.published_at else None,
+        "body": parsed.body,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def stats() -> dict[str, float]:
+    """ヒット数・ミス数・ヒット率とメモリ上の件数。このプロセス内の集計。"""
+
+    with _LOCK:
+        hits, disk_hits, misses = _STATS["hits"], _STATS["disk_hits"], _STATS["misses"]
+        lookups = hits + disk_hits + misses
+        return {
+            "hits": hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "stores": _STATS["stores"],
+            "hit_ratio": (hits + disk_hits) / lookups if lookups else 0.0,
+            "entries": len(_ENTRIES),
+        }
+
+
+def format_stats() -> str:
+    return "parse cache: hits={hits} disk_hits={disk_hits} misses={misses} ({hit_ratio:.0%}) entries={entries}".format(
+        **stats()
+    )
+
+
+def reset_stats() -> None:
+    with _LOCK:
+        for name in _STATS:
+            _STATS[name] = 0
+
+
+def clear() -> None:
+    """メモリ上の結果と集計を捨てる（ディスク上のファイルは残す）。"""
+
+    with _LOCK:
+        _ENTRIES.clear()
+    reset_stats()
@@ -0,0 +1,92 @@
+"""記事パースをプロセスプールで並列化する。
+
+パースは CPU 処理で GIL に縛られるため、バッチ取り込みでは取得を並行にしても
+1コアしか使えない。ここでは取得済みの本文バイト列と文字コード、ソース種別を
+ワーカープロセスへ渡し、``ParsedArticle`` を受け取る。親プロセスでは本文を
+デコードせず、バイト列と Content-Type をそのまま1回のコピーで受け渡す。
+
+``PARSE_WORKERS`` が 0 の場合（既定）はプールを作らず、呼び出し側でその場で
+パースする。
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from flask import current_app, has_app_context
+from requests import Response
+
+from . import parsing, sources
+
+logger = logging.getLogger(__name__)
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def parse_text(source: str, url: str, html: str) -> parsing.ParsedArticle:
+    """ソース別のパーサーで HTML を解析する（追加の取得は行わない）。"""
+
+    return sources.get(source).parse(url, html)
+
+
+def _parse_payload(source: str, url: str, content: bytes, content_type: str | None) -> parsing.ParsedArticle:
+    return sources.get(source).parse_bytes(url, content, content_type)
+
+
+def can_offload(source: str, response: Response) -> bool:
+    """ワーカーで完結するか。@nifty のトピックスページなどは記事ページの再取得が要る。"""
+
+    return not sources.get(source).should_follow(response.url or "")
+
+
+def configured_workers() -> int:
+    return max(int(_config_get("PARSE_WORKERS", 0) or 0), 0)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """``workers`` 個のワーカーを持つ共有プールを返す（数が変われば作り直す）。"""
+
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=True)
+            # 取得スレッドが動いている親を fork しないよう spawn を使う
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        pool, _POOL, _POOL_WORKERS = _POOL, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def submit(
+    source: str,
+    response: Response,
+    *,
+    workers: int | None = None,
+) -> Future[parsing.ParsedArticle] | None:
+    """パースをプールに投入する。プール無効時やワーカーで扱えない場合は ``None``。"""
+
+    workers = configured_workers() if workers is None else workers
+    if workers <= 0 or not can_offload(source, response):
+        return None
+    return get_pool(workers).submit(
+        _parse_payload, source, response.url, response.content or b"", parsing.response_content_type(response)
+    )
@@ -0,0 +1,282 @@
+"""記事パーサーのスループット計測。
+
+``tests/fixtures/parser_corpus`` の HTML（``<ソース名>__<種別>.html``）を
+ソースごとのパーサーで繰り返し解析し、docs/sec・bytes/sec・ピークメモリを
+求める。保存済みのベースラインと比べて docs/sec が ``threshold`` を超えて
+落ちたソースを回帰として返す。
+
+ピークメモリは ``tracemalloc`` による Python ヒープ上の値で、lxml（libxml2）が
+C 側で確保する木の分は含まれない。
+
+``bench_decode`` は本文バイト列を文字列にする処理だけを比べる。``response.text``
+（``encoding`` が無いときの requests の文字コード推定）と
+``parsing.decode_html``（BOM・ヘッダー・meta から決める fast path）の
+1記事あたり CPU 時間を求める。
+"""
+from __future__ import annotations
+
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import lxml
+from requests import Response
+
+from . import parsing, sources
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CORPUS = BASE_DIR / "tests" / "fixtures" / "parser_corpus"
+DEFAULT_BASELINE = DEFAULT_CORPUS / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# ソースごとのパーサーが受け付ける URL（fixture の解析時に渡す）
+SAMPLE_URLS = {
+    "nifty_news": "https://news.nifty.com/article/domestic/bench/1/",
+    "virtual_news": "http://localhost:5000/virtual-news/article/1",
+    "yahoo_news": "https://news.yahoo.co.jp/articles/bench",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class CorpusDoc:
+    source: str
+    kind: str
+    url: str
+    html: str
+
+    @property
+    def size(self) -> int:
+        return len(self.html.encode("utf-8"))
+
+
+@dataclass(slots=True)
+class BenchResult:
+    source: str
+    docs: int
+    docs_per_sec: float
+    bytes_per_sec: float
+    peak_kib: float
+
+
+@dataclass(slots=True)
+class DecodeResult:
+    source: str
+    docs: int
+    detect_ms: float
+    fast_ms: float
+
+    @property
+    def saved_ms(self) -> float:
+        return self.detect_ms - self.fast_ms
+
+
+@dataclass(slots=True, frozen=True)
+class Regression:
+    source: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else 0.0
+
+
+def load_corpus(path: Path = DEFAULT_CORPUS) -> list[CorpusDoc]:
+    """コーパスを読み込む。登録されていないソース名のファイルは ``ValueError``。"""
+
+    docs = []
+    for file in sorted(path.glob("*.html")):
+        source, sep, kind = file.stem.partition("__")
+        if not sep:
+            raise ValueError(f"{file.name}: ファイル名は <ソース名>__<種別>.html にしてください。")
+        try:
+            sources.get(source)
+        except KeyError:
+            raise ValueError(f"{file.name}: 未登録のソース {source!r} です。") from None
+        url = SAMPLE_URLS.get(source, f"https://example.com/{source}/{kind}")
+        docs.append(CorpusDoc(source, kind, url, file.read_text(encoding="utf-8")))
+    return docs
+
+
+def _parse_all(docs: Iterable[CorpusDoc]) -> None:
+    for doc in docs:
+        source = sources.get(doc.source)
+        try:
+            # ソース別の計時（sources.timing_stats）に混ざらないよう spec を直接呼ぶ
+            source.spec.parse(doc.html, doc.url, source.selectors)
+        except parsing.ParseError:
+            # 壊れた文書で本文が取れないのも計測対象の挙動
+            pass
+
+
+def bench_source(docs: list[CorpusDoc], *, rounds: int = 5, min_time: float = 0.2) -> BenchResult:
+    """1ソース分の文書を計測する。各ラウンドは ``min_time`` 秒以上回し、最良値を採る。"""
+
+    if not docs:
+        raise ValueError("文書がありません。")
+    # 初回のみのコスト（XPath の初回評価など）を除く
+    _parse_all(docs)
+
+    best = 0.0
+    for _ in range(rounds):
+        passes = 0
+        started = time.perf_counter()
+        while True:
+            _parse_all(docs)
+            passes += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = max(best, passes / elapsed)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline_size, _ = tracemalloc.get_traced_memory()
+    peak = 0
+    for doc in docs:
+        _parse_all([doc])
+        _, doc_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, doc_peak - baseline_size)
+        tracemalloc.reset_peak()
+    if not tracing:
+        tracemalloc.stop()
+
+    total_bytes = sum(doc.size for doc in docs)
+    return BenchResult(
+        source=docs[0].source,
+        docs=len(docs),
+        docs_per_sec=best * len(docs),
+        bytes_per_sec=best * total_bytes,
+        peak_kib=peak / 1024,
+    )
+
+
+def run(
+    corpus: list[CorpusDoc],
+    *,
+    only: Iterable[str] = (),
+    rounds: int = 5,
+    min_time: float = 0.2,
+) -> dict[str, BenchResult]:
+    """コーパスをソースごとにまとめて計測する。``only`` でソースを絞り込める。"""
+
+    selected = set(only)
+    grouped: dict[str, list[CorpusDoc]] = {}
+    for doc in corpus:
+        if not selected or doc.source in selected:
+            grouped.setdefault(doc.source, []).append(doc)
+    return {
+        source: bench_source(docs, rounds=rounds, min_time=min_time)
+        for source, docs in sorted(grouped.items())
+    }
+
+
+def _detect_decode(payloads: list[bytes]) -> None:
+    for content in payloads:
+        response = Response()
+        response._content = content
+        response.encoding = None
+        response.text
+
+
+def _fast_decode(payloads: list[bytes]) -> None:
+    for content in payloads:
+        parsing.decode_html(content, "text/html")
+
+
+def _cpu_ms_per_doc(func, payloads: list[bytes], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.process_time()
+        func(payloads)
+        best = min(best, time.process_time() - started)
+    return best * 1000 / len(payloads)
+
+
+def bench_decode(corpus: list[CorpusDoc], *, only: Iterable[str] = (), rounds: int = 5) -> dict[str, DecodeResult]:
+    """ソースごとに、本文デコードの1記事あたり CPU 時間（ms）を推定あり/なしで比べる。"""
+
+    selected = set(only)
+    grouped: dict[str, list[bytes]] = {}
+    for doc in corpus:
+        if not selected or doc.source in selected:
+            grouped.setdefault(doc.source, []).append(doc.html.encode("utf-8"))
+    return {
+        source: DecodeResult(
+            source=source,
+            docs=len(payloads),
+            detect_ms=_cpu_ms_per_doc(_detect_decode, payloads, rounds),
+            fast_ms=_cpu_ms_per_doc(_fast_decode, payloads, rounds),
+        )
+        for source, payloads in sorted(grouped.items())
+    }
+
+
+def format_decode_results(results: dict[str, DecodeResult]) -> list[str]:
+    return [
+        f"{source}: decode response.text={result.detect_ms:.2f}ms/doc"
+        f" decode_html={result.fast_ms:.2f}ms/doc saved={result.saved_ms:.2f}ms/doc"
+        for source, result in sorted(results.items())
+    ]
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE) -> dict[str, dict[str, float]]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get("results", {})
+
+
+def save_baseline(results: dict[str, BenchResult], path: Path = DEFAULT_BASELINE) -> None:
+    data: dict[str, Any] = {
+        "python": platform.python_version(),
+        "lxml": lxml.__version__,
+        "machine": platform.machine(),
+        "results": {source: _rounded(asdict(result)) for source, result in sorted(results.items())},
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def _rounded(values: dict[str, Any]) -> dict[str, Any]:
+    values.pop("source", None)
+    return {key: round(value, 1) if isinstance(value, float) else value for key, value in values.items()}
+
+
+def compare(
+    results: dict[str, BenchResult],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """docs/sec がベースラインより ``threshold``（割合）を超えて落ちたソース。"""
+
+    regressions = []
+    for source, result in sorted(results.items()):
+        expected = baseline.get(source, {}).get("docs_per_sec")
+        if not expected:
+            continue
+        if result.docs_per_sec < expected * (1 - threshold):
+            regressions.append(Regression(source, expected, result.docs_per_sec))
+    return regressions
+
+
+def format_results(
+    results: dict[str, BenchResult],
+    baseline: dict[str, dict[str, float]] | None = None,
+) -> list[str]:
+    lines = []
+    for source, result in sorted(results.items()):
+        line = (
+            f"{source}: docs={result.docs} {result.docs_per_sec:.1f} docs/sec"
+            f" {result.bytes_per_sec / 1024 / 1024:.2f} MiB/sec peak={result.peak_kib:.0f}KiB"
+        )
+        expected = (baseline or {}).get(source, {}).get("docs_per_sec")
+        if expected:
+            line += f" (baseline {expected:.1f}, {result.docs_per_sec / expected - 1:+.0%})"
+        lines.append(line)
+    return lines
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import codecs
 import json
+import re
+import threading
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Mapping
 
 from bs4 import BeautifulSoup
-from dateutil import parser as dateparser
+from lxml import etree
+
+from . import datetimes
 
 
 @dataclass(slots=True)
@@ -21,10 +26,397 @@ class ParseError(RuntimeError):
     pass
 
 
+# 汎用抽出の結果が変わる修正をしたら上げる（パース結果のキャッシュが無効になる）
+PARSER_VERSION = 1
+
 JSON_LD_TYPES = {"NewsArticle", "Article"}
 
 
+def class_xpath(name: str) -> str:
+    """``class`` 属性にトークン ``name`` を含むかを判定する XPath 述語。"""
+
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+Selectors = Mapping[str, etree.XPath]
+
+
+def compile_selectors(expressions: Mapping[str, str]) -> dict[str, etree.XPath]:
+    """名前 → XPath 式の対応をコンパイルする。"""
+
+    return {name: etree.XPath(expression) for name, expression in expressions.items()}
+
+
+# 抽出に使う要素を1回の走査で文書順に集める
+_CANDIDATES = etree.XPath(
+    "//script[@type='application/ld+json'] | //meta[@property or @name] | //title | //h1 | //time"
+    " | //p[ancestor::article or ancestor::div[@id='uamods-pickup']"
+    f" or ancestor::div[{class_xpath('article_body')}]]"
+    f" | //div[{class_xpath('article_body__item')}]"
+)
+# BeautifulSoup の get_text と同じく script/style/template やルビの読みは本文に含めない
+_TEXT = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template or ancestor::rt or ancestor::rp)]"
+)
+_META_KEYS = ("datePublished", "article:published_time", "pubdate")
+
+
+@dataclass(slots=True)
+class _Extracted:
+    json_ld: list[str]
+    title: Any = None
+    h1: Any = None
+    time: Any = None
+    meta_by_property: dict[str, Any] | None = None
+    meta_by_name: dict[str, Any] | None = None
+    # _extract_body_from_dom の候補セレクタごとのノード
+    body: tuple[list[Any], list[Any], list[Any], list[Any]] | None = None
+
+
+def node_text(node: Any) -> str:
+    """``get_text(strip=True)`` 相当。"""
+
+    return "".join(part.strip() for part in _TEXT(node))
+
+
+def _scan(root: Any) -> _Extracted:
+    found = _Extracted(json_ld=[], meta_by_property={}, meta_by_name={}, body=([], [], [], []))
+    article_p, body_p, body_item, pickup_p = found.body
+    for node in _CANDIDATES(root):
+        tag = node.tag
+        if tag == "p":
+            in_article = in_body = in_pickup = False
+            for ancestor in node.iterancestors("article", "div"):
+                if ancestor.tag == "article":
+                    in_article = True
+                elif ancestor.get("id") == "uamods-pickup":
+                    in_pickup = True
+                elif "article_body" in (ancestor.get("class") or "").split():
+                    in_body = True
+            if in_article:
+                article_p.append(node)
+            if in_body:
+                body_p.append(node)
+            if in_pickup:
+                pickup_p.append(node)
+        elif tag == "div":
+            body_item.append(node)
+        elif tag == "meta":
+            prop = node.get("property")
+            if prop is not None:
+                found.meta_by_property.setdefault(prop, node)
+            name = node.get("name")
+            if name is not None:
+                found.meta_by_name.setdefault(name, node)
+        elif tag == "script":
+            found.json_ld.append(node.text or "")
+        elif tag == "title":
+            if found.title is None:
+                found.title = node
+        elif tag == "h1":
+            if found.h1 is None:
+                found.h1 = node
+        elif tag == "time":
+            if found.time is None:
+                found.time = node
+    return found
+
+
+# 文字コードの判定は BOM → Content-Type の charset → 先頭の <meta charset> → UTF-8 の順。
+# 統計的な推定（requests の apparent_encoding）は行わない
+SNIFF_BYTES = 4096
+_HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([^"';\s]+)""", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([A-Za-z0-9._:-]+)""", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# ブラウザ（WHATWG Encoding Standard）と同じく Shift_JIS は上位集合の cp932 で読む
+_ENCODING_ALIASES = {"shift_jis": "cp932"}
+
+
+def _normalize_encoding(name: str | None) -> str | None:
+    if not name:
+        return None
+    try:
+        encoding = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    return _ENCODING_ALIASES.get(encoding, encoding)
+
+
+def declared_encoding(content_type: str | None) -> str | None:
+    """Content-Type ヘッダーの charset。無い・不明なら ``None``。"""
+
+    match = _HEADER_CHARSET.search(content_type or "")
+    return _normalize_encoding(match.group(1)) if match else None
+
+
+def _bom_encoding(content: bytes) -> str | None:
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def sniff_encoding(content: bytes) -> str | None:
+    """本文先頭の BOM か ``<meta charset>``（http-equiv を含む）から文字コードを得る。"""
+
+    bom = _bom_encoding(content)
+    if bom:
+        return bom
+    match = _META_CHARSET.search(content[:SNIFF_BYTES])
+    if match is None:
+        return None
+    encoding = _normalize_encoding(match.group(1).decode("ascii"))
+    # バイト列が ASCII 互換と分かった後なので、meta の UTF-16 指定は UTF-8 とみなす
+    if encoding and encoding.startswith("utf-16"):
+        return "utf-8"
+    return encoding
+
+
+def resolve_encoding(content: bytes, content_type: str | None = None) -> str:
+    """本文の文字コード。BOM、ヘッダー、meta の順に見て、どれも無ければ UTF-8。"""
+
+    return _bom_encoding(content) or declared_encoding(content_type) or sniff_encoding(content) or "utf-8"
+
+
+def decode_html(content: bytes, content_type: str | None = None) -> str:
+    """本文のバイト列を ``resolve_encoding`` の文字コードでデコードする（不正なバイトは置換）。"""
+
+    return content.decode(resolve_encoding(content, content_type), errors="replace")
+
+
+def response_content_type(response: Any) -> str | None:
+    """文字コード判定に使う Content-Type。
+
+    ヘッダーが無いのに ``encoding`` が設定されている応答（モックや手で組み立てた
+    もの）は、その ``encoding`` を charset として扱う。
+    """
+
+    content_type = response.headers.get("Content-Type")
+    if content_type is None and response.encoding:
+        return f"text/html; charset={response.encoding}"
+    return content_type
+
+
+def response_html(response: Any) -> str:
+    """``requests.Response`` の本文を文字コード推定なしでデコードする（``response.text`` の代わり）。"""
+
+    return decode_html(response.content or b"", response_content_type(response))
+
+
+def parse_tree(html: str) -> Any | None:
+    """lxml の HTML 木を返す。空文書など解析できなければ ``None``。"""
+
+    parser = etree.HTMLParser()
+    try:
+        parser.feed(html)
+        return parser.close()
+    except etree.XMLSyntaxError:
+        # 空文書など
+        return None
+
+
+class StreamingParse:
+    """ダウンロード中のチャンクから HTML 木を組み立てる。
+
+    ``until``（タグ名, class トークン）の要素が閉じた時点で ``done`` になり、
+    以降の本文は不要になる。``start`` に Content-Type を渡してから ``feed`` する。
+    文字コードは先頭 ``SNIFF_BYTES`` バイトが揃った時点で ``resolve_encoding`` と
+    同じ規則で決め、以降はインクリメンタルにデコードして渡す。
+    """
+
+    def __init__(self, until: tuple[str, str]):
+        self.tag, self.class_name = until
+        self.done = False
+        self.bytes_fed = 0
+        self.encoding: str | None = None
+        self._content_type: str | None = None
+        self._head = b""
+        self._decoder: codecs.IncrementalDecoder | None = None
+        self._parser: etree.HTMLPullParser | None = None
+
+    def start(self, content_type: str | None) -> None:
+        self._content_type = content_type
+
+    def feed(self, chunk: bytes) -> bool:
+        """チャンクを追加し、必要な部分を読み終えたら ``True`` を返す。"""
+
+        if self.done:
+            return True
+        self.bytes_fed += len(chunk)
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES:
+                return False
+            chunk, self._head = self._head, b""
+            self._begin(chunk)
+        self._feed_text(self._decoder.decode(chunk))
+        return self.done
+
+    def _begin(self, head: bytes) -> None:
+        self.encoding = resolve_encoding(head, self._content_type)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._parser = etree.HTMLPullParser(events=("end",), tag=self.tag)
+
+    def _feed_text(self, text: str) -> None:
+        if not text:
+            return
+        self._parser.feed(text)
+        for _, element in self._parser.read_events():
+            if self.class_name in (element.get("class") or "").split():
+                self.done = True
+                break
+
+    def close(self) -> Any | None:
+        """組み立てた木。何も読めていなければ ``None``。"""
+
+        if self._decoder is None:
+            if not self._head:
+                return None
+            self._begin(self._head)
+            self._feed_text(self._decoder.decode(self._head))
+            self._head = b""
+        self._feed_text(self._decoder.decode(b"", final=True))
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            return None
+
+
+# DOM を作らずに JSON-LD ブロックを拾うための事前走査
+_JSON_LD_SCRIPT = re.compile(
+    r"""<script(?=[^>]*\stype\s*=\s*(["']?)(?-i:application/ld\+json)\1[\s/>])[^>]*>(.*?)</script\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_PATH_STATS = {"fast": 0, "slow": 0}
+_PATH_LOCK = threading.Lock()
+
+
+def _count_path(path: str) -> None:
+    with _PATH_LOCK:
+        _PATH_STATS[path] += 1
+
+
+def path_stats() -> dict[str, float]:
+    """JSON-LD だけで済んだ件数（fast）と DOM を構築した件数（slow）。"""
+
+    with _PATH_LOCK:
+        fast, slow = _PATH_STATS["fast"], _PATH_STATS["slow"]
+    total = fast + slow
+    return {"fast": fast, "slow": slow, "fast_ratio": fast / total if total else 0.0}
+
+
+def reset_path_stats() -> None:
+    with _PATH_LOCK:
+        _PATH_STATS["fast"] = _PATH_STATS["slow"] = 0
+
+
+def _prescan_json_ld(html: str) -> list[str]:
+    scripts = []
+    for match in _JSON_LD_SCRIPT.finditer(html):
+        start = match.start()
+        if html.rfind("<!--", 0, start) > html.rfind("-->", 0, start):
+            # コメント内のブロックは DOM には現れない
+            continue
+        scripts.append(match.group(2))
+    return scripts
+
+
 def parse_article(url: str, html: str) -> ParsedArticle:
+    """記事HTMLからタイトル・公開日時・本文を抽出する。
+
+    JSON-LD にタイトルと本文が揃っていれば DOM を作らずに返す（fast path）。
+    それ以外は lxml で1度だけ木を作り、必要な要素をコンパイル済み XPath で
+    まとめて拾う。結果は ``parse_article_soup`` と同じになる。
+    """
+
+    data = _first_json_ld(_prescan_json_ld(html))
+    if data and (data.get("title") or data.get("headline")) and data.get("articleBody"):
+        _count_path("fast")
+        return ParsedArticle(
+            url=url,
+            title=data.get("title") or data.get("headline"),
+            published_at=_parse_datetime(data.get("datePublished")),
+            body=data.get("articleBody"),
+        )
+
+    _count_path("slow")
+    root = parse_tree(html)
+    if root is None:
+        raise ParseError("本文を抽出できませんでした。")
+    found = _scan(root)
+
+    data = _first_json_ld(found.json_ld)
+    if data:
+        title = data.get("title") or data.get("headline") or _lxml_fallback_title(found)
+        published = _parse_datetime(data.get("datePublished"))
+        body = data.get("articleBody") or _lxml_body(found)
+        return ParsedArticle(url=url, title=title, published_at=published, body=body)
+
+    title = _lxml_fallback_title(found)
+    published = _parse_datetime(_lxml_meta_content(found))
+    body = _lxml_body(found)
+
+    if not body:
+        raise ParseError("本文を抽出できませんでした。")
+
+    return ParsedArticle(url=url, title=title, published_at=published, body=body)
+
+
+def _first_json_ld(scripts: list[str]) -> dict[str, Any] | None:
+    for raw_json in scripts:
+        if not raw_json.strip():
+            continue
+        try:
+            data = json.loads(raw_json, strict=False)
+        except json.JSONDecodeError:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        for candidate in candidates:
+            if isinstance(candidate, dict) and candidate.get("@type") in JSON_LD_TYPES:
+                return candidate
+    return None
+
+
+def _lxml_fallback_title(found: _Extracted) -> str:
+    og = found.meta_by_property.get("og:title")
+    if og is not None and og.get("content"):
+        return og.get("content").strip()
+    if found.title is not None and found.title.text:
+        return found.title.text.strip()
+    if found.h1 is not None:
+        return node_text(found.h1)
+    return "(タイトル不明)"
+
+
+def _lxml_meta_content(found: _Extracted) -> str | None:
+    for attr in _META_KEYS:
+        meta = found.meta_by_property.get(attr)
+        if meta is None:
+            meta = found.meta_by_name.get(attr)
+        if meta is not None and meta.get("content"):
+            return meta.get("content").strip()
+    if found.time is not None:
+        return found.time.get("datetime") or node_text(found.time) or None
+    return None
+
+
+def _lxml_body(found: _Extracted) -> str:
+    for nodes in found.body:
+        paragraphs = [text for text in map(node_text, nodes) if text]
+        if paragraphs:
+            return "\n\n".join(paragraphs)
+    return ""
+
+
+def parse_article_soup(url: str, html: str) -> ParsedArticle:
+    """BeautifulSoup による従来の実装。``parse_article`` の同等性確認用に残している。"""
+
     soup = BeautifulSoup(html, "lxml")
 
     data = _parse_from_json_ld(soup)
@@ -92,19 +484,8 @@ def _find_meta_content(soup: BeautifulSoup) -> str | None:
 
 
 def _parse_datetime(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    try:
-        dt = dateparser.parse(value)
-    except (ValueError, TypeError, OverflowError):
-        return None
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        from dateutil import tz
-
-        dt = dt.replace(tzinfo=tz.gettz("Asia/Tokyo"))
-    return dt
+    # タイムゾーンの無い値は日本時間とみなす
+    return datetimes.parse(value, datetimes.TOKYO)
 
 
 def _extract_body_from_dom(soup: BeautifulSoup) -> str:
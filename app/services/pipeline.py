@@ -0,0 +1,542 @@
+"""取得・パース・保存・AI を段ごとに並行させる取り込みパイプライン。
+
+``ingest_article`` は1件ずつ取得→パース→保存→AI を順に行うため、ネットワーク・
+CPU・AI API の待ち時間が足し算になる。ここでは段ごとにワーカーと上限付きの
+キューを持たせ、前の段の結果を次の段のキューへ渡す。次の段が詰まっている間は
+``put`` が待つので、遅い段があれば上流（最終的には ``submit`` の呼び出し側）が
+自然に待たされる（バックプレッシャー）。
+
+取り込みは次の段で行う。
+
+- ``fetch``: 既存記事の検証子を ``IN (...)`` でまとめて引き、``scraping.fetch_many``
+  で並行取得する（robots.txt・ホスト別レート・同時実行数はそちらの制御に従う）。
+- ``parse``: ``PIPELINE_PARSE_WORKERS`` 本のスレッド。``PARSE_WORKERS`` があれば
+  ``parse_pool`` のプロセスで解析する。
+- ``persist``: ``articles.ingest_many`` でまとめて保存する（1スレッド）。
+- ``ai``: ``PIPELINE_AI_WORKERS`` 本のスレッドで AI API を呼ぶ（DB には触れない）。
+- ``record``: 推論結果をまとめて保存する（1スレッド）。
+
+DB を使う段は ``_DB_LOCK`` で直列化する。段ごとのキュー長・処理時間・下流待ち
+時間は ``stats()`` で参照できる。
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import BrokenExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Protocol
+
+from flask import current_app, has_app_context
+from requests import Response
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.article import Article
+from app.models.db import db
+
+from . import ai as ai_service
+from . import articles, canonical_url, parse_pool, parsing, scraping
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_AI_WORKERS = 4
+
+_STOP = object()
+# DB を使う段（と検証子の検索）を直列化する
+_DB_LOCK = threading.Lock()
+
+
+class Job(Protocol):
+    @property
+    def done(self) -> bool: ...
+
+    def finish(self) -> None: ...
+
+    def fail(self, error: BaseException) -> None: ...
+
+
+@dataclass(slots=True)
+class Stage:
+    """パイプラインの1段。
+
+    ``func`` はジョブのリスト（最大 ``batch`` 件。キューに溜まっている分だけ
+    まとめて取る）を受け取り、次の段へ渡すジョブを順に返す。返さなかったジョブは
+    ``func`` の中で ``finish`` / ``fail`` する。最後の段が返したジョブは完了になる。
+    """
+
+    name: str
+    func: Callable[[list[Any]], Iterable[Any]]
+    workers: int = 1
+    batch: int = 1
+    capacity: int = DEFAULT_QUEUE_SIZE
+
+
+@dataclass(slots=True)
+class StageStats:
+    processed: int = 0
+    errors: int = 0
+    busy: float = 0.0
+    blocked: float = 0.0
+    max_depth: int = 0
+
+
+@dataclass(slots=True)
+class _StageState:
+    stage: Stage
+    queue: queue.Queue
+    stats: StageStats = field(default_factory=StageStats)
+    threads: list[threading.Thread] = field(default_factory=list)
+
+
+class Pipeline:
+    """段ごとのワーカーと上限付きキューでジョブを流す汎用エンジン。"""
+
+    def __init__(self, stages: list[Stage], app: Any = None):
+        if not stages:
+            raise ValueError("段がありません。")
+        self.app = app
+        self._states = [_StageState(stage, queue.Queue(maxsize=max(1, stage.capacity))) for stage in stages]
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self._closed = False
+
+    def __enter__(self) -> "Pipeline":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started_at is not None:
+                return
+            self._started_at = time.perf_counter()
+        for index, state in enumerate(self._states):
+            for number in range(max(1, state.stage.workers)):
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(index,),
+                    name=f"pipeline-{state.stage.name}-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                state.threads.append(thread)
+
+    def put(self, job: Job) -> None:
+        """先頭の段に投入する。キューが満杯なら空くまで待つ。"""
+
+        if self._closed:
+            raise RuntimeError("パイプラインは停止済みです。")
+        self.start()
+        self._put(self._states[0], job)
+
+    def close(self) -> None:
+        """投入済みのジョブを流し切ってからワーカーを止める。"""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # 前の段のワーカーが全て終われば、その段の結果は次の段のキューに入っている
+        for state in self._states:
+            for _ in state.threads:
+                state.queue.put(_STOP)
+            for thread in state.threads:
+                thread.join()
+
+    def _put(self, state: _StageState, job: Job) -> None:
+        state.queue.put(job)
+        depth = state.queue.qsize()
+        with self._lock:
+            if depth > state.stats.max_depth:
+                state.stats.max_depth = depth
+
+    def _run_worker(self, index: int) -> None:
+        state = self._states[index]
+        following = self._states[index + 1] if index + 1 < len(self._states) else None
+        # 設定や DB セッションを使えるよう、ワーカーごとにアプリケーションコンテキストを持つ
+        with self.app.app_context() if self.app is not None else nullcontext():
+            stopping = False
+            while not stopping:
+                item = state.queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                while len(batch) < state.stage.batch:
+                    try:
+                        extra = state.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if extra is _STOP:
+                        stopping = True
+                        break
+                    batch.append(extra)
+                self._process(state, following, batch)
+
+    def _process(self, state: _StageState, following: _StageState | None, batch: list[Job]) -> None:
+        started = time.perf_counter()
+        blocked = 0.0
+        handed: set[int] = set()
+        errors = 0
+        try:
+            for job in state.stage.func(batch):
+                handed.add(id(job))
+                if following is None:
+                    job.finish()
+                    continue
+                waited = time.perf_counter()
+                self._put(following, job)
+                blocked += time.perf_counter() - waited
+        except Exception as exc:
+            logger.exception("Pipeline stage %s failed", state.stage.name)
+            for job in batch:
+                if id(job) not in handed and not job.done:
+                    job.fail(exc)
+                    errors += 1
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            state.stats.processed += len(batch)
+            state.stats.errors += errors
+            state.stats.busy += elapsed - blocked
+            state.stats.blocked += blocked
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """段ごとのキュー長・処理件数・処理時間（秒）・下流待ち時間（秒）・稼働率。"""
+
+        with self._lock:
+            uptime = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+            result = {}
+            for state in self._states:
+                workers = max(1, state.stage.workers)
+                stats = state.stats
+                result[state.stage.name] = {
+                    "workers": workers,
+                    "depth": state.queue.qsize(),
+                    "capacity": state.queue.maxsize,
+                    "max_depth": stats.max_depth,
+                    "processed": stats.processed,
+                    "errors": stats.errors,
+                    "busy": stats.busy,
+                    "blocked": stats.blocked,
+                    "utilization": stats.busy / (uptime * workers) if uptime > 0 else 0.0,
+                }
+            return result
+
+    def format_stats(self) -> list[str]:
+        return [
+            "stage {name}: workers={workers} depth={depth}/{capacity} (max {max_depth}) processed={processed}"
+            " errors={errors} busy={busy:.2f}s ({utilization:.0%}) blocked={blocked:.2f}s".format(name=name, **entry)
+            for name, entry in self.stats().items()
+        ]
+
+
+@dataclass(slots=True, eq=False)
+class IngestJob:
+    """パイプラインで取り込む1件。``wait`` の後に ``status`` / ``error`` 等を参照する。"""
+
+    url: str
+    force: bool = False
+    run_ai: bool = True
+    force_ai: bool = False
+    source: str = ""
+    validators: tuple[str | None, str | None] | None = None
+    stream: parsing.StreamingParse | None = None
+    response: Response | None = None
+    parsed: parsing.ParsedArticle | None = None
+    status: articles.IngestionStatus | None = None
+    article_id: str | None = None
+    title: str | None = None
+    body: str | None = None
+    ai_enabled: bool = False
+    ai_ran: bool = False
+    ai_error: str | None = None
+    ai_result: ai_service.AIResult | None = None
+    error: articles.ArticleIngestionError | None = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+    on_done: Callable[["IngestJob"], None] | None = field(default=None, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ok(self) -> bool:
+        return self.done and self.error is None
+
+    @property
+    def elapsed(self) -> float | None:
+        return None if self.finished_at is None else self.finished_at - self.submitted_at
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def finish(self) -> None:
+        if self._done.is_set():
+            return
+        self.finished_at = time.perf_counter()
+        # 本文やレスポンスは完了後に使わないので手放す
+        self.response = self.stream = self.parsed = self.ai_result = None
+        self.body = None
+        self._done.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+    def fail(self, error: BaseException) -> None:
+        if not isinstance(error, articles.ArticleIngestionError):
+            error = articles.ArticleIngestionError(f"取り込みに失敗しました: {error}", status_code=500)
+        self.error = error
+        self.finish()
+
+
+class IngestPipeline(Pipeline):
+    """記事取り込み用のパイプライン。"""
+
+    def __init__(
+        self,
+        app: Any,
+        *,
+        parse_workers: int | None = None,
+        ai_workers: int | None = None,
+        capacity: int | None = None,
+        batch_size: int | None = None,
+        max_in_flight: int | None = None,
+        pool_workers: int | None = None,
+    ):
+        config = app.config
+        capacity = capacity or int(config.get("PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        batch_size = batch_size or int(config.get("INGEST_BATCH_SIZE", articles.DEFAULT_INGEST_BATCH_SIZE))
+        parse_workers = parse_workers or int(config.get("PIPELINE_PARSE_WORKERS", DEFAULT_PARSE_WORKERS))
+        ai_workers = ai_workers or int(config.get("PIPELINE_AI_WORKERS", DEFAULT_AI_WORKERS))
+        self.max_in_flight = max_in_flight
+        self.pool_workers = (
+            max(int(config.get("PARSE_WORKERS", 0) or 0), 0) if pool_workers is None else pool_workers
+        )
+        super().__init__(
+            [
+                Stage("fetch", self._fetch, batch=batch_size, capacity=capacity),
+                Stage("parse", self._parse, workers=parse_workers, capacity=capacity),
+                Stage("persist", self._persist, batch=batch_size, capacity=capacity),
+                Stage("ai", self._summarize, workers=ai_workers, capacity=capacity),
+                Stage("record", self._record, batch=batch_size, capacity=capacity),
+            ],
+            app,
+        )
+        self._inflight: dict[tuple[str, bool, bool, bool], IngestJob] = {}
+        self._inflight_lock = threading.Lock()
+
+    def submit(self, url: str, *, force: bool = False, run_ai: bool = True, force_ai: bool = False) -> IngestJob:
+        """URL を投入する。正規化した URL・同じ指定のジョブが処理中ならそれを返す。
+
+        対応外の URL はその場で ``ArticleIngestionError`` を送出する。
+        """
+
+        url = canonical_url.canonicalize(url)
+        source = articles.require_source(url)
+        key = (url, force, run_ai, force_ai)
+        with self._inflight_lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                return job
+            job = IngestJob(url, force=force, run_ai=run_ai, force_ai=force_ai, source=source, on_done=self._release)
+            self._inflight[key] = job
+        try:
+            self.put(job)
+        except RuntimeError as exc:
+            job.fail(exc)
+            raise
+        return job
+
+    def _release(self, job: IngestJob) -> None:
+        with self._inflight_lock:
+            key = (job.url, job.force, job.run_ai, job.force_ai)
+            if self._inflight.get(key) is job:
+                del self._inflight[key]
+
+    def _fetch(self, jobs: list[IngestJob]) -> Iterator[IngestJob]:
+        urls = list(dict.fromkeys(job.url for job in jobs))
+        with _DB_LOCK:
+            try:
+                stmt = select(Article.url, Article.etag, Article.last_modified).where(Article.url.in_(urls))
+                stored = {row.url: (row.etag, row.last_modified) for row in db.session.execute(stmt)}
+            finally:
+                db.session.remove()
+
+        waiting: dict[str, list[IngestJob]] = {}
+        for job in jobs:
+            job.validators = stored.get(job.url)
+            if job.validators is not None and not job.force:
+                # 保存済みの記事は取得せずに保存段へ（cached）
+                yield job
+                continue
+            waiting.setdefault(job.url, []).append(job)
+        if not waiting:
+            return
+
+        streams = {}
+        for url, group in waiting.items():
+            # 同じ URL を複数のジョブが待つ場合は本文全体を共有するのでストリーミングしない
+            stream = articles.stream_for(group[0].source) if len(group) == 1 else None
+            if stream is not None:
+                streams[url] = stream
+        validators = {url: group[0].validators for url, group in waiting.items() if group[0].validators}
+        for fetched in scraping.fetch_many(
+            waiting, max_in_flight=self.max_in_flight, validators=validators, streams=streams
+        ):
+            for job in waiting[fetched.url]:
+                if not fetched.ok:
+                    job.fail(articles.ArticleIngestionError(str(fetched.error), status_code=502))
+                    continue
+                job.response = fetched.response
+                job.stream = streams.get(fetched.url)
+                yield job
+
+    def _parse(self, jobs: list[IngestJob]) -> Iterator[IngestJob]:
+        for job in jobs:
+            if job.response is not None:
+                try:
+                    job.parsed, job.response = articles.fetch_and_parse(
+                        job.source,
+                        job.url,
+                        job.validators,
+                        response=job.response,
+                        parsed=self._parse_in_pool(job),
+                        stream=job.stream,
+                    )
+                except articles.ArticleIngestionError as exc:
+                    job.fail(exc)
+                    continue
+            yield job
+
+    def _parse_in_pool(self, job: IngestJob) -> parsing.ParsedArticle | None:
+        response = job.response
+        if response is None or scraping.is_not_modified(response):
+            return None
+        if job.stream is not None and job.stream.bytes_fed:
+            return None
+        future = parse_pool.submit(job.source, response, workers=self.pool_workers)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except (parsing.ParseError, BrokenExecutor):
+            # その場でパースし直し、エラーは fetch_and_parse 側で扱う
+            return None
+
+    def _persist(self, jobs: list[IngestJob]) -> Iterator[IngestJob]:
+        ai_enabled = current_app.config.get("ENABLE_AI", True)
+        needs_ai: list[IngestJob] = []
+        with _DB_LOCK:
+            # 保存後も記事の属性を読むので、コミットで失効させない（セッションは最後に捨てる）
+            db.session().expire_on_commit = False
+            try:
+                for force in {job.force for job in jobs}:
+                    group = [job for job in jobs if job.force == force]
+                    outcomes = articles.ingest_many(
+                        [job.url for job in group],
+                        force=force,
+                        run_ai=False,
+                        responses={job.url: job.response for job in group if job.response is not None},
+                        parsed={job.url: job.parsed for job in group if job.parsed is not None},
+                    )
+                    by_url = {outcome.url: outcome for outcome in outcomes}
+                    kept = ("unchanged", "cached", "not_modified")
+                    unchanged = [
+                        by_url[job.url].result.article.id
+                        for job in group
+                        if by_url[job.url].ok and by_url[job.url].result.status in kept
+                    ]
+                    with_inference = articles.ids_with_inference(unchanged) if ai_enabled and unchanged else set()
+                    for job in group:
+                        outcome = by_url[job.url]
+                        if not outcome.ok:
+                            job.fail(outcome.error)
+                            continue
+                        article = outcome.result.article
+                        job.status = outcome.result.status
+                        job.article_id = article.id
+                        job.title = article.title
+                        job.ai_enabled = ai_enabled
+                        refetched = job.status in ("created", "updated")
+                        missing = article.id not in with_inference
+                        if job.run_ai and ai_enabled and (job.force_ai or refetched or missing):
+                            job.body = article.body
+                            needs_ai.append(job)
+                        else:
+                            job.finish()
+            finally:
+                db.session.remove()
+        yield from needs_ai
+
+    def _summarize(self, jobs: list[IngestJob]) -> Iterator[IngestJob]:
+        for job in jobs:
+            try:
+                job.ai_result = ai_service.summarize_and_score(job.title or "", (job.body or "")[:4000])
+            except ai_service.AIServiceUnavailable as exc:
+                job.ai_error = str(exc)
+                job.finish()
+                continue
+            yield job
+
+    def _record(self, jobs: list[IngestJob]) -> Iterator[IngestJob]:
+        with _DB_LOCK:
+            try:
+                for job in jobs:
+                    db.session.add(articles.inference_from(job.article_id, job.ai_result))
+                db.session.commit()
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                logger.exception("Saving %d inference results failed", len(jobs))
+                for job in jobs:
+                    job.ai_error = f"推論結果を保存できませんでした: {exc}"
+                    job.finish()
+                return
+            finally:
+                db.session.remove()
+        for job in jobs:
+            job.ai_ran = True
+        yield from jobs
+
+
+_PIPELINE: IngestPipeline | None = None
+_PIPELINE_LOCK = threading.Lock()
+
+
+def get_pipeline() -> IngestPipeline:
+    """API などから共有する ``IngestPipeline``（初回に現在のアプリの設定で起動する）。"""
+
+    global _PIPELINE
+    if not has_app_context():
+        raise RuntimeError("アプリケーションコンテキストが必要です。")
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    with _PIPELINE_LOCK:
+        if _PIPELINE is None or _PIPELINE.app is not app:
+            if _PIPELINE is not None:
+                _PIPELINE.close()
+            _PIPELINE = IngestPipeline(app)
+            _PIPELINE.start()
+        return _PIPELINE
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """共有パイプラインの段ごとの集計。起動していなければ空。"""
+
+    with _PIPELINE_LOCK:
+        pipeline = _PIPELINE
+    return pipeline.stats() if pipeline is not None else {}
+
+
+def shutdown() -> None:
+    global _PIPELINE
+    with _PIPELINE_LOCK:
+        pipeline, _PIPELINE = _PIPELINE, None
+    if pipeline is not None:
+        pipeline.close()
@@ -0,0 +1,166 @@
+"""ホスト単位の取得ペース制御（トークンバケット + robots.txt）。
+
+``scraping.fetch_many`` から利用し、各オリジンへのリクエストが
+許容レートを超えないようにしつつ、トークンのあるホストから順に投入する。
+バケットと robots.txt の解析結果はプロセス内で共有する。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Final
+from urllib import robotparser
+from urllib.parse import urlparse
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST_RATE: Final[float] = 0.0
+DEFAULT_HOST_BURST: Final[int] = 2
+DEFAULT_ROBOTS_AGENT: Final[str] = "ScraperApp"
+DEFAULT_ROBOTS_TTL: Final[float] = 3600.0
+
+RobotsLoader = Callable[[str], tuple[int, str]]
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+class TokenBucket:
+    """1秒あたり ``rate`` 個補充され、最大 ``capacity`` 個まで貯まるバケット。"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "_lock")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """トークンを1つ消費できれば 0.0、できなければ次の補充までの秒数を返す。"""
+
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+
+@dataclass(slots=True)
+class _RobotsEntry:
+    parser: robotparser.RobotFileParser
+    expires_at: float
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_ROBOTS: dict[str, _RobotsEntry] = {}
+_LOCK = threading.Lock()
+
+
+def reset() -> None:
+    """共有状態を破棄する。設定変更時やテスト向け。"""
+
+    with _LOCK:
+        _BUCKETS.clear()
+        _ROBOTS.clear()
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def _robots_agent() -> str:
+    return _config_get("SCRAPE_ROBOTS_AGENT", DEFAULT_ROBOTS_AGENT)
+
+
+def robots_for(url: str, loader: RobotsLoader) -> robotparser.RobotFileParser | None:
+    """ホストの robots.txt をキャッシュ付きで返す。無効化されていれば ``None``。"""
+
+    if not _config_get("SCRAPE_RESPECT_ROBOTS", True):
+        return None
+
+    parts = urlparse(url)
+    host = parts.netloc.lower()
+    now = time.monotonic()
+    with _LOCK:
+        entry = _ROBOTS.get(host)
+    if entry is not None and entry.expires_at > now:
+        return entry.parser
+
+    parser = robotparser.RobotFileParser()
+    try:
+        status, text = loader(f"{parts.scheme or 'http'}://{parts.netloc}/robots.txt")
+    except Exception as exc:  # ネットワーク障害時は制限なしとみなす
+        logger.warning("Failed to load robots.txt for %s: %s", host, exc)
+        status, text = 0, ""
+
+    if status in (401, 403):
+        parser.disallow_all = True
+    elif 200 <= status < 300:
+        parser.parse(text.splitlines())
+    else:
+        parser.allow_all = True
+    parser.modified()
+
+    ttl = float(_config_get("SCRAPE_ROBOTS_TTL", DEFAULT_ROBOTS_TTL))
+    with _LOCK:
+        _ROBOTS[host] = _RobotsEntry(parser=parser, expires_at=now + ttl)
+    return parser
+
+
+def is_allowed(url: str, loader: RobotsLoader) -> bool:
+    parser = robots_for(url, loader)
+    if parser is None:
+        return True
+    return parser.can_fetch(_robots_agent(), url)
+
+
+def _host_rate(host: str, crawl_delay: float | None) -> tuple[float, float]:
+    overrides: dict[str, float] = _config_get("SCRAPE_HOST_RATE_OVERRIDES", {}) or {}
+    rate = float(overrides.get(host, _config_get("SCRAPE_HOST_RATE", DEFAULT_HOST_RATE)))
+    burst = float(_config_get("SCRAPE_HOST_BURST", DEFAULT_HOST_BURST))
+    if crawl_delay:
+        # Crawl-delay は設定値より厳しい場合のみ適用し、バーストも許さない
+        delay_rate = 1.0 / crawl_delay
+        if rate <= 0 or delay_rate < rate:
+            rate = delay_rate
+        burst = 1.0
+    return rate, burst
+
+
+def bucket_for(url: str, loader: RobotsLoader) -> TokenBucket:
+    """ホストのトークンバケットを返す（初回は robots.txt の Crawl-delay も反映）。"""
+
+    host = host_of(url)
+    with _LOCK:
+        bucket = _BUCKETS.get(host)
+    if bucket is not None:
+        return bucket
+
+    crawl_delay: float | None = None
+    parser = robots_for(url, loader)
+    if parser is not None:
+        agent = _robots_agent()
+        delay = parser.crawl_delay(agent)
+        rate = parser.request_rate(agent)
+        if rate is not None and rate.requests:
+            delay = max(float(delay or 0), rate.seconds / rate.requests)
+        crawl_delay = float(delay) if delay else None
+
+    rate_value, burst = _host_rate(host, crawl_delay)
+    with _LOCK:
+        return _BUCKETS.setdefault(host, TokenBucket(rate_value, burst))
+
@@ -0,0 +1,159 @@
+"""取得した生HTMLを圧縮して保存するコンテンツアドレス型ストア。
+
+本文は SHA-256 をキーに ``objects/`` 以下へ gzip で保存し、URL ごとの
+最新の参照（どのハッシュか、文字コード等）を ``refs/`` 以下に JSON で置く。
+パーサー修正後の再解析や、ネットワークを使わないリプレイに利用する。
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from flask import current_app, has_app_context
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from app.config import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = BASE_DIR / "instance" / "raw_store"
+
+
+@dataclass(slots=True)
+class StoredResponse:
+    """URL ごとに保存された最新レスポンスのメタデータ。"""
+
+    url: str
+    final_url: str
+    sha256: str
+    size: int
+    encoding: str | None
+    content_type: str | None
+    etag: str | None
+    last_modified: str | None
+    fetched_at: str
+
+
+def is_enabled() -> bool:
+    if not has_app_context():
+        return False
+    return bool(current_app.config.get("RAW_STORE_ENABLED", False))
+
+
+def store_dir() -> Path:
+    if has_app_context():
+        configured = current_app.config.get("RAW_STORE_DIR")
+        if configured:
+            return Path(configured)
+    return DEFAULT_STORE_DIR
+
+
+def _digest(value: bytes) -> str:
+    return hashlib.sha256(value).hexdigest()
+
+
+def _object_path(root: Path, sha256: str) -> Path:
+    return root / "objects" / sha256[:2] / f"{sha256}.html.gz"
+
+
+def _ref_path(root: Path, url: str) -> Path:
+    key = _digest(url.encode("utf-8"))
+    return root / "refs" / key[:2] / f"{key}.json"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def put(url: str, response: Response) -> StoredResponse:
+    """レスポンス本文を保存し、``url`` の参照を更新する。"""
+
+    root = store_dir()
+    body = response.content or b""
+    sha256 = _digest(body)
+
+    object_path = _object_path(root, sha256)
+    if not object_path.exists():
+        # mtime=0 で同一本文は常に同一バイト列になる
+        _atomic_write(object_path, gzip.compress(body, mtime=0))
+
+    entry = StoredResponse(
+        url=url,
+        final_url=response.url or url,
+        sha256=sha256,
+        size=len(body),
+        encoding=response.encoding,
+        content_type=response.headers.get("Content-Type"),
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        fetched_at=datetime.now(timezone.utc).isoformat(),
+    )
+    _atomic_write(_ref_path(root, url), json.dumps(asdict(entry), ensure_ascii=False).encode("utf-8"))
+    return entry
+
+
+def get(url: str) -> StoredResponse | None:
+    path = _ref_path(store_dir(), url)
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Broken raw store ref %s: %s", path, exc)
+        return None
+    return StoredResponse(**payload)
+
+
+def load_body(entry: StoredResponse) -> bytes:
+    return gzip.decompress(_object_path(store_dir(), entry.sha256).read_bytes())
+
+
+def iter_entries() -> Iterator[StoredResponse]:
+    """保存済みの参照を URL 順に列挙する。"""
+
+    refs_root = store_dir() / "refs"
+    if not refs_root.exists():
+        return
+    entries = []
+    for path in refs_root.glob("*/*.json"):
+        try:
+            entries.append(StoredResponse(**json.loads(path.read_text(encoding="utf-8"))))
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Skipping broken raw store ref %s: %s", path, exc)
+    yield from sorted(entries, key=lambda entry: entry.url)
+
+
+def to_response(entry: StoredResponse) -> Response:
+    """保存済みの本文から ``requests.Response`` を復元する。"""
+
+    response = Response()
+    response.status_code = 200
+    response.url = entry.final_url
+    response.encoding = entry.encoding
+    response.headers = CaseInsensitiveDict()
+    for name, value in (
+        ("Content-Type", entry.content_type),
+        ("ETag", entry.etag),
+        ("Last-Modified", entry.last_modified),
+    ):
+        if value:
+            response.headers[name] = value
+    response._content = load_body(entry)
+    return response
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Final
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Final, Iterable, Iterator, Mapping, Protocol
 from urllib.parse import urlparse
 
 import requests
 from requests import HTTPError, Response
-from requests.adapters import HTTPAdapter, Retry
+from requests.adapters import Retry
 
 from flask import current_app, has_app_context
 
+from . import circuit_breaker, fetch_metrics, politeness, raw_store
+
 logger = logging.getLogger(__name__)
 
 YAHOO_NEWS_PREFIX: Final[str] = "https://news.yahoo.co.jp/articles/"
@@ -20,6 +27,23 @@ DEFAULT_USER_AGENT: Final[str] = "Mozilla/5.0 (compatible; ScraperApp/1.0; +http
 DEFAULT_REQUEST_TIMEOUT: Final[int] = 10
 DEFAULT_RETRY_TOTAL: Final[int] = 2
 DEFAULT_RETRY_BACKOFF: Final[float] = 0.5
+DEFAULT_POOL_CONNECTIONS: Final[int] = 10
+DEFAULT_POOL_MAXSIZE: Final[int] = 10
+DEFAULT_MAX_IN_FLIGHT: Final[int] = 8
+DEFAULT_PER_HOST_LIMIT: Final[int] = 4
+RETRY_STATUS_FORCELIST: Final[tuple[int, ...]] = (429, 500, 502, 503, 504)
+DEFAULT_MAX_BYTES: Final[int] = 5 * 1024 * 1024
+DEFAULT_ALLOWED_CONTENT_TYPES: Final[tuple[str, ...]] = ("text/html", "application/xhtml+xml")
+STREAM_CHUNK_SIZE: Final[int] = 64 * 1024
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+_ABORT_STATS: dict[str, dict[str, int]] = {}
+_ABORT_LOCK = threading.Lock()
+
+_STREAM_STATS = {"streamed": 0, "stopped": 0, "bytes_read": 0, "bytes_skipped": 0}
+_STREAM_LOCK = threading.Lock()
 
 
 def _config_get(key: str, default: Any) -> Any:
@@ -32,6 +56,222 @@ class ScrapeError(RuntimeError):
     """スクレイピング全般のエラー。"""
 
 
+class RobotsDisallowed(ScrapeError):
+    """robots.txt により取得が禁止されているURL。"""
+
+
+class CircuitOpen(ScrapeError):
+    """ホストのサーキットブレーカーが open のため取得せずに失敗させた。"""
+
+
+class FetchAborted(ScrapeError):
+    """本文のダウンロードを途中で打ち切った。"""
+
+    reason = "aborted"
+
+    def __init__(self, url: str, message: str, *, bytes_read: int = 0):
+        super().__init__(message)
+        self.url = url
+        self.bytes_read = bytes_read
+
+
+class ResponseTooLarge(FetchAborted):
+    """本文が ``SCRAPE_MAX_BYTES`` を超えた。"""
+
+    reason = "too_large"
+
+
+class UnsupportedContentType(FetchAborted):
+    """HTML 以外の Content-Type だった。"""
+
+    reason = "content_type"
+
+
+class StreamSink(Protocol):
+    """ダウンロード中のチャンクを受け取る側（``parsing.StreamingParse`` など）。"""
+
+    def start(self, content_type: str | None) -> None: ...
+
+    def feed(self, chunk: bytes) -> bool:
+        """必要な部分を受け取り終えたら ``True``（残りのダウンロードを打ち切る）。"""
+        ...
+
+
+@dataclass(slots=True)
+class FetchResult:
+    """``fetch_many`` が1件ごとに返す取得結果。"""
+
+    url: str
+    response: Response | None = None
+    error: ScrapeError | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _build_session() -> requests.Session:
+    """Keep-Alive・ホスト単位プール・再試行を備えたセッションを組み立てる。"""
+
+    retry = Retry(
+        total=int(_config_get("SCRAPE_RETRY_TOTAL", DEFAULT_RETRY_TOTAL)),
+        backoff_factor=float(_config_get("SCRAPE_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF)),
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = fetch_metrics.TimedHTTPAdapter(
+        pool_connections=int(_config_get("SCRAPE_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)),
+        pool_maxsize=int(_config_get("SCRAPE_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers.update({"User-Agent": _config_get("USER_AGENT", DEFAULT_USER_AGENT)})
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """プロセス全体で共有するセッションを返す（初回呼び出し時に生成）。"""
+
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+def reset_session() -> None:
+    """共有セッションを破棄する。設定変更時やテスト向け。"""
+
+    global _SESSION
+    with _SESSION_LOCK:
+        session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """ホストごとの接続プール利用状況を返す。
+
+    ``hits`` は既存の Keep-Alive 接続を再利用したリクエスト数、
+    ``misses`` は新規に接続（TCP/TLS ハンドシェイク）を張った回数。
+    """
+
+    stats: dict[str, dict[str, int]] = {}
+    session = _SESSION
+    if session is None:
+        return stats
+
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is None:
+            continue
+        with manager.pools.lock:
+            # 古い順に取り出し直すので LRU の並びは変わらない
+            pools = [manager.pools[key] for key in manager.pools.keys()]
+        for pool in pools:
+            host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+            entry = stats.setdefault(host, {"requests": 0, "hits": 0, "misses": 0})
+            entry["requests"] += pool.num_requests
+            entry["misses"] += pool.num_connections
+            entry["hits"] += max(pool.num_requests - pool.num_connections, 0)
+    return stats
+
+
+def abort_stats() -> dict[str, dict[str, int]]:
+    """打ち切り理由ごとの件数と、打ち切りまでに読んだバイト数の合計を返す。"""
+
+    with _ABORT_LOCK:
+        return {reason: dict(entry) for reason, entry in _ABORT_STATS.items()}
+
+
+def _abort(response: Response, error: FetchAborted) -> None:
+    response.close()
+    with _ABORT_LOCK:
+        entry = _ABORT_STATS.setdefault(error.reason, {"count": 0, "bytes_read": 0})
+        entry["count"] += 1
+        entry["bytes_read"] += error.bytes_read
+    logger.warning("Aborted download of %s: %s", error.url, error)
+    raise error
+
+
+def stream_stats() -> dict[str, int]:
+    """ストリーミング解析した件数、途中で打ち切った件数、読んだ/読まずに済んだバイト数。
+
+    読まずに済んだバイト数は Content-Length がある応答だけを数える。
+    """
+
+    with _STREAM_LOCK:
+        return dict(_STREAM_STATS)
+
+
+def reset_stream_stats() -> None:
+    with _STREAM_LOCK:
+        for key in _STREAM_STATS:
+            _STREAM_STATS[key] = 0
+
+
+def _record_stream(response: Response, total: int, stopped: bool) -> None:
+    declared = response.headers.get("Content-Length", "")
+    skipped = int(declared) - total if stopped and declared.isdigit() else 0
+    with _STREAM_LOCK:
+        _STREAM_STATS["streamed"] += 1
+        _STREAM_STATS["stopped"] += int(stopped)
+        _STREAM_STATS["bytes_read"] += total
+        _STREAM_STATS["bytes_skipped"] += max(skipped, 0)
+
+
+def _read_body(url: str, response: Response, sink: StreamSink | None = None) -> None:
+    """本文をストリーミングで読み込む。対象外の Content-Type や上限超過なら即座に打ち切る。
+
+    ``sink`` があればチャンクを受け取るたびに渡し、必要な部分を読み終えた時点で
+    接続を閉じて残りを読まない（``_content`` はそこまでの本文になる）。
+    """
+
+    max_bytes = int(_config_get("SCRAPE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+    if not is_not_modified(response):
+        media_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        allowed = _config_get("SCRAPE_ALLOWED_CONTENT_TYPES", DEFAULT_ALLOWED_CONTENT_TYPES)
+        if media_type and allowed and media_type not in allowed:
+            _abort(response, UnsupportedContentType(url, f"Unsupported content type {media_type!r}: {url}"))
+
+        declared = response.headers.get("Content-Length", "")
+        if max_bytes and declared.isdigit() and int(declared) > max_bytes:
+            _abort(response, ResponseTooLarge(url, f"Content-Length {declared} exceeds {max_bytes} bytes: {url}"))
+
+    if sink is not None and is_not_modified(response):
+        sink = None
+    if sink is not None:
+        sink.start(response.headers.get("Content-Type"))
+
+    chunks: list[bytes] = []
+    total = 0
+    stopped = False
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        total += len(chunk)
+        if max_bytes and total > max_bytes:
+            _abort(
+                response,
+                ResponseTooLarge(url, f"Body exceeds {max_bytes} bytes: {url}", bytes_read=total),
+            )
+        chunks.append(chunk)
+        if sink is not None and sink.feed(chunk):
+            stopped = True
+            break
+    response._content = b"".join(chunks)
+    if sink is not None:
+        if stopped:
+            # 接続はプールに戻さず捨てる（残りの本文を読まないため）
+            response.close()
+        _record_stream(response, total, stopped)
+
+
 def is_allowed(url: str) -> bool:
     """仕様で許可されたニュースURLかを判定。"""
     # Virtual Newsは許可
@@ -41,8 +281,74 @@ def is_allowed(url: str) -> bool:
     return True
 
 
-def fetch(url: str) -> Response:
-    """指定されたURLの記事を取得する。"""
+def conditional_headers(etag: str | None, last_modified: str | None) -> dict[str, str]:
+    """保存済みのバリデータから条件付きGET用のヘッダーを組み立てる。"""
+
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def is_not_modified(response: Response) -> bool:
+    return response.status_code == requests.codes.not_modified
+
+
+def _record_phases(
+    host: str,
+    phases: dict[str, float],
+    started: float,
+    headers_at: float | None,
+    response: Response | None,
+) -> None:
+    finished = time.perf_counter()
+    if headers_at is not None:
+        # 新規接続の場合は DNS/接続/TLS を除いた分を最初のバイトまでの待ち時間とする
+        connecting = sum(phases.get(phase, 0.0) for phase in ("dns", "connect", "tls"))
+        phases["ttfb"] = max(headers_at - started - connecting, 0.0)
+        phases["download"] = finished - headers_at
+    phases["total"] = finished - started
+
+    status: int | str = response.status_code if response is not None else "error"
+    content = response._content if response is not None else None
+    size = len(content) if isinstance(content, bytes) else 0
+    fetch_metrics.record(host, phases, status=status, size=size)
+
+
+def _replay(url: str) -> Response:
+    entry = raw_store.get(url)
+    if entry is None:
+        raise ScrapeError(f"No stored response for {url} (replay mode)")
+    try:
+        return raw_store.to_response(entry)
+    except OSError as exc:
+        raise ScrapeError(f"Failed to load stored response for {url}: {exc}") from exc
+
+
+def fetch(
+    url: str,
+    *,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    stream: StreamSink | None = None,
+) -> Response:
+    """指定されたURLの記事を取得する。
+
+    ``etag`` / ``last_modified`` を渡すと条件付きGETを行い、
+    変更がなければ 304 レスポンスをそのまま返す。
+    ``stream`` を渡すと本文をチャンクごとに渡しながら読み、``stream`` が
+    必要な部分を読み終えた時点で残りのダウンロードを打ち切る
+    （生HTMLストアにもそこまでの本文が保存される）。リプレイ・モック応答には
+    渡さないので、呼び出し側は ``stream`` が何も受け取っていない場合に備えること。
+    ``SCRAPE_REPLAY`` が有効な場合はネットワークを使わず生HTMLストアから返す。
+    ホストのサーキットが open の間は接続せず ``CircuitOpen`` を送出し、
+    タイムアウトはホストの観測レイテンシから ``circuit_breaker`` が決める。
+    """
+
+    if _config_get("SCRAPE_REPLAY", False):
+        return _replay(url)
 
     # Virtual Newsの場合は実際にリクエストを送る（localhostへ）
     if "virtual-news" in url:
@@ -51,10 +357,54 @@ def fetch(url: str) -> Response:
         if url.startswith("/"):
             url = f"http://localhost:5000{url}"
 
+        host = politeness.host_of(url)
+        if not circuit_breaker.allow(host):
+            raise CircuitOpen(f"Circuit open for {host}, skipping {url}")
+
+        timeout = circuit_breaker.timeout_for(host, _config_get("REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT))
+        phases = fetch_metrics.begin()
+        started = time.perf_counter()
+        headers_at: float | None = None
+        response: Response | None = None
+        recorded = False
         try:
-            return requests.get(url, timeout=DEFAULT_REQUEST_TIMEOUT)
+            response = get_session().get(
+                url,
+                timeout=timeout,
+                headers=conditional_headers(etag, last_modified),
+                stream=True,
+            )
+            headers_at = time.perf_counter()
+            if response.status_code >= 500:
+                circuit_breaker.record_failure(host)
+            else:
+                circuit_breaker.record_success(host, headers_at - started)
+            recorded = True
+
+            response.raise_for_status()
+            _read_body(url, response, stream)
+        except HTTPError as e:
+            response.close()
+            raise ScrapeError(f"Failed to fetch {url}: HTTP {e.response.status_code}") from e
         except requests.RequestException as e:
-            raise ScrapeError(f"Failed to fetch {url}: {e}")
+            if response is None:
+                circuit_breaker.record_failure(host)
+                recorded = True
+            else:
+                response.close()
+            raise ScrapeError(f"Failed to fetch {url}: {e}") from e
+        finally:
+            if not recorded:
+                # 想定外の例外で抜けた場合も half_open の試行枠を戻す
+                circuit_breaker.release(host)
+            _record_phases(host, phases, started, headers_at, response)
+
+        if raw_store.is_enabled() and not is_not_modified(response):
+            try:
+                raw_store.put(url, response)
+            except OSError as exc:
+                logger.warning("Failed to store raw response for %s: %s", url, exc)
+        return response
 
     # 既存のモックロジック（Yahoo/Nifty用だが、今回はVirtual News以外は使わない想定）
     # ...
@@ -85,3 +435,119 @@ def fetch(url: str) -> Response:
     response.url = url # URLを設定
 
     return response
+
+
+def _is_live(url: str) -> bool:
+    """実際にネットワークへ出るURLか（それ以外はモック/リプレイで応答する）。"""
+    return "virtual-news" in url and not _config_get("SCRAPE_REPLAY", False)
+
+
+def _load_robots(url: str) -> tuple[int, str]:
+    response = get_session().get(url, timeout=_config_get("REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT))
+    return response.status_code, response.text
+
+
+def _fetch_one(
+    app: Any,
+    url: str,
+    validators: tuple[str | None, str | None],
+    stream: StreamSink | None = None,
+) -> FetchResult:
+    started = time.perf_counter()
+    etag, last_modified = validators
+    try:
+        if app is not None:
+            with app.app_context():
+                response = fetch(url, etag=etag, last_modified=last_modified, stream=stream)
+        else:
+            response = fetch(url, etag=etag, last_modified=last_modified, stream=stream)
+    except ScrapeError as exc:
+        return FetchResult(url=url, error=exc, elapsed=time.perf_counter() - started)
+    return FetchResult(url=url, response=response, elapsed=time.perf_counter() - started)
+
+
+def fetch_many(
+    urls: Iterable[str],
+    *,
+    max_in_flight: int | None = None,
+    per_host: int | None = None,
+    validators: Mapping[str, tuple[str | None, str | None]] | None = None,
+    streams: Mapping[str, StreamSink] | None = None,
+) -> Iterator[FetchResult]:
+    """複数URLをスレッドプールで並行取得し、完了した順に結果を返す。
+
+    全体の同時実行数は ``max_in_flight``、ホスト単位の同時実行数は
+    ``per_host`` で制限する。実ネットワークへ出るホストは ``politeness`` の
+    トークンバケット（robots.txt の Crawl-delay を反映）でレートも制限し、
+    トークンのあるホストからラウンドロビンで投入する。
+    robots.txt で禁止されたURLは ``RobotsDisallowed`` として返す。
+    個々の失敗は例外にせず ``FetchResult.error`` に格納する。
+    ``validators`` には URL ごとの ``(etag, last_modified)`` を、
+    ``streams`` には URL ごとのストリーミング解析（``fetch`` の ``stream``）を渡せる。
+    """
+
+    max_in_flight = max(1, max_in_flight or int(_config_get("SCRAPE_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)))
+    per_host = max(1, per_host or int(_config_get("SCRAPE_PER_HOST_LIMIT", DEFAULT_PER_HOST_LIMIT)))
+
+    validators = validators or {}
+    streams = streams or {}
+    queues: dict[str, deque[str]] = {}
+    buckets: dict[str, politeness.TokenBucket | None] = {}
+    for url in urls:
+        host = politeness.host_of(url)
+        if host not in buckets:
+            buckets[host] = politeness.bucket_for(url, _load_robots) if _is_live(url) else None
+        if buckets[host] is not None and not politeness.is_allowed(url, _load_robots):
+            yield FetchResult(url=url, error=RobotsDisallowed(f"Disallowed by robots.txt: {url}"))
+            continue
+        queues.setdefault(host, deque()).append(url)
+    if not queues:
+        return
+
+    # ワーカースレッドでも設定を参照できるようにアプリを引き継ぐ
+    app = current_app._get_current_object() if has_app_context() else None  # type: ignore[attr-defined]
+    active: dict[str, int] = {host: 0 for host in queues}
+    in_flight: dict[Future[FetchResult], str] = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="scrape-fetch") as pool:
+        while queues or in_flight:
+            # トークンのあるホストから1件ずつラウンドロビンで投入し、枠が埋まるまで繰り返す
+            throttled: list[float] = []
+            submitted = True
+            while submitted and len(in_flight) < max_in_flight:
+                submitted = False
+                throttled.clear()
+                for host in list(queues):
+                    if len(in_flight) >= max_in_flight:
+                        break
+                    if active[host] >= per_host:
+                        continue
+                    bucket = buckets[host]
+                    if bucket is not None:
+                        delay = bucket.try_acquire()
+                        if delay > 0:
+                            throttled.append(delay)
+                            continue
+                    pending = queues[host]
+                    url = pending.popleft()
+                    future = pool.submit(
+                        _fetch_one, app, url, validators.get(url, (None, None)), streams.get(url)
+                    )
+                    in_flight[future] = host
+                    active[host] += 1
+                    submitted = True
+                    if not pending:
+                        del queues[host]
+
+            # 次にトークンが補充されるまでの最短時間だけ待つ
+            timeout = min(throttled) if throttled else None
+            if not in_flight:
+                if timeout is None:
+                    break
+                time.sleep(timeout)
+                continue
+
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                active[in_flight.pop(future)] -= 1
+                yield future.result()
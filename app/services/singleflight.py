@@ -0,0 +1,132 @@
+"""同じキーの処理を同時に1回だけ行う（single-flight）。
+
+同じ記事 URL の取り込みが同時に届くと、どちらも取得・パース・AI 推論を行い、
+後からコミットした方は ``Article.url`` の一意制約に当たる。``begin`` で最初に
+来た呼び出しだけをリーダーにし、後続は ``wait`` でリーダーの結果（または例外）を
+受け取る。結果にはスレッドをまたいで使える値（ID や状態）だけを入れること。
+
+プロセス内の登録簿に加え、``SINGLEFLIGHT_CROSS_PROCESS`` が有効で DB が
+PostgreSQL なら ``cross_process`` でアドバイザリロックを取り、別プロセス
+（Web ワーカーとジョブワーカーなど）の同じキーの処理とも直列化できる。
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Iterator
+
+from flask import current_app, has_app_context
+from sqlalchemy import text
+
+from app.models.db import db
+
+DEFAULT_TIMEOUT = 120.0
+
+
+@dataclass(slots=True)
+class Flight:
+    key: Hashable
+    value: Any = None
+    error: BaseException | None = None
+    _done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+
+_FLIGHTS: dict[Hashable, Flight] = {}
+_STATS = {"leaders": 0, "shared": 0}
+_LOCK = threading.Lock()
+
+
+def _config_get(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def begin(key: Hashable) -> tuple[Flight, bool]:
+    """``key`` のフライトと、呼び出し側がリーダーか。リーダーは必ず ``finish`` を呼ぶ。"""
+
+    with _LOCK:
+        flight = _FLIGHTS.get(key)
+        if flight is not None:
+            _STATS["shared"] += 1
+            return flight, False
+        flight = _FLIGHTS[key] = Flight(key)
+        _STATS["leaders"] += 1
+        return flight, True
+
+
+def finish(flight: Flight, value: Any = None, error: BaseException | None = None) -> None:
+    """リーダーの結果を後続に渡し、フライトを登録簿から外す。"""
+
+    flight.value = value
+    flight.error = error
+    with _LOCK:
+        if _FLIGHTS.get(flight.key) is flight:
+            del _FLIGHTS[flight.key]
+    flight._done.set()
+
+
+def wait(flight: Flight, timeout: float | None = None) -> Any:
+    """リーダーの結果を返す。リーダーが失敗していればその例外を送出する。
+
+    ``timeout``（既定は ``SINGLEFLIGHT_TIMEOUT``）までに終わらなければ ``TimeoutError``。
+    """
+
+    if timeout is None:
+        timeout = float(_config_get("SINGLEFLIGHT_TIMEOUT", DEFAULT_TIMEOUT))
+    if not flight._done.wait(timeout):
+        raise TimeoutError(f"single-flight {flight.key!r} did not finish in {timeout:.0f}s")
+    if flight.error is not None:
+        raise flight.error
+    return flight.value
+
+
+def _advisory_key(key: Hashable) -> int:
+    digest = hashlib.sha256(repr(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+@contextmanager
+def cross_process(key: Hashable) -> Iterator[bool]:
+    """別プロセスの同じキーの処理と直列化する。待たされたら ``True`` を渡す。
+
+    PostgreSQL のセッション単位のアドバイザリロックを、ORM セッションとは別の
+    接続で保持する。ブロックの間は接続プールの1本を占有するので、AI 推論など
+    時間のかかる処理はブロックの外で行うこと。無効な設定（既定）や PostgreSQL
+    以外では何もしない（``False``）。
+    """
+
+    if not _config_get("SINGLEFLIGHT_CROSS_PROCESS", False) or db.engine.dialect.name != "postgresql":
+        yield False
+        return
+
+    lock_key = _advisory_key(key)
+    with db.engine.connect() as conn:
+        waited = not conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key})
+        if waited:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": lock_key})
+        conn.commit()
+        try:
+            yield waited
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key})
+            conn.commit()
+
+
+def stats() -> dict[str, int]:
+    """リーダーとして実行した回数・他の実行を待って結果を共有した回数・処理中の件数。"""
+
+    with _LOCK:
+        return {"leaders": _STATS["leaders"], "shared": _STATS["shared"], "inflight": len(_FLIGHTS)}
+
+
+def reset_stats() -> None:
+    with _LOCK:
+        for name in _STATS:
+            _STATS[name] = 0
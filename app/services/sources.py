@@ -0,0 +1,255 @@
+"""ニュースソースとパーサーの対応表。
+
+URL のホスト名（と任意のパスパターン）からソースを決め、そのソースの
+パーサーと抽出用セレクタで記事を解析する。セレクタは登録時に一度だけ
+コンパイルし、振り分けはホスト名の辞書引きで行うため、ソースを増やしても
+1件あたりの判定コストは増えない。
+
+ソースを追加するには ``SourceSpec`` を ``register`` する。既存パーサーを
+別サイトに流用する場合は ``selectors`` だけ差し替えればよい。
+
+パース結果は ``parse_cache`` で（ソース名, バージョン, HTML のハッシュ）ごとに
+使い回す。バージョンは ``SourceSpec.version`` とセレクタから作るため、パーサーの
+``PARSER_VERSION`` を上げるかセレクタを変えると以前の結果は使われなくなる。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+from urllib.parse import urlsplit
+
+from . import nifty_news, parse_cache, parsing, virtual_news_parser
+
+ParseFunc = Callable[[str, str, "parsing.Selectors"], parsing.ParsedArticle]
+RootParseFunc = Callable[[Any, str, "parsing.Selectors"], parsing.ParsedArticle]
+
+
+@dataclass(slots=True, frozen=True)
+class SourceSpec:
+    """ソースの宣言。
+
+    ``hosts`` が空なら全ホストが対象で、ホスト指定のあるソースの後に判定する。
+    ``path_pattern`` はパスに対する正規表現（``re.search``）。
+    ``follow_pattern`` に合うページ（一覧・トピックス等）は ``follow`` で
+    記事URLを取り出して取得し直してから解析する。
+    ``stream_until``（タグ名, class トークン）は、その要素が閉じればパーサーに
+    必要な要素が出そろう記事コンテナ。``parse_root`` と合わせて指定すると
+    ストリーミング取得で残りのダウンロードを打ち切れる。
+    ``version`` はパーサーの版。上げるとパース結果のキャッシュが無効になる。
+    """
+
+    name: str
+    parse: ParseFunc
+    hosts: tuple[str, ...] = ()
+    schemes: tuple[str, ...] = ("http", "https")
+    path_pattern: str | None = None
+    selectors: Mapping[str, str] = field(default_factory=dict)
+    follow_pattern: str | None = None
+    follow: Callable[[str], str | None] | None = None
+    stream_until: tuple[str, str] | None = None
+    parse_root: RootParseFunc | None = None
+    version: int = 1
+
+
+@dataclass(slots=True)
+class Source:
+    """登録済みのソース（パターンとセレクタはコンパイル済み）。"""
+
+    spec: SourceSpec
+    path_re: re.Pattern[str] | None
+    follow_re: re.Pattern[str] | None
+    selectors: dict[str, Any]
+    cache_version: str
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    def matches(self, scheme: str, path: str) -> bool:
+        if scheme not in self.spec.schemes:
+            return False
+        return self.path_re is None or self.path_re.search(path) is not None
+
+    def should_follow(self, url: str) -> bool:
+        """記事ページを別途取得する必要があるページか。"""
+
+        if self.spec.follow is None or self.follow_re is None:
+            return False
+        return self.follow_re.search(urlsplit(url).path) is not None
+
+    def parse(self, url: str, html: str) -> parsing.ParsedArticle:
+        cache_key = None
+        if parse_cache.is_enabled():
+            cache_key = parse_cache.key(self.spec.name, self.cache_version, html)
+            cached = parse_cache.get(cache_key, url)
+            if cached is not None:
+                return cached
+        started = time.perf_counter()
+        try:
+            parsed = self.spec.parse(html, url, self.selectors)
+        finally:
+            _record_timing(self.spec.name, time.perf_counter() - started)
+        if cache_key is not None:
+            parse_cache.put(cache_key, parsed)
+        return parsed
+
+    def parse_bytes(self, url: str, content: bytes, content_type: str | None = None) -> parsing.ParsedArticle:
+        """本文のバイト列を解析する。文字コードは ``parsing.resolve_encoding`` で決める。"""
+
+        return self.parse(url, parsing.decode_html(content, content_type))
+
+    def streaming(self) -> parsing.StreamingParse | None:
+        """ストリーミング解析に対応していれば新しい ``StreamingParse``。"""
+
+        if self.spec.stream_until is None or self.spec.parse_root is None:
+            return None
+        return parsing.StreamingParse(self.spec.stream_until)
+
+    def parse_stream(self, url: str, stream: parsing.StreamingParse) -> parsing.ParsedArticle:
+        """``streaming()`` で組み立てた木から記事を取り出す。"""
+
+        started = time.perf_counter()
+        try:
+            return self.spec.parse_root(stream.close(), url, self.selectors)
+        finally:
+            _record_timing(self.spec.name, time.perf_counter() - started)
+
+
+_BY_HOST: dict[str, list[Source]] = {}
+_ANY_HOST: list[Source] = []
+_BY_NAME: dict[str, Source] = {}
+_DEFAULT: Source | None = None
+
+_TIMINGS: dict[str, list[float]] = {}
+_TIMING_LOCK = threading.Lock()
+
+
+def register(spec: SourceSpec, *, default: bool = False) -> Source:
+    """ソースを登録する。``default`` は他のどれにも合わない URL の受け皿。"""
+
+    global _DEFAULT
+    source = Source(
+        spec=spec,
+        path_re=re.compile(spec.path_pattern) if spec.path_pattern else None,
+        follow_re=re.compile(spec.follow_pattern) if spec.follow_pattern else None,
+        selectors=parsing.compile_selectors(spec.selectors),
+        cache_version=_cache_version(spec),
+    )
+    _BY_NAME[spec.name] = source
+    if default:
+        _DEFAULT = source
+    elif spec.hosts:
+        for host in spec.hosts:
+            _BY_HOST.setdefault(host.lower(), []).append(source)
+    else:
+        _ANY_HOST.append(source)
+    return source
+
+
+def _cache_version(spec: SourceSpec) -> str:
+    # セレクタを差し替えただけでも結果が変わるので、その内容もバージョンに含める
+    selectors = json.dumps(dict(spec.selectors), sort_keys=True, ensure_ascii=False)
+    return f"v{spec.version}-{hashlib.sha256(selectors.encode('utf-8')).hexdigest()[:12]}"
+
+
+def unregister(name: str) -> None:
+    global _DEFAULT
+    source = _BY_NAME.pop(name, None)
+    if source is None:
+        return
+    for host in source.spec.hosts:
+        entries = _BY_HOST.get(host.lower(), [])
+        if source in entries:
+            entries.remove(source)
+    if source in _ANY_HOST:
+        _ANY_HOST.remove(source)
+    if _DEFAULT is source:
+        _DEFAULT = None
+
+
+def resolve(url: str) -> Source | None:
+    """URL に対応するソース。どれにも合わず既定ソースもなければ ``None``。"""
+
+    parts = urlsplit(url)
+    scheme, path = parts.scheme.lower(), parts.path
+    for source in _BY_HOST.get(parts.netloc.lower(), ()):
+        if source.matches(scheme, path):
+            return source
+    for source in _ANY_HOST:
+        if source.matches(scheme, path):
+            return source
+    return _DEFAULT
+
+
+def get(name: str) -> Source:
+    return _BY_NAME[name]
+
+
+def _record_timing(name: str, elapsed: float) -> None:
+    with _TIMING_LOCK:
+        entry = _TIMINGS.get(name)
+        if entry is None:
+            entry = _TIMINGS[name] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+
+def timing_stats() -> dict[str, dict[str, float]]:
+    """ソース別のパース回数・平均・最大（秒）。このプロセス内の集計。"""
+
+    with _TIMING_LOCK:
+        return {
+            name: {"count": int(count), "mean": total / count if count else 0.0, "max": maximum}
+            for name, (count, total, maximum) in _TIMINGS.items()
+        }
+
+
+def reset_timings() -> None:
+    with _TIMING_LOCK:
+        _TIMINGS.clear()
+
+
+def format_timings() -> list[str]:
+    return [
+        f"parse {name}: count={entry['count']} mean={entry['mean'] * 1000:.2f}ms max={entry['max'] * 1000:.2f}ms"
+        for name, entry in sorted(timing_stats().items())
+    ]
+
+
+def _parse_generic(html: str, url: str, selectors: parsing.Selectors) -> parsing.ParsedArticle:
+    return parsing.parse_article(url, html)
+
+
+register(
+    SourceSpec(
+        name="nifty_news",
+        parse=nifty_news.NiftyNewsParser.parse_article,
+        hosts=("news.nifty.com",),
+        schemes=("https",),
+        path_pattern=r"^/(?:topics|article)/",
+        selectors=nifty_news.SELECTORS,
+        follow_pattern=r"^/topics/",
+        follow=nifty_news.NiftyNewsParser.extract_article_url,
+        version=nifty_news.PARSER_VERSION,
+    )
+)
+register(
+    SourceSpec(
+        name="virtual_news",
+        parse=virtual_news_parser.VirtualNewsParser.parse_article,
+        path_pattern=r"virtual-news/article/",
+        selectors=virtual_news_parser.SELECTORS,
+        # タイトル・日付・本文は <article class="blog-post"> の中にある
+        stream_until=("article", "blog-post"),
+        parse_root=virtual_news_parser.VirtualNewsParser.parse_root,
+        version=virtual_news_parser.PARSER_VERSION,
+    )
+)
+# Yahoo! など JSON-LD / 汎用 DOM 抽出で読むページ
+register(SourceSpec(name="yahoo_news", parse=_parse_generic, version=parsing.PARSER_VERSION), default=True)
@@ -0,0 +1,293 @@
+"""負荷計測用の合成ニュースオリジン。
+
+記事番号から決定的に生成した記事を Virtual News と同じマークアップで返す
+ローカル HTTP サーバー。記事を保持しないため件数は数百万件でもよく、
+応答ごとの遅延・エラー率・本文サイズを設定で変えられる。
+``flask synthetic-origin`` で別プロセスとして起動し、``scraping`` /
+``parsing`` / ``ingest_article`` をインターネットに出ずに計測する。
+
+提供するパス:
+
+- ``/virtual-news/?page=N`` … 記事一覧（新しい順、ページ単位）
+- ``/virtual-news/feed.xml?page=N`` … 同じ一覧の RSS（``atom:link rel="next"`` 付き）
+- ``/virtual-news/article/<id>`` … 記事本文
+- ``/robots.txt`` … 全許可
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Final
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 記事 1 の公開日時。以降 1 件ごとに 1 分ずつ新しくなる
+EPOCH: Final[datetime] = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ERROR_STATUSES: Final[tuple[int, ...]] = (500, 502, 503)
+
+_SUBJECTS: Final[tuple[str, ...]] = (
+    "政府", "大手IT企業", "研究チーム", "地方自治体", "新興企業", "国際機関", "大学", "業界団体",
+)
+_TOPICS: Final[tuple[str, ...]] = (
+    "生成AI", "半導体", "再生可能エネルギー", "宇宙開発", "量子計算", "自動運転", "医療データ", "物流網",
+)
+_ACTIONS: Final[tuple[str, ...]] = (
+    "新方針を発表", "実証実験を開始", "大型投資を決定", "規制案を公表", "提携を合意", "調査結果を公開",
+)
+_SENTENCES: Final[tuple[str, ...]] = (
+    "関係者によると、計画は来年度から段階的に実施される見通しだ。",
+    "専門家の間では、効果を疑問視する声も上がっている。",
+    "今回の発表を受けて、関連銘柄の株価は一時上昇した。",
+    "担当者は「利用者の安全を最優先に進める」と述べた。",
+    "同様の取り組みは海外でも広がりつつある。",
+    "一方で、費用負担のあり方については議論が続いている。",
+    "詳細な仕様は今後の会合で詰める予定だという。",
+    "市場調査会社は、関連市場が数年で倍増すると予測している。",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class OriginSettings:
+    """合成オリジンの挙動。``latency`` と ``jitter`` は秒、``body_bytes`` は UTF-8 のバイト数。"""
+
+    articles: int = 1000
+    per_page: int = 50
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    body_bytes: int = 2000
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class SyntheticArticle:
+    id: int
+    title: str
+    published_at: datetime
+    paragraphs: list[str]
+
+
+def _rng(settings: OriginSettings, article_id: int, purpose: str) -> random.Random:
+    return random.Random(f"{settings.seed}:{purpose}:{article_id}")
+
+
+def article(settings: OriginSettings, article_id: int) -> SyntheticArticle:
+    """記事番号から記事を生成する。同じ設定・番号なら常に同じ内容になる。"""
+
+    rng = _rng(settings, article_id, "article")
+    title = f"{rng.choice(_SUBJECTS)}、{rng.choice(_TOPICS)}で{rng.choice(_ACTIONS)}（第{article_id}報）"
+
+    paragraphs: list[str] = []
+    size = 0
+    while size < settings.body_bytes:
+        paragraph = "".join(rng.choice(_SENTENCES) for _ in range(rng.randint(2, 4)))
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+
+    return SyntheticArticle(
+        id=article_id,
+        title=title,
+        published_at=EPOCH + timedelta(minutes=article_id),
+        paragraphs=paragraphs or [title],
+    )
+
+
+def is_error(settings: OriginSettings, article_id: int) -> int | None:
+    """エラー応答にする記事ならステータスコードを返す。記事ごとに決定的に決まる。"""
+
+    if settings.error_rate <= 0:
+        return None
+    rng = _rng(settings, article_id, "error")
+    if rng.random() < settings.error_rate:
+        return rng.choice(ERROR_STATUSES)
+    return None
+
+
+def page_ids(settings: OriginSettings, page: int) -> range:
+    """一覧 ``page``（1始まり）に載る記事番号を新しい順に返す。"""
+
+    newest = settings.articles - (page - 1) * settings.per_page
+    oldest = max(newest - settings.per_page, 0)
+    return range(newest, oldest, -1)
+
+
+def etag_for(settings: OriginSettings, article_id: int) -> str:
+    key = f"{settings.seed}:{settings.body_bytes}:{article_id}".encode("utf-8")
+    return f'"{hashlib.sha1(key).hexdigest()[:16]}"'
+
+
+def render_article(item: SyntheticArticle) -> str:
+    """``virtual_news/article.html`` と同じ構造の HTML を返す。"""
+
+    body = "\n".join(f"            <p>{escape(paragraph)}</p>" for paragraph in item.paragraphs)
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>{escape(item.title)}</title></head>
+<body>
+<div class="container mt-5">
+    <article class="blog-post">
+        <h1 class="blog-post-title mb-3">{escape(item.title)}</h1>
+        <p class="blog-post-meta text-muted mb-4">{item.published_at.strftime('%Y年%m月%d日 %H:%M')}</p>
+        <hr>
+        <div class="article-body mt-4">
+{body}
+        </div>
+    </article>
+</div>
+</body>
+</html>
+"""
+
+
+def render_index(settings: OriginSettings, page: int, base_url: str) -> str:
+    links = []
+    for article_id in page_ids(settings, page):
+        item = article(settings, article_id)
+        links.append(
+            f'        <li><a href="{base_url}/virtual-news/article/{article_id}">{escape(item.title)}</a></li>'
+        )
+    next_link = ""
+    if page_ids(settings, page + 1):
+        next_link = f'    <a rel="next" href="{base_url}/virtual-news/?page={page + 1}">次へ</a>\n'
+    items = "\n".join(links)
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>Virtual News</title></head>
+<body>
+    <ul class="articles">
+{items}
+    </ul>
+{next_link}</body>
+</html>
+"""
+
+
+def render_feed(settings: OriginSettings, page: int, base_url: str) -> str:
+    entries = []
+    for article_id in page_ids(settings, page):
+        item = article(settings, article_id)
+        entries.append(
+            "    <item>\n"
+            f"      <title>{escape(item.title)}</title>\n"
+            f"      <link>{base_url}/virtual-news/article/{article_id}</link>\n"
+            f"      <pubDate>{format_datetime(item.published_at)}</pubDate>\n"
+            "    </item>"
+        )
+    next_link = ""
+    if page_ids(settings, page + 1):
+        next_link = (
+            f'    <atom:link rel="next" href="{base_url}/virtual-news/feed.xml?page={page + 1}"/>\n'
+        )
+    items = "\n".join(entries)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <title>Virtual News (synthetic)</title>
+{next_link}{items}
+  </channel>
+</rss>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "SyntheticOriginServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler のシグネチャ
+        logger.debug("synthetic origin: " + format, *args)
+
+    def _delay(self) -> None:
+        settings = self.server.settings
+        delay = settings.latency
+        if settings.jitter > 0:
+            delay += random.uniform(0, settings.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _send(self, status: int, body: str, content_type: str, headers: dict[str, str] | None = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _page(self, query: str) -> int | None:
+        try:
+            page = int(parse_qs(query).get("page", ["1"])[0])
+        except ValueError:
+            return None
+        if page < 1 or not page_ids(self.server.settings, page):
+            return None
+        return page
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler の命名
+        settings = self.server.settings
+        parts = urlsplit(self.path)
+        path = parts.path
+        self._delay()
+
+        if path == "/robots.txt":
+            self._send(200, "User-agent: *\nAllow: /\n", "text/plain; charset=utf-8")
+            return
+
+        if path in ("/virtual-news", "/virtual-news/", "/virtual-news/feed.xml"):
+            page = self._page(parts.query)
+            if page is None:
+                self._send(404, "not found", "text/plain; charset=utf-8")
+            elif path.endswith("feed.xml"):
+                self._send(200, render_feed(settings, page, self.server.base_url), "application/rss+xml; charset=utf-8")
+            else:
+                self._send(200, render_index(settings, page, self.server.base_url), "text/html; charset=utf-8")
+            return
+
+        prefix = "/virtual-news/article/"
+        if path.startswith(prefix) and path[len(prefix):].isdigit():
+            article_id = int(path[len(prefix):])
+            if 1 <= article_id <= settings.articles:
+                status = is_error(settings, article_id)
+                if status is not None:
+                    self._send(status, "synthetic error", "text/plain; charset=utf-8")
+                    return
+                etag = etag_for(settings, article_id)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._send(
+                    200,
+                    render_article(article(settings, article_id)),
+                    "text/html; charset=utf-8",
+                    {"ETag": etag},
+                )
+                return
+
+        self._send(404, "not found", "text/plain; charset=utf-8")
+
+    do_HEAD = do_GET
+
+
+class SyntheticOriginServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, settings: OriginSettings, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.settings = settings
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
@@ -2,13 +2,26 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from typing import Any
 
 from bs4 import BeautifulSoup
 
-from .parsing import ParsedArticle
+from . import datetimes
+from .parsing import ParsedArticle, Selectors, class_xpath, compile_selectors, node_text, parse_tree
 
 logger = logging.getLogger(__name__)
 
+# 抽出結果が変わる修正をしたら上げる（パース結果のキャッシュが無効になる）
+PARSER_VERSION = 1
+
+# タイトル・日付・本文コンテナ（本文はコンテナ内の <p>）
+SELECTORS = {
+    "title": f"(//h1[{class_xpath('blog-post-title')}])[1]",
+    "date": f"(//p[{class_xpath('blog-post-meta')}])[1]",
+    "body": f"(//div[{class_xpath('article_body')}])[1]",
+}
+_SELECTORS = compile_selectors(SELECTORS)
+
 class VirtualNewsParser:
     """Virtual News記事の解析"""
 
@@ -18,17 +31,55 @@ class VirtualNewsParser:
         return "virtual-news/article/" in url
 
     @staticmethod
-    def parse_article(html: str, url: str) -> ParsedArticle:
+    def parse_article(html: str, url: str, selectors: Selectors | None = None) -> ParsedArticle:
         """
         Virtual News記事をパース
 
+        タイトルの h1、日付の段落、本文コンテナだけを XPath で取り出す。
+        結果は ``parse_article_soup`` と同じ。
+
         Args:
             html: HTML文字列
             url: 記事URL
+            selectors: ``SELECTORS`` と同じキーのコンパイル済み XPath（ソース登録時に渡す）
 
         Returns:
             ParsedArticle: パース結果
         """
+        return VirtualNewsParser.parse_root(parse_tree(html), url, selectors)
+
+    @staticmethod
+    def parse_root(root: Any | None, url: str, selectors: Selectors | None = None) -> ParsedArticle:
+        """構築済みの lxml 木（ストリーミング取得で組み立てたものなど）から記事を取り出す。"""
+        selectors = selectors or _SELECTORS
+        title = "タイトル不明"
+        published_at = None
+        body_parts: list[str] = []
+
+        if root is not None:
+            title_tag = selectors["title"](root)
+            if title_tag:
+                title = node_text(title_tag[0])
+
+            date_tag = selectors["date"](root)
+            if date_tag:
+                # 2025年11月30日 10:00 -> datetime
+                published_at = datetimes.parse_japanese(node_text(date_tag[0]), require_time=True)
+
+            article_body = selectors["body"](root)
+            if article_body:
+                body_parts = [text for text in map(node_text, article_body[0].iter('p')) if text]
+
+        return ParsedArticle(
+            url=url,
+            title=title,
+            published_at=published_at,
+            body='\n\n'.join(body_parts) if body_parts else "本文取得失敗"
+        )
+
+    @staticmethod
+    def parse_article_soup(html: str, url: str) -> ParsedArticle:
+        """BeautifulSoup による従来の ``parse_article``（同等性確認用）。"""
         soup = BeautifulSoup(html, 'lxml')
 
         # タイトル取得
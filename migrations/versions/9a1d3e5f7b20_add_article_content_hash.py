@@ -0,0 +1,27 @@
+"""add article content hash
+
+Revision ID: 9a1d3e5f7b20
+Revises: 7c4e1f2a8b90
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1d3e5f7b20'
+down_revision = '7c4e1f2a8b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 既存の記事は次に内容が取得されたときに埋まる
+    with op.batch_alter_table('articles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('articles', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
@@ -1,4 +1,8 @@
 import base64
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
 from app import create_app
@@ -36,3 +40,89 @@ def auth_header(app):
     credentials = f"{app.config['BASIC_AUTH_USERNAME']}:{app.config['BASIC_AUTH_PASSWORD']}".encode()
     token = base64.b64encode(credentials).decode()
     return {"Authorization": f"Basic {token}"}
+
+
+class _LocalOrigin:
+    """テスト用のローカルHTTPサーバー（Keep-Alive対応、遅延注入可）。"""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.pages: dict[str, tuple[int, dict[str, str], bytes]] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.active = 0
+        self.max_concurrency = 0
+        self._lock = threading.Lock()
+
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802 - http.server の規約
+                with origin._lock:
+                    origin.requests.append((self.path, dict(self.headers)))
+                    origin.active += 1
+                    origin.max_concurrency = max(origin.max_concurrency, origin.active)
+                if origin.latency:
+                    time.sleep(origin.latency)
+                with origin._lock:
+                    origin.active -= 1
+                status, headers, body = origin.pages.get(
+                    self.path, (404, {"Content-Type": "text/plain"}, b"not found")
+                )
+                etag = headers.get("ETag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if headers.get("Transfer-Encoding") == "chunked":
+                    # Content-Length なしで少しずつ送る
+                    self.end_headers()
+                    for start in range(0, len(body), 16 * 1024):
+                        piece = body[start:start + 16 * 1024]
+                        self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    return
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return None
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def add_page(self, path: str, body: str | bytes, status: int = 200, headers: dict[str, str] | None = None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.pages[path] = (status, headers or {"Content-Type": "text/html; charset=utf-8"}, body)
+        return f"{self.base_url}{path}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def local_origin():
+    from app.services import circuit_breaker, fetch_metrics, politeness, scraping
+
+    scraping.reset_session()
+    politeness.reset()
+    circuit_breaker.reset()
+    fetch_metrics.reset()
+    origin = _LocalOrigin()
+    origin.start()
+    yield origin
+    origin.stop()
+    scraping.reset_session()
+    politeness.reset()
+    circuit_breaker.reset()
+    fetch_metrics.reset()
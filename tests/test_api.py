@@ -34,7 +34,10 @@ def test_api_create_article_success(app, client, auth_header, mocker):
 
     sample_url = "https://news.yahoo.co.jp/articles/api-success"
 
-    mocker.patch("app.services.articles.scraping.fetch", return_value=mocker.Mock(url=sample_url, text="html"))
+    mocker.patch(
+        "app.services.articles.scraping.fetch",
+        return_value=mocker.Mock(url=sample_url, text="html", status_code=200, headers={}),
+    )
     parsed = parsing.ParsedArticle(url=sample_url, title="APIタイトル", published_at=datetime.utcnow(), body="本文")
     mocker.patch("app.services.articles.parsing.parse_article", return_value=parsed)
     mocker.patch(
@@ -95,7 +98,10 @@ def test_api_create_article_force_update(app, client, auth_header, mocker):
         db.session.add(article)
         db.session.commit()
 
-    mocker.patch("app.services.articles.scraping.fetch", return_value=mocker.Mock(url=sample_url, text="html"))
+    mocker.patch(
+        "app.services.articles.scraping.fetch",
+        return_value=mocker.Mock(url=sample_url, text="html", status_code=200, headers={}),
+    )
     parsed = parsing.ParsedArticle(url=sample_url, title="新タイトル", published_at=None, body="新本文")
     mocker.patch("app.services.articles.parsing.parse_article", return_value=parsed)
 
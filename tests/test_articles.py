@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+from requests import Response
+from sqlalchemy import event
+
+from app.models.article import Article, InferenceResult
+from app.models.db import db
+from app.services import articles as article_service
+from app.services import raw_store
+
+
+ARTICLE_HTML = """
+<html>
+<body>
+    <h1 class="blog-post-title">条件付きGETの記事</h1>
+    <p class="blog-post-meta">2025年11月30日 10:00</p>
+    <div class="article_body">
+        <p>本文その1</p>
+        <p>本文その2</p>
+    </div>
+</body>
+</html>
+"""
+
+
+def test_ingest_stores_validators_and_revalidates(app, local_origin, mocker):
+    url = local_origin.add_page(
+        "/virtual-news/article/etag",
+        ARTICLE_HTML,
+        headers={
+            "Content-Type": "text/html; charset=utf-8",
+            "ETag": '"v1"',
+            "Last-Modified": "Sun, 30 Nov 2025 01:00:00 GMT",
+        },
+    )
+    ai_mock = mocker.patch(
+        "app.services.articles.ai_service.summarize_and_score",
+        return_value=mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1"),
+    )
+
+    with app.app_context():
+        app.config["ENABLE_AI"] = True
+        created = article_service.ingest_article(url)
+        assert created.status == "created"
+        assert created.ai_ran
+        assert created.article.etag == '"v1"'
+        assert created.article.last_modified == "Sun, 30 Nov 2025 01:00:00 GMT"
+
+        refreshed = article_service.ingest_article(url, force=True)
+        assert refreshed.status == "not_modified"
+        assert refreshed.article.title == "条件付きGETの記事"
+        assert not refreshed.ai_ran
+        app.config["ENABLE_AI"] = False
+
+    _, headers = local_origin.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Sun, 30 Nov 2025 01:00:00 GMT"
+    # 304 のときはAIを再実行しない
+    ai_mock.assert_called_once()
+
+
+def test_ingest_updates_when_validator_changes(app, local_origin):
+    path = "/virtual-news/article/changed"
+    url = local_origin.add_page(path, ARTICLE_HTML, headers={"ETag": '"v1"'})
+
+    with app.app_context():
+        article_service.ingest_article(url, run_ai=False)
+        local_origin.add_page(path, ARTICLE_HTML.replace("本文その2", "本文その2（更新）"), headers={"ETag": '"v2"'})
+
+        result = article_service.ingest_article(url, force=True, run_ai=False)
+
+        assert result.status == "updated"
+        assert "更新" in result.article.body
+        assert db.session.get(Article, result.article.id).etag == '"v2"'
+
+
+def test_refetch_with_same_content_skips_update_and_ai(app, local_origin, mocker):
+    path = "/virtual-news/article/unchanged"
+    url = local_origin.add_page(path, ARTICLE_HTML, headers={"ETag": '"v1"'})
+    ai_mock = mocker.patch(
+        "app.services.articles.ai_service.summarize_and_score",
+        return_value=mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1"),
+    )
+
+    with app.app_context():
+        app.config["ENABLE_AI"] = True
+        created = article_service.ingest_article(url)
+        # 検証子は変わったが、本文は空白の違いだけ
+        local_origin.add_page(
+            path, ARTICLE_HTML.replace("<p>本文その1</p>", "<p>本文その1 </p>"), headers={"ETag": '"v2"'}
+        )
+
+        with _count_statements() as statements:
+            result = article_service.ingest_article(url, force=True)
+        local_origin.add_page(path, ARTICLE_HTML, headers={"ETag": '"v3"'})
+        many = article_service.ingest_many([url], force=True)
+        app.config["ENABLE_AI"] = False
+
+        assert result.status == many[0].result.status == "unchanged"
+        assert not result.ai_ran and not many[0].result.ai_ran
+        assert ai_mock.call_count == 1
+        updates = [sql for sql in statements if sql.startswith("UPDATE articles")]
+        assert updates == ["UPDATE articles SET etag=? WHERE articles.id = ?"]
+        article = db.session.get(Article, created.article.id)
+        assert article.etag == '"v3"'
+        assert article.content_hash == article_service.content_hash(article.title, article.body)
+
+
+def test_ai_runs_outside_the_article_transaction(app, mocker):
+    states = []
+
+    def summarize_and_score(title, body):
+        # 記事はコミット済みで、AI の応答待ちの間はトランザクションを開いていない
+        states.append((db.session().in_transaction(), db.session.query(Article).count()))
+        db.session.rollback()
+        return mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1")
+
+    mocker.patch("app.services.articles.ai_service.summarize_and_score", side_effect=summarize_and_score)
+    single_url, single = _page(1)
+    batch = dict(_page(n) for n in (2, 3))
+
+    with app.app_context():
+        app.config["ENABLE_AI"] = True
+        result = article_service.ingest_article(single_url, response=single)
+        items = article_service.ingest_many(list(batch), responses=batch)
+        app.config["ENABLE_AI"] = False
+
+        assert result.ai_ran and all(item.result.ai_ran for item in items)
+        assert [count for _, count in states] == [1, 3, 3]
+        assert not any(active for active, _ in states)
+        assert db.session.query(InferenceResult).count() == 3
+
+
+def test_reparse_rebuilds_articles_from_raw_store(app, local_origin, tmp_path):
+    url = local_origin.add_page("/virtual-news/article/stored", ARTICLE_HTML, headers={"ETag": '"raw"'})
+
+    with app.app_context():
+        app.config["RAW_STORE_ENABLED"] = True
+        app.config["RAW_STORE_DIR"] = str(tmp_path)
+        article_service.ingest_article(url, run_ai=False)
+        request_count = len(local_origin.requests)
+
+        entry = raw_store.get(url)
+        assert entry is not None
+        assert raw_store.load_body(entry) == ARTICLE_HTML.encode("utf-8")
+        assert list((tmp_path / "objects").glob("*/*.html.gz"))
+
+        db.session.query(Article).update({Article.title: "壊れたタイトル"})
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reparse"])
+
+    assert result.exit_code == 0, result.output
+    assert "updated=1" in result.output
+    assert len(local_origin.requests) == request_count
+    with app.app_context():
+        article = db.session.scalar(db.select(Article).where(Article.url == url))
+        assert article.title == "条件付きGETの記事"
+        assert article.etag == '"raw"'
+
+
+def test_reparse_counts_results_shared_with_a_concurrent_ingest(app, local_origin, tmp_path, mocker):
+    url = local_origin.add_page("/virtual-news/article/stored-shared", ARTICLE_HTML)
+
+    with app.app_context():
+        app.config["RAW_STORE_ENABLED"] = True
+        app.config["RAW_STORE_DIR"] = str(tmp_path)
+        article_service.ingest_article(url, run_ai=False)
+
+    def shared(url, **kwargs):
+        # 別の取り込みが先に保存した記事が返った場合
+        article = db.session.scalar(db.select(Article).where(Article.url == url))
+        return article_service.ArticleIngestionResult(
+            article=article, status="cached", ai_enabled=False, ai_ran=False, ai_error=None
+        )
+
+    mocker.patch("app.cli.article_service.ingest_article", side_effect=shared)
+
+    result = app.test_cli_runner().invoke(args=["reparse"])
+
+    assert result.exit_code == 0, result.output
+    assert "[CACHED      ]" in result.output
+    assert "created=0 updated=0 unchanged=0 cached=1 not_modified=0 skipped=0 errors=0" in result.output
+
+
+
+def _page(article_id: int) -> tuple[str, Response]:
+    url = f"http://localhost:5000/virtual-news/article/batch-{article_id}"
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response._content = ARTICLE_HTML.replace("条件付きGETの記事", f"バッチ記事{article_id}").encode("utf-8")
+    return url, response
+
+
+@contextmanager
+def _count_statements():
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+
+
+def test_ingest_many_uses_set_based_queries_and_batched_commits(app, mocker):
+    pages = dict(_page(article_id) for article_id in range(1, 51))
+    urls = list(pages)
+
+    with app.app_context():
+        article_service.ingest_article(urls[0], run_ai=False, response=pages[urls[0]])
+        commit = mocker.spy(db.session, "commit")
+
+        with _count_statements() as statements:
+            outcomes = article_service.ingest_many(
+                urls + [urls[1], ""],
+                run_ai=False,
+                responses=pages,
+                batch_size=20,
+            )
+
+        assert [outcome.url for outcome in outcomes] == urls + [""]
+        assert [outcome.result.status for outcome in outcomes[:3]] == ["cached", "created", "created"]
+        assert outcomes[-1].error.status_code == 400
+        assert outcomes[10].result.article.title == "バッチ記事11"
+        assert commit.call_count == 3
+        # 既存記事・推論の検索と、バッチごとの一括 INSERT だけで済む
+        assert len(statements) <= 10
+        assert db.session.query(Article).count() == 50
+
+
+def test_ingest_many_reloads_existing_rows_per_batch_not_per_row(app):
+    pages = dict(_page(article_id) for article_id in range(1, 31))
+    urls = list(pages)
+
+    with app.app_context():
+        article_service.ingest_many(urls, run_ai=False, responses=pages)
+        for response in pages.values():
+            response._content = response.content.replace("バッチ記事".encode("utf-8"), "更新記事".encode("utf-8"))
+
+        with _count_statements() as statements:
+            outcomes = article_service.ingest_many(urls, force=True, run_ai=False, responses=pages, batch_size=10)
+
+        assert [outcome.result.status for outcome in outcomes] == ["updated"] * 30
+        assert outcomes[-1].result.article.title == "更新記事30"
+        # コミット後に失効した記事を主キーで1件ずつ読み直さない
+        selects = [sql for sql in statements if sql.startswith("SELECT")]
+        assert not [sql for sql in selects if "WHERE articles.id = ?" in sql]
+        assert len(selects) <= 6
+
+
+def test_ingest_many_reports_errors_per_url(app, mocker):
+    good_url, good = _page(1)
+    bad_url, bad = _page(2)
+    bad.url = bad_url = "https://news.yahoo.co.jp/articles/batch-broken"
+    bad._content = b"<html><body></body></html>"
+    ai_mock = mocker.patch(
+        "app.services.articles.ai_service.summarize_and_score",
+        return_value=mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1"),
+    )
+
+    with app.app_context():
+        app.config["ENABLE_AI"] = True
+        outcomes = article_service.ingest_many([bad_url, good_url], responses={bad_url: bad, good_url: good})
+        app.config["ENABLE_AI"] = False
+
+        assert not outcomes[0].ok and outcomes[0].error.status_code == 422
+        assert outcomes[1].ok and outcomes[1].result.ai_ran
+        assert db.session.query(Article).count() == 1
+    ai_mock.assert_called_once()
+
+
+def test_ingest_many_fetches_missing_responses(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/batch-fetch", ARTICLE_HTML, headers={"ETag": '"v1"'})
+
+    with app.app_context():
+        created, = article_service.ingest_many([url], run_ai=False)
+        refreshed, = article_service.ingest_many([url], force=True, run_ai=False)
+
+        assert created.result.status == "created"
+        assert refreshed.result.status == "not_modified"
+    _, headers = local_origin.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.article import Article, InferenceResult
+from app.models.db import db
+from app.services import canonical_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        (
+            " HTTPS://News.Example.com:443/Articles/1?utm_source=rss&id=3&fbclid=x#comments ",
+            "https://news.example.com/Articles/1?id=3",
+        ),
+        ("http://example.com", "http://example.com/"),
+        ("http://example.com:8080/a/?b=2&a=1", "http://example.com:8080/a/?b=2&a=1"),
+        ("http://example.com/a?flag=&UTM_MEDIUM=feed", "http://example.com/a?flag="),
+        ("ftp://example.com/file#top", "ftp://example.com/file#top"),
+        ("", ""),
+    ],
+)
+def test_canonicalize(url, expected):
+    assert canonical_url.canonicalize(url) == expected
+
+
+def test_canonicalize_strips_configured_params(app):
+    with app.app_context():
+        app.config["URL_STRIP_PARAMS"] = ("from",)
+        assert canonical_url.canonicalize("http://example.com/a?from=top&id=1") == "http://example.com/a?id=1"
+
+
+def test_canonicalize_urls_command_merges_stored_duplicates(app):
+    canonical = "https://news.example.com/articles/1"
+    with app.app_context():
+        older = Article(url=canonical + "?utm_source=rss", title="古い", body="本文")
+        newer = Article(url="HTTPS://News.Example.com/articles/1#top", title="新しい", body="本文")
+        other = Article(url="https://news.example.com/articles/2?fbclid=x", title="別", body="本文")
+        db.session.add_all([older, newer, other])
+        db.session.flush()
+        older.created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        newer.created_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        db.session.add(InferenceResult(article_id=older.id, risk_score=10, summary="s", model="m", prompt_version="v1"))
+        db.session.commit()
+        newer_id = newer.id
+
+    runner = app.test_cli_runner()
+    dry = runner.invoke(args=["canonicalize-urls", "--dry-run"])
+    assert dry.output.strip() == "[DRY RUN] checked=3 renamed=2 merged=1"
+    result = runner.invoke(args=["canonicalize-urls"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == "checked=3 renamed=2 merged=1"
+    with app.app_context():
+        stored = {article.url: article for article in db.session.scalars(db.select(Article))}
+        assert set(stored) == {canonical, "https://news.example.com/articles/2"}
+        kept = stored[canonical]
+        assert kept.id == newer_id
+        assert [inference.summary for inference in kept.inferences] == ["s"]
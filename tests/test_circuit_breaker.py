@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import socket
+
+import pytest
+
+from app.services import circuit_breaker, politeness, scraping
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuits():
+    circuit_breaker.reset()
+    yield
+    circuit_breaker.reset()
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes(app, monkeypatch):
+    host = "origin.example"
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+
+    with app.app_context():
+        app.config["SCRAPE_BREAKER_THRESHOLD"] = 3
+        app.config["SCRAPE_BREAKER_COOLDOWN"] = 10
+        for _ in range(3):
+            assert circuit_breaker.allow(host)
+            circuit_breaker.record_failure(host)
+
+        assert not circuit_breaker.allow(host)
+
+        now[0] += 10
+        assert circuit_breaker.allow(host)  # half-open の試行は1件だけ
+        assert not circuit_breaker.allow(host)
+        circuit_breaker.record_failure(host)
+        assert circuit_breaker.snapshot()[host]["state"] == "open"
+
+        now[0] += 10
+        assert circuit_breaker.allow(host)
+        circuit_breaker.record_success(host, 0.1)
+        assert circuit_breaker.snapshot()[host]["state"] == "closed"
+        assert circuit_breaker.allow(host)
+
+
+def test_late_success_does_not_close_an_open_circuit(app):
+    host = "slow.example"
+    with app.app_context():
+        app.config["SCRAPE_BREAKER_THRESHOLD"] = 1
+        assert circuit_breaker.allow(host)  # open になる前に送ったリクエスト
+        circuit_breaker.record_failure(host)
+        circuit_breaker.record_success(host, 5.0)
+
+        assert circuit_breaker.snapshot()[host]["state"] == "open"
+        assert circuit_breaker.snapshot()[host]["samples"] == 1
+        assert not circuit_breaker.allow(host)
+
+
+def test_adaptive_timeout_tracks_latency_percentile(app):
+    host = "fast.example"
+    with app.app_context():
+        app.config["SCRAPE_TIMEOUT_MIN_SAMPLES"] = 10
+        app.config["SCRAPE_TIMEOUT_MULTIPLIER"] = 3.0
+        app.config["SCRAPE_TIMEOUT_MIN"] = 0.5
+        assert circuit_breaker.timeout_for(host, 10) == 10
+
+        for _ in range(10):
+            circuit_breaker.record_success(host, 0.4)
+        assert circuit_breaker.timeout_for(host, 10) == pytest.approx(1.2)
+
+        app.config["SCRAPE_ADAPTIVE_TIMEOUT"] = False
+        assert circuit_breaker.timeout_for(host, 10) == 10
+
+
+def test_fetch_fails_fast_while_circuit_open(app, client):
+    url = f"http://127.0.0.1:{_unused_port()}/virtual-news/article/1"
+
+    with app.app_context():
+        app.config["SCRAPE_RETRY_TOTAL"] = 0
+        app.config["SCRAPE_BREAKER_THRESHOLD"] = 2
+        scraping.reset_session()
+        for _ in range(2):
+            with pytest.raises(scraping.ScrapeError):
+                scraping.fetch(url)
+        with pytest.raises(scraping.CircuitOpen):
+            scraping.fetch(url)
+    scraping.reset_session()
+
+    health = client.get("/health").get_json()
+    circuits = health["scrape_circuits"]
+    assert [entry["state"] for entry in circuits.values()] == ["open"]
+
+
+def test_probe_slot_is_released_on_unexpected_error(app, monkeypatch):
+    url = f"http://127.0.0.1:{_unused_port()}/virtual-news/article/1"
+    host = politeness.host_of(url)
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+
+    def broken_get(*args, **kwargs):
+        raise ValueError("unexpected")
+
+    with app.app_context():
+        app.config["SCRAPE_BREAKER_THRESHOLD"] = 1
+        app.config["SCRAPE_BREAKER_COOLDOWN"] = 10
+        circuit_breaker.record_failure(host)
+        now[0] += 10
+        monkeypatch.setattr(scraping.get_session(), "get", broken_get)
+
+        with pytest.raises(ValueError):
+            scraping.fetch(url)
+
+        # 試行が記録されずに終わっても、次の試行は通す
+        assert circuit_breaker.allow(host)
+    scraping.reset_session()
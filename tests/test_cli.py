@@ -51,6 +51,13 @@ def test_main_predicts_and_prints(monkeypatch, capsys):
     assert "0.90" in captured.out
 
 
+def _ingested(urls, **kwargs):
+    return [
+        SimpleNamespace(url=url, ok=True, error=None, result=SimpleNamespace(status="created", ai_error=None))
+        for url in urls
+    ]
+
+
 def test_flask_cli_scrape_feed_invokes_ingest(app, mocker):
     runner = app.test_cli_runner()
     feed_items = [
@@ -69,18 +76,21 @@ def test_flask_cli_scrape_feed_invokes_ingest(app, mocker):
 
     mocker.patch("app.cli.news_feed.fetch_latest_articles", side_effect=fake_fetch)
     ingest_mock = mocker.patch(
-        "app.cli.article_service.ingest_article",
-        return_value=SimpleNamespace(status="created", ai_error=None),
+        "app.cli.article_service.ingest_many",
+        side_effect=_ingested,
     )
 
     result = runner.invoke(args=["scrape", "feed", "--limit", "1"])
 
     assert result.exit_code == 0
     ingest_mock.assert_called_once_with(
-        feed_items[0].url,
+        [feed_items[0].url],
         force=False,
         run_ai=True,
         force_ai=False,
+        responses=mocker.ANY,
+        parsed=mocker.ANY,
+        streams=mocker.ANY,
     )
     assert "created" in result.output
 
@@ -102,8 +112,8 @@ def test_flask_cli_scrape_feed_with_provider_option(app, mocker):
         side_effect=lambda limit, provider: feed_items if provider == "nifty" else [],
     )
     ingest_mock = mocker.patch(
-        "app.cli.article_service.ingest_article",
-        return_value=SimpleNamespace(status="created", ai_error=None),
+        "app.cli.article_service.ingest_many",
+        side_effect=_ingested,
     )
 
     result = runner.invoke(args=["scrape", "feed", "--provider", "nifty", "--limit", "1"])
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from dateutil import parser as dateparser, tz
+
+from app.services import datetimes
+
+JST = timezone(timedelta(hours=9))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024-05-01",
+        "2024-05-01 10:00",
+        "2024-05-01T10:00:00",
+        "2024-05-01T10:00:00.123Z",
+        "2024-05-01T10:00:00+09:00",
+        "2024-05-01T10:00:00+0900",
+        " 2024-05-01T10:00:00Z ",
+        "Wed, 01 May 2024 10:00:00 +0900",
+        "01 May 2024 10:00 GMT",
+        "May 1 2024 10am",
+    ],
+)
+def test_parse_matches_dateutil(value):
+    expected = dateparser.parse(value)
+    if expected.tzinfo is None:
+        expected = expected.replace(tzinfo=tz.gettz("Asia/Tokyo"))
+
+    assert datetimes.parse(value) == expected
+
+
+def test_parse_reads_japanese_format():
+    assert datetimes.parse("2025年11月30日 10:00") == datetime(2025, 11, 30, 10, 0, tzinfo=JST)
+    assert datetimes.parse("2024年6月1日") == datetime(2024, 6, 1, tzinfo=JST)
+    assert datetimes.parse("2025年13月40日 25:00") is None
+
+
+@pytest.mark.parametrize("value", [None, "", "   ", "not a date", "2024-05-01T25:00:00"])
+def test_parse_returns_none_for_unparseable(value):
+    assert datetimes.parse(value) is None
+
+
+def test_parse_default_tz():
+    assert datetimes.parse("2024-05-01 10:00", default_tz=None) == datetime(2024, 5, 1, 10, 0)
+    assert datetimes.parse("2024-05-01 10:00", timezone.utc).tzinfo is timezone.utc
+    # タイムゾーン付きの値はそのまま
+    assert datetimes.parse("2024-05-01T10:00:00Z", default_tz=None).utcoffset() == timedelta(0)
+    # "-0000" は UTC として扱う
+    assert datetimes.parse("Wed, 01 May 2024 10:00:00 -0000") == datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    # 解釈できないゾーン名は dateutil と同じく default_tz の現地時刻
+    assert datetimes.parse("Mon, 01 Jan 2025 10:00:00 JST") == datetime(2025, 1, 1, 10, 0, tzinfo=JST)
+    assert datetimes.parse("01 Jan 2025 10:00") == datetime(2025, 1, 1, 10, 0, tzinfo=JST)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025年11月30日 10:00",
+        "2025年1月2日  3:04",
+        "2025年11月30日10:00",
+        "2025年11月30日",
+        "2025年11月30日 24:00",
+        "x",
+    ],
+)
+def test_parse_japanese_requiring_time_matches_strptime(value):
+    try:
+        expected = datetime.strptime(value, "%Y年%m月%d日 %H:%M")
+    except ValueError:
+        expected = None
+
+    assert datetimes.parse_japanese(value, require_time=True) == expected
+
+
+def test_parse_many_and_cache():
+    values = ["2024-05-01T10:00:00Z", None, "2024-05-01T10:00:00Z", "bad"]
+
+    first, missing, second, bad = datetimes.parse_many(values)
+
+    assert first == datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    assert second is first
+    assert missing is None and bad is None
+
+
+def test_get_tz_is_memoized():
+    assert datetimes.get_tz("Asia/Tokyo") is datetimes.get_tz("Asia/Tokyo") is datetimes.TOKYO
+    assert datetimes.get_tz("Not/AZone") is None
+
+
+def test_display_fields_match_strftime():
+    dt = datetime(2024, 12, 31, 16, 5, 30, tzinfo=timezone.utc)
+    local = dt.astimezone(tz.gettz("Asia/Tokyo"))
+
+    assert datetimes.format_local(dt) == local.strftime("%Y-%m-%d %H:%M") == "2025-01-01 01:05"
+    assert datetimes.display_fields(dt) == ("2025-01-01 01:05", local.isoformat())
+    assert datetimes.display_fields(None) == (None, None)
+    assert datetimes.format_local(datetime.max.replace(tzinfo=timezone(timedelta(hours=-1)))) is None
+
+
+def test_display_fields_many_reuses_conversions():
+    dt = datetime(2024, 5, 1, 1, 0, tzinfo=timezone.utc)
+
+    results = datetimes.display_fields_many([dt, None, dt.astimezone(JST)])
+
+    assert results == [("2024-05-01 10:00", "2024-05-01T10:00:00+09:00"), (None, None)] + [results[0]]
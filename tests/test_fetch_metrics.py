@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import socket
+
+import pytest
+import requests
+
+from app.services import fetch_metrics, scraping
+
+
+def test_histogram_quantile_uses_bucket_bounds():
+    histogram = fetch_metrics.Histogram()
+    for value in (0.002, 0.002, 0.02, 0.3):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == 0.0025
+    assert histogram.quantile(1.0) == 0.3
+    assert histogram.to_dict()["buckets"]["+Inf"] == 0
+
+
+def test_fetch_records_phases_per_host(app, local_origin):
+    first = local_origin.add_page("/virtual-news/article/1", "<html>one</html>")
+    second = local_origin.add_page("/virtual-news/article/2", "<html>two</html>")
+    host = local_origin.base_url.split("://", 1)[1]
+
+    with app.app_context():
+        scraping.fetch(first)
+        scraping.fetch(second)
+
+    entry = fetch_metrics.snapshot()[host]
+    assert entry["requests"] == 2
+    assert entry["statuses"] == {"200": 2}
+    assert entry["bytes"] == len("<html>one</html>") + len("<html>two</html>")
+    # 接続は再利用されるため DNS / 接続は初回の1件のみ
+    assert entry["phases"]["dns"]["count"] == 1
+    assert entry["phases"]["connect"]["count"] == 1
+    assert "tls" not in entry["phases"]
+    for phase in ("ttfb", "download", "total"):
+        assert entry["phases"][phase]["count"] == 2
+
+
+def test_fetch_records_error_status(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/missing", "gone", status=404)
+    host = local_origin.base_url.split("://", 1)[1]
+
+    with app.app_context():
+        with pytest.raises(scraping.ScrapeError):
+            scraping.fetch(url)
+
+    entry = fetch_metrics.snapshot()[host]
+    assert entry["statuses"] == {"404": 1}
+    assert entry["bytes"] == 0
+
+
+def test_fetch_metrics_endpoint(app, client, local_origin):
+    url = local_origin.add_page("/virtual-news/article/1", "<html>one</html>")
+    host = local_origin.base_url.split("://", 1)[1]
+    with app.app_context():
+        scraping.fetch(url)
+        app.config["API_ACCESS_TOKENS"] = ("test-token",)
+
+    resp = client.get("/api/metrics/fetch", headers={"Authorization": "Bearer test-token"})
+    assert resp.status_code == 200
+    payload = resp.get_json()
+    assert payload["hosts"][host]["requests"] == 1
+    assert "ttfb" in payload["hosts"][host]["phases"]
+    assert host in payload["pools"]
+    assert "aborts" in payload
+    assert fetch_metrics.format_summary()[0].startswith(host)
+
+
+def test_connection_falls_back_to_next_resolved_address(monkeypatch, local_origin):
+    url = local_origin.add_page("/virtual-news/article/1", "<html>one</html>")
+    port = local_origin.server.server_port
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host != "dual.test":
+            return real_getaddrinfo(host, *args, **kwargs)
+        # 先頭のアドレスは接続を拒否する
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port)),
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    session = requests.Session()
+    session.mount("http://", fetch_metrics.TimedHTTPAdapter())
+    phases = fetch_metrics.begin()
+
+    resp = session.get(url.replace("127.0.0.1", "dual.test"), timeout=5)
+
+    assert resp.status_code == 200
+    assert resp.text == "<html>one</html>"
+    assert set(phases) >= {"dns", "connect"}
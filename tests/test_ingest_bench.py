@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from app.services import ingest_bench
+
+
+def test_split_transactions_outperform_held_under_concurrency():
+    results = ingest_bench.run(articles=8, threads=4, ai_latency=0.05)
+
+    held, split = results["held"], results["split"]
+    assert held.errors == split.errors == 0
+    # held は書き込みロックを握ったまま AI を待つので、ほぼ直列（8 * 0.05 秒以上）になる
+    assert held.seconds >= 0.4
+    assert split.per_sec > held.per_sec
+    assert ingest_bench.format_results(results)[-1].startswith("split/held: ")
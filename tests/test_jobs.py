@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.models.article import Article
+from app.models.db import db
+from app.models.job import Job
+from app.services import jobs
+
+ARTICLE_HTML = """
+<html><body>
+    <h1 class="blog-post-title">ジョブの記事</h1>
+    <p class="blog-post-meta">2025年11月30日 10:00</p>
+    <div class="article_body"><p>本文</p></div>
+</body></html>
+"""
+
+
+def test_api_returns_202_and_worker_completes_job(app, client, auth_header, local_origin):
+    app.config["INGEST_ASYNC"] = True
+    url = local_origin.add_page("/virtual-news/article/job-1", ARTICLE_HTML)
+
+    resp = client.post("/api/articles", json={"url": url, "run_ai": False}, headers=auth_header)
+    data = resp.get_json()
+
+    assert resp.status_code == 202
+    assert data["job"]["status"] == "queued"
+    assert resp.headers["Location"] == data["status_url"] == f"/api/jobs/{data['job']['id']}"
+    # リクエストの中では取得しない
+    assert local_origin.requests == []
+    again = client.post("/api/articles", json={"url": url, "run_ai": False}, headers=auth_header)
+    assert again.get_json()["job"]["id"] == data["job"]["id"]
+
+    with app.app_context():
+        assert jobs.work(until_idle=True) == 1
+
+    status = client.get(data["status_url"], headers=auth_header).get_json()
+    assert status["job"]["status"] == "succeeded"
+    assert status["job"]["attempts"] == 1
+    assert status["job"]["result"]["status"] == "created"
+    assert status["article"]["title"] == "ジョブの記事"
+    assert client.get("/api/jobs/missing", headers=auth_header).status_code == 404
+
+
+def test_transient_failures_retry_then_fail(app, local_origin):
+    app.config.update(JOBS_MAX_ATTEMPTS=2, JOBS_RETRY_BACKOFF=0)
+    missing = f"{local_origin.base_url}/virtual-news/article/job-missing"
+
+    with app.app_context():
+        job_id = jobs.enqueue(missing, run_ai=False).id
+        assert jobs.work(until_idle=True) == 2
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.attempts) == ("failed", 2)
+        assert job.error and job.finished_at is not None
+
+
+def test_expired_lease_is_reclaimed(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/job-lease", ARTICLE_HTML)
+
+    with app.app_context():
+        job_id = jobs.enqueue(url, run_ai=False).id
+        assert jobs.claim("worker-a").id == job_id
+        # リース中は他のワーカーに渡らない
+        assert jobs.claim("worker-b") is None
+
+        later = datetime.now(timezone.utc) + timedelta(seconds=app.config["JOBS_LEASE_SECONDS"] + 1)
+        reclaimed = jobs.claim("worker-b", now=later)
+        assert (reclaimed.id, reclaimed.locked_by, reclaimed.attempts) == (job_id, "worker-b", 2)
+
+        jobs.run(reclaimed, "worker-b")
+        assert db.session.get(Job, job_id).status == "succeeded"
+        assert jobs.stats()["succeeded"] == 1
+
+
+def test_scrape_form_enqueues_when_async(app, client, auth_header, local_origin):
+    app.config.update(INGEST_ASYNC=True, WTF_CSRF_ENABLED=False)
+    url = local_origin.add_page("/virtual-news/article/job-form", ARTICLE_HTML)
+
+    resp = client.post("/scrape", data={"url": url}, headers=auth_header, follow_redirects=False)
+
+    assert resp.status_code == 302
+    assert resp.headers["Location"].endswith("/")
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=["jobs", "status"]).output.strip() == "queued=1 running=0 succeeded=0 failed=0"
+    result = runner.invoke(args=["jobs", "worker", "--once"])
+    assert result.exit_code == 0, result.output
+    assert "processed 1 jobs" in result.output
+    with app.app_context():
+        assert db.session.query(Article).filter_by(url=url).count() == 1
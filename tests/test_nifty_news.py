@@ -91,3 +91,85 @@ def test_parse_nifty_article_minimal():
     assert result.title == "最小限タイトル"
     # 短すぎる本文は除外されるため、フォールバックメッセージが返る
     assert result.body == "本文取得失敗"
+
+
+LONG = "これは十分な長さを持つ本文の段落テキストです。"
+
+NIFTY_EQUIVALENCE_CASES = {
+    "json_ld_and_sentences": f"""
+        <html><head>
+        <script type="application/ld+json">[{{"@type": "NewsArticle"}}]</script>
+        <script type="application/ld+json">{{"@type": "NewsArticle", "headline": "見出し",
+            "datePublished": "2025-11-11T03:00:00Z", "description": "説明"}}</script>
+        </head><body>
+        <div class="box article_body_text">
+            <div id="article_body_text_sentence">
+                <p>{LONG}<script>ignored()</script></p><p>【関連】{LONG}</p><p>短い</p>
+                <div><p><b>{LONG}</b>続き</p></div>
+            </div>
+        </div>
+        <div class="article_body_text"><div id="article_body_text_sentence"><p>{LONG}二つ目</p></div></div>
+        </body></html>
+    """,
+    "bad_date_and_description_only": """
+        <html><head>
+        <script type="application/ld+json">{"@type": "NewsArticle", "headline": "",
+            "datePublished": "昨日", "description": "説明だけ"}</script>
+        <meta property="og:title" content="  OGタイトル｜ニフティニュース ">
+        </head><body><h1>H1</h1></body></html>
+    """,
+    "article_fallback": f"""
+        <html><head><meta property="og:title"></head><body>
+        <h1> 見出し<span>補足</span></h1>
+        <div class="article_body_text"><p>{LONG}</p></div>
+        <article class="article main"><section><p>{LONG}</p></section><p>短い</p></article>
+        </body></html>
+    """,
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("name", sorted(NIFTY_EQUIVALENCE_CASES))
+def test_parse_article_matches_soup_implementation(name):
+    html = NIFTY_EQUIVALENCE_CASES[name]
+    url = "https://news.nifty.com/article/test/1/"
+
+    assert NiftyNewsParser.parse_article(html, url) == NiftyNewsParser.parse_article_soup(html, url)
+
+
+def test_parse_article_broken_json_ld_matches_soup_implementation(app):
+    html = NIFTY_EQUIVALENCE_CASES["article_fallback"].replace(
+        "<head>", '<head><script type="application/ld+json">{broken</script>'
+    )
+    url = "https://news.nifty.com/article/test/1/"
+
+    with app.app_context():
+        assert NiftyNewsParser.parse_article(html, url) == NiftyNewsParser.parse_article_soup(html, url)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        '<html><head><meta name="article_url" content="https://news.nifty.com/article/a/1/"></head>'
+        '<body><a href="/article/b/2/">more</a></body></html>',
+        '<html><head><meta name="article_url"><meta name="article_url" content="https://x/article/2/"></head>'
+        '<body><a href="/topics/1/">t</a><a href="/article/b/2/">more</a></body></html>',
+        '<html><body><a href="https://news.nifty.com/article/c/3/">more</a>'
+        '<meta name="article_url" content="https://news.nifty.com/article/late/9/"></body></html>',
+        '<html><body><a>none</a><a href="/topics/1/">t</a></body></html>',
+        "",
+    ],
+)
+def test_extract_article_url_matches_soup_implementation(html):
+    assert NiftyNewsParser.extract_article_url(html) == NiftyNewsParser.extract_article_url_soup(html)
+
+
+def test_extract_article_url_stops_at_meta():
+    padding = "<p>" + "x" * 100 + "</p>"
+    html = (
+        '<html><head><meta name="article_url" content="https://news.nifty.com/article/a/1/"></head><body>'
+        + padding * 5000
+        + "<broken"
+    )
+
+    assert NiftyNewsParser.extract_article_url(html) == "https://news.nifty.com/article/a/1/"
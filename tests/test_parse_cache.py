@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import parse_cache, parsing, sources, synthetic_origin, virtual_news_parser
+
+URL = "http://localhost:5000/virtual-news/article/1"
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    parse_cache.clear()
+    yield
+    parse_cache.clear()
+
+
+@pytest.fixture
+def counting_source():
+    """パーサーの呼び出し回数を数えるソースを登録する。"""
+
+    calls = []
+
+    def register(version: int = 1, selectors=None) -> sources.Source:
+        def parse(html, url, compiled):
+            calls.append(url)
+            if "<article" not in html:
+                raise parsing.ParseError("記事がありません")
+            return virtual_news_parser.VirtualNewsParser.parse_article(html, url, compiled)
+
+        sources.unregister("counting_news")
+        return sources.register(
+            sources.SourceSpec(
+                name="counting_news",
+                parse=parse,
+                hosts=("counting.example.com",),
+                selectors=selectors or virtual_news_parser.SELECTORS,
+                version=version,
+            )
+        )
+
+    register.calls = calls
+    yield register
+    sources.unregister("counting_news")
+
+
+def _html(article_id: int = 1) -> str:
+    settings = synthetic_origin.OriginSettings(body_bytes=2000, seed=3)
+    return synthetic_origin.render_article(synthetic_origin.article(settings, article_id))
+
+
+def test_same_html_is_parsed_once(counting_source):
+    source = counting_source()
+    html = _html()
+
+    first = source.parse(URL, html)
+    second = source.parse(URL + "?from=feed", html)
+
+    assert counting_source.calls == [URL]
+    assert first == virtual_news_parser.VirtualNewsParser.parse_article(html, URL)
+    assert second == parsing.ParsedArticle(URL + "?from=feed", first.title, first.published_at, first.body)
+    second.title = "changed"
+    assert source.parse(URL, html).title == first.title
+    stats = parse_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert parse_cache.format_stats().startswith("parse cache: hits=2 disk_hits=0 misses=1 (67%)")
+
+
+def test_version_and_selectors_invalidate_entries(counting_source):
+    html = _html()
+    counting_source().parse(URL, html)
+
+    counting_source(version=2).parse(URL, html)
+    selectors = dict(virtual_news_parser.SELECTORS, title="(//h1)[1]")
+    counting_source(version=2, selectors=selectors).parse(URL, html)
+    counting_source(version=2, selectors=selectors).parse(URL, html)
+
+    assert len(counting_source.calls) == 3
+
+
+def test_lru_evicts_oldest_entry(app, counting_source):
+    source = counting_source()
+    with app.app_context():
+        app.config["PARSE_CACHE_SIZE"] = 2
+        for article_id in (1, 2, 1, 3, 2):
+            source.parse(URL, _html(article_id))
+
+    # 1, 2 を読み、1 を参照し直した後に 3 が入ると 2 が追い出される
+    assert len(counting_source.calls) == 4
+    assert parse_cache.stats()["entries"] == 2
+
+
+def test_disabled_cache_parses_every_time(app, counting_source):
+    source = counting_source()
+    with app.app_context():
+        app.config["PARSE_CACHE_SIZE"] = 0
+        source.parse(URL, _html())
+        source.parse(URL, _html())
+
+    assert len(counting_source.calls) == 2
+    assert parse_cache.stats()["misses"] == 0
+
+
+def test_disk_tier_survives_process_cache_clear(app, counting_source, tmp_path):
+    source = counting_source()
+    html = _html()
+    with app.app_context():
+        app.config["PARSE_CACHE_DIR"] = str(tmp_path)
+        first = source.parse(URL, html)
+        parse_cache.clear()
+        second = source.parse(URL, html)
+
+    assert len(counting_source.calls) == 1
+    assert second == first
+    assert parse_cache.stats()["disk_hits"] == 1
+    assert [path.parent.parent.name for path in tmp_path.rglob("*.json")] == [source.cache_version]
+
+
+def test_parse_errors_are_not_cached(counting_source):
+    source = counting_source()
+
+    for _ in range(2):
+        with pytest.raises(parsing.ParseError):
+            source.parse(URL, "<html><body></body></html>")
+
+    assert len(counting_source.calls) == 2
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from requests import Response
+
+from app.models.article import Article
+from app.models.db import db
+from app.services import articles, parse_pool, parsing, synthetic_origin
+
+
+def _response(url: str, body: bytes, encoding: str | None) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.encoding = encoding
+    return response
+
+
+@pytest.fixture(scope="module")
+def pool():
+    yield 2
+    parse_pool.shutdown()
+
+
+def test_submit_is_disabled_without_workers(app):
+    response = _response("https://news.yahoo.co.jp/articles/a", b"<html></html>", "utf-8")
+
+    with app.app_context():
+        assert parse_pool.submit("yahoo_news", response) is None
+
+
+def test_nifty_topics_pages_are_not_offloaded():
+    topics = _response("https://news.nifty.com/topics/domestic/1/", b"", "utf-8")
+    article = _response("https://news.nifty.com/article/domestic/1/", b"", "utf-8")
+
+    assert not parse_pool.can_offload("nifty_news", topics)
+    assert parse_pool.can_offload("nifty_news", article)
+    assert parse_pool.can_offload("virtual_news", topics)
+
+
+def test_workers_match_inline_parsing(pool):
+    settings = synthetic_origin.OriginSettings(body_bytes=2000)
+    jobs = []
+    for article_id in range(1, 9):
+        html = synthetic_origin.render_article(synthetic_origin.article(settings, article_id))
+        response = _response(f"http://localhost/virtual-news/article/{article_id}", html.encode("utf-8"), "utf-8")
+        jobs.append((parse_pool.submit("virtual_news", response, workers=pool), response))
+
+    for job, response in jobs:
+        assert job.result(timeout=60) == parse_pool.parse_text("virtual_news", response.url, response.text)
+
+
+def test_workers_decode_with_response_encoding(pool):
+    html = "<html><head><title>シフトJIS</title></head><body><article><p>本文です</p></article></body></html>"
+    response = _response("https://news.yahoo.co.jp/articles/sjis", html.encode("shift_jis"), "shift_jis")
+
+    parsed = parse_pool.submit("yahoo_news", response, workers=pool).result(timeout=60)
+
+    assert parsed.title == "シフトJIS"
+    assert parsed.body == "本文です"
+
+
+def test_worker_parse_errors_propagate(pool):
+    response = _response("https://news.yahoo.co.jp/articles/empty", b"<html><body></body></html>", "utf-8")
+
+    with pytest.raises(parsing.ParseError):
+        parse_pool.submit("yahoo_news", response, workers=pool).result(timeout=60)
+
+
+def test_ingest_article_uses_given_parse_result(app, mocker):
+    url = "https://news.yahoo.co.jp/articles/parsed"
+    response = _response(url, b"<html></html>", "utf-8")
+    parsed = parsing.ParsedArticle(url=url, title="ワーカー結果", published_at=None, body="本文")
+    parse = mocker.patch("app.services.articles._parse_response")
+
+    with app.app_context():
+        result = articles.ingest_article(url, run_ai=False, response=response, parsed=parsed)
+
+        assert result.status == "created"
+        assert db.session.scalar(db.select(Article.title).where(Article.url == url)) == "ワーカー結果"
+    parse.assert_not_called()
+
+
+def test_scrape_feed_parses_in_worker_processes(app):
+    settings = synthetic_origin.OriginSettings(articles=12, per_page=5)
+    server = synthetic_origin.SyntheticOriginServer(settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        app.config["VIRTUAL_NEWS_FEED_URLS"] = (f"{server.base_url}/virtual-news/feed.xml",)
+        app.config["ENABLED_FEED_PROVIDERS"] = ("virtual_news",)
+        result = app.test_cli_runner().invoke(
+            args=["scrape", "feed", "--limit", "12", "--skip-ai", "--parse-workers", "2"]
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result.exit_code == 0, result.output
+    assert "created=12" in result.output
+    with app.app_context():
+        titles = set(db.session.scalars(db.select(Article.title)))
+    assert titles == {synthetic_origin.article(settings, n).title for n in range(1, 13)}
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from app.services import parser_bench, parsing, sources
+from app.services.nifty_news import NiftyNewsParser
+from app.services.virtual_news_parser import VirtualNewsParser
+
+KINDS = {"small", "huge", "json_ld", "dom_only", "malformed"}
+
+SOUP_PARSERS = {
+    "yahoo_news": lambda html, url: parsing.parse_article_soup(url, html),
+    "nifty_news": NiftyNewsParser.parse_article_soup,
+    "virtual_news": VirtualNewsParser.parse_article_soup,
+}
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return parser_bench.load_corpus()
+
+
+def test_corpus_covers_every_kind_for_each_builtin_source(corpus):
+    kinds: dict[str, set[str]] = {}
+    for doc in corpus:
+        kinds.setdefault(doc.source, set()).add(doc.kind)
+
+    assert kinds == {source: KINDS for source in SOUP_PARSERS}
+    assert max(doc.size for doc in corpus if doc.kind == "huge") > 100_000
+
+
+def test_corpus_parses_like_soup_implementations(app, corpus):
+    with app.app_context():
+        for doc in corpus:
+            source = sources.get(doc.source)
+            try:
+                expected = SOUP_PARSERS[doc.source](doc.html, doc.url)
+            except parsing.ParseError:
+                with pytest.raises(parsing.ParseError):
+                    source.parse(doc.url, doc.html)
+                continue
+            assert source.parse(doc.url, doc.html) == expected, f"{doc.source}__{doc.kind}"
+
+
+def test_load_corpus_rejects_unknown_source(tmp_path):
+    (tmp_path / "unknown_site__small.html").write_text("<html></html>", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="unknown_site"):
+        parser_bench.load_corpus(tmp_path)
+
+
+def test_run_reports_throughput_and_memory_per_source(corpus):
+    results = parser_bench.run(corpus, only=["virtual_news"], rounds=1, min_time=0.01)
+
+    assert set(results) == {"virtual_news"}
+    result = results["virtual_news"]
+    assert result.docs == len(KINDS)
+    assert result.docs_per_sec > 0
+    assert result.bytes_per_sec > result.docs_per_sec
+    assert result.peak_kib > 0
+
+
+def test_compare_flags_only_drops_beyond_threshold():
+    def result(source, rate):
+        return parser_bench.BenchResult(source, 5, rate, rate * 1000, 1.0)
+
+    results = {"a": result("a", 70.0), "b": result("b", 80.0), "c": result("c", 10.0)}
+    baseline = {"a": {"docs_per_sec": 100.0}, "b": {"docs_per_sec": 100.0}}
+
+    regressions = parser_bench.compare(results, baseline, threshold=0.25)
+
+    assert [r.source for r in regressions] == ["a"]
+    assert regressions[0].change == pytest.approx(-0.3)
+
+
+def test_baseline_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    results = {"virtual_news": parser_bench.BenchResult("virtual_news", 5, 123.456, 4567.0, 12.34)}
+
+    parser_bench.save_baseline(results, path)
+
+    assert parser_bench.load_baseline(path) == {
+        "virtual_news": {"docs": 5, "docs_per_sec": 123.5, "bytes_per_sec": 4567.0, "peak_kib": 12.3}
+    }
+    assert parser_bench.load_baseline(tmp_path / "missing.json") == {}
+
+
+def test_bench_parsers_command_fails_on_regression(app, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(
+        args=[
+            "bench-parsers",
+            "--baseline",
+            str(baseline),
+            "--source",
+            "virtual_news",
+            "--rounds",
+            "1",
+            "--update-baseline",
+        ]
+    )
+    assert result.exit_code == 0, result.output
+    assert "virtual_news" in json.loads(baseline.read_text(encoding="utf-8"))["results"]
+
+    data = json.loads(baseline.read_text(encoding="utf-8"))
+    data["results"]["virtual_news"]["docs_per_sec"] *= 100
+    baseline.write_text(json.dumps(data), encoding="utf-8")
+
+    result = runner.invoke(
+        args=["bench-parsers", "--baseline", str(baseline), "--source", "virtual_news", "--rounds", "1"]
+    )
+    assert result.exit_code == 1
+    assert "[REGRESSION] virtual_news" in result.output
+
+
+@pytest.mark.skipif(
+    not os.getenv("PARSER_BENCH"), reason="スループットは計測環境に依存するため PARSER_BENCH=1 のときだけ実行"
+)
+def test_throughput_has_not_regressed_from_baseline(corpus):
+    baseline = parser_bench.load_baseline()
+    results = parser_bench.run(corpus)
+
+    regressions = parser_bench.compare(results, baseline)
+
+    assert not regressions, "\n".join(parser_bench.format_results(results, baseline))
+
+
+def test_bench_decode_reports_cpu_per_doc(corpus):
+    results = parser_bench.bench_decode(corpus, only=["virtual_news"], rounds=1)
+
+    assert set(results) == {"virtual_news"}
+    result = results["virtual_news"]
+    assert result.docs == len(KINDS)
+    assert result.detect_ms > 0 and result.fast_ms >= 0
+    assert parser_bench.format_decode_results(results)[0].startswith("virtual_news: decode")
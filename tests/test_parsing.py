@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from app.services import parsing
+import pytest
+from requests import Response
+
+from app.services import parsing, synthetic_origin
 
 
 SAMPLE_HTML = """
@@ -43,3 +46,147 @@ def test_parse_article_fallback_when_json_ld_missing():
     parsed = parsing.parse_article("https://news.yahoo.co.jp/articles/example", html)
     assert parsed.title == "OGPタイトル"
     assert "段落" in parsed.body
+
+
+def _page(head: str = "", body: str = "") -> str:
+    return f"<!doctype html><html><head>{head}</head><body>{body}</body></html>"
+
+
+EQUIVALENCE_CASES = {
+    "json_ld": SAMPLE_HTML,
+    "json_ld_list_and_broken": _page(
+        '<script type="application/ld+json">{broken</script>'
+        '<script type="application/ld+json">  </script>'
+        '<script type="application/ld+json">[1, {"@type": "WebPage"},'
+        ' {"@type": "Article", "headline": "一覧形式", "datePublished": "2024-05-01 10:00"}]</script>',
+        "<article><p>本文A</p><p> </p><p>本文<b>B</b></p></article>",
+    ),
+    "json_ld_without_title": _page(
+        '<title>ページ</title>'
+        '<script type="application/ld+json">{"@type": "NewsArticle", "articleBody": "本文"}</script>'
+    ),
+    "og_title_without_content": _page(
+        '<meta property="og:title"><meta property="og:title" content="二番目"><title> タイトル </title>',
+        "<article><p>本文</p></article>",
+    ),
+    "h1_title_and_time": _page(
+        "",
+        '<h1> 見出し<span>補足</span></h1><time datetime="2024-06-01T08:00:00Z">6月1日</time>'
+        "<article><p>段落<!-- コメント -->続き<script>var x = 1;</script><style>p{}</style></p></article>",
+    ),
+    "time_text_only": _page("<title></title>", "<time> 2024年6月1日 </time><article><p>本文</p></article>"),
+    "meta_name_and_property": _page(
+        '<meta name="pubdate" content="2024-01-02 03:04"><meta property="article:published_time">'
+        '<meta name="article:published_time" content="2023-12-31T00:00:00+09:00">',
+        "<article><p>本文</p></article>",
+    ),
+    "article_body_class": _page(
+        "<title>T</title>",
+        '<div class="main article_body  wide"><p>一</p><div><p>二</p></div></div>'
+        '<div class="article_body__item">無視</div>',
+    ),
+    "article_body_item": _page(
+        "<title>T</title>",
+        '<div class="article_body__item">項目1</div><div class="x article_body__item"><p>項目2</p></div>',
+    ),
+    "uamods_pickup": _page("<title>T</title>", '<div id="uamods-pickup"><p>ピックアップ</p><p>&nbsp;</p></div>'),
+    "nested_articles_and_ruby": _page(
+        "<title>T</title>",
+        "<article><section><article><p><ruby>漢字<rp>(</rp><rt>かんじ</rt><rp>)</rp></ruby>の本文</p>"
+        "</article></section><p>&amp;外側&lt;</p></article>",
+    ),
+    "xml_declaration": (
+        '<?xml version="1.0" encoding="UTF-8"?>' + _page("<title>宣言付き</title>", "<article><p>本文</p></article>")
+    ),
+    "no_body": _page("<title>本文なし</title>", "<div><p>対象外</p></div>"),
+    "empty": "",
+    "json_ld_in_comment": _page(
+        '<!-- <script type="application/ld+json">'
+        '{"@type": "Article", "headline": "コメント内", "articleBody": "x"}</script> -->'
+        '<script type="application/ld+json">{"@type": "Article", "headline": "本物", "articleBody": "本文"}</script>'
+    ),
+    "json_ld_type_variants": _page(
+        '<script data-type="application/ld+json">'
+        '{"@type": "Article", "headline": "属性違い", "articleBody": "x"}</script>'
+        '<script type="Application/LD+JSON">{"@type": "Article", "headline": "大文字", "articleBody": "x"}</script>'
+        "<SCRIPT id=ld type=application/ld+json>"
+        '{"@type": "NewsArticle", "headline": "&amp;", "articleBody": "本文"}</SCRIPT>'
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(EQUIVALENCE_CASES))
+def test_parse_article_matches_soup_implementation(name):
+    html = EQUIVALENCE_CASES[name]
+    url = "https://news.yahoo.co.jp/articles/example"
+
+    try:
+        expected = parsing.parse_article_soup(url, html)
+    except parsing.ParseError:
+        with pytest.raises(parsing.ParseError):
+            parsing.parse_article(url, html)
+        return
+
+    assert parsing.parse_article(url, html) == expected
+
+
+def test_parse_article_matches_soup_on_synthetic_pages():
+    settings = synthetic_origin.OriginSettings(body_bytes=3000, seed=3)
+    for article_id in range(1, 30):
+        html = synthetic_origin.render_article(synthetic_origin.article(settings, article_id))
+        url = f"http://localhost/virtual-news/article/{article_id}"
+        assert parsing.parse_article(url, html) == parsing.parse_article_soup(url, html)
+
+
+def test_parse_article_fast_path_skips_dom(mocker):
+    parsing.reset_path_stats()
+    build = mocker.spy(parsing, "parse_tree")
+
+    parsing.parse_article("https://news.yahoo.co.jp/articles/example", SAMPLE_HTML)
+    assert build.call_count == 0
+
+    # 本文が JSON-LD にない場合は DOM から補う
+    incomplete = SAMPLE_HTML.replace('"articleBody": "段落1\n段落2"', '"articleBody": ""')
+    parsed = parsing.parse_article("https://news.yahoo.co.jp/articles/example", incomplete)
+    assert build.call_count == 1
+    assert parsed.title == "JSON-LDタイトル"
+    assert parsed.body == "段落1\n\n段落2"
+
+    assert parsing.path_stats() == {"fast": 1, "slow": 1, "fast_ratio": 0.5}
+
+
+@pytest.mark.parametrize(
+    ("content", "content_type", "expected"),
+    [
+        (b"\xef\xbb\xbf<html>", "text/html; charset=shift_jis", "utf-8-sig"),
+        (b"<html>", "text/html; charset=EUC-JP", "euc_jp"),
+        (b"<html>", 'text/html; charset="Shift_JIS"', "cp932"),
+        (b'<html><head><meta charset="shift_jis">', "text/html", "cp932"),
+        (b'<meta http-equiv="Content-Type" content="text/html; charset=euc-jp">', None, "euc_jp"),
+        (b'<meta charset="utf-16">', None, "utf-8"),
+        (b'<meta charset="no-such-codec">', None, "utf-8"),
+        (b"<html>", None, "utf-8"),
+    ],
+)
+def test_resolve_encoding_checks_bom_header_then_meta(content, content_type, expected):
+    assert parsing.resolve_encoding(content, content_type) == expected
+
+
+def test_decode_html_matches_response_text_for_declared_charsets():
+    html = '<html><head><meta charset="shift_jis"><title>文字コード</title></head><body>本文①</body></html>'
+    content = html.encode("cp932")
+    response = Response()
+    response._content = content
+    response.encoding = "cp932"
+
+    assert parsing.decode_html(content) == response.text
+    response.headers["Content-Type"] = "text/html; charset=Shift_JIS"
+    assert parsing.response_html(response) == html
+
+
+def test_response_html_uses_preset_encoding_without_header():
+    response = Response()
+    response._content = "シフトJIS".encode("shift_jis")
+    response.encoding = "shift_jis"
+
+    assert parsing.response_html(response) == "シフトJIS"
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.models.article import Article, InferenceResult
+from app.models.db import db
+from app.services import articles as article_service
+from app.services import news_feed, pipeline
+
+ARTICLE_HTML = """
+<html><body>
+    <h1 class="blog-post-title">パイプラインの記事{n}</h1>
+    <p class="blog-post-meta">2025年11月30日 10:00</p>
+    <div class="article_body"><p>本文{n}</p></div>
+</body></html>
+"""
+
+
+class _Job:
+    def __init__(self, value):
+        self.value = value
+        self.trace: list[str] = []
+        self.error: BaseException | None = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def finish(self) -> None:
+        self._done.set()
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+        self._done.set()
+
+
+def _sleeping(name: str, seconds: float):
+    def run(jobs):
+        for job in jobs:
+            time.sleep(seconds)
+            job.trace.append(name)
+            yield job
+
+    return run
+
+
+def test_stages_overlap_instead_of_adding_up():
+    stages = [
+        pipeline.Stage("network", _sleeping("network", 0.03), workers=4),
+        pipeline.Stage("cpu", _sleeping("cpu", 0.01)),
+        pipeline.Stage("api", _sleeping("api", 0.03), workers=4),
+    ]
+    jobs = [_Job(n) for n in range(20)]
+
+    started = time.perf_counter()
+    with pipeline.Pipeline(stages) as engine:
+        for job in jobs:
+            engine.put(job)
+        assert all(job._done.wait(5) for job in jobs)
+    elapsed = time.perf_counter() - started
+
+    assert all(job.trace == ["network", "cpu", "api"] for job in jobs)
+    # 逐次なら 20 * 0.07 = 1.4 秒
+    assert elapsed < 0.9
+    stats = engine.stats()
+    assert [stats[name]["processed"] for name in ("network", "cpu", "api")] == [20, 20, 20]
+    assert stats["cpu"]["busy"] >= 0.2
+
+
+def test_bounded_queue_applies_backpressure():
+    release = threading.Event()
+
+    def slow(jobs):
+        release.wait(5)
+        yield from jobs
+
+    stages = [pipeline.Stage("fast", lambda jobs: jobs, capacity=1), pipeline.Stage("slow", slow, capacity=2)]
+    jobs = [_Job(n) for n in range(6)]
+    engine = pipeline.Pipeline(stages)
+    engine.start()
+
+    producer = threading.Thread(target=lambda: [engine.put(job) for job in jobs])
+    producer.start()
+    time.sleep(0.2)
+    # slow 段が1件処理中でキュー（2件）も満杯なので、fast 段（1件保持+キュー1件）と投入側が待たされる
+    assert producer.is_alive()
+    assert engine.stats()["slow"]["depth"] == 2
+
+    release.set()
+    producer.join(5)
+    engine.close()
+
+    assert all(job.done and job.error is None for job in jobs)
+    stats = engine.stats()
+    assert stats["slow"]["max_depth"] <= 2
+    assert stats["fast"]["blocked"] > 0.1
+    assert engine.format_stats()[0].startswith("stage fast: workers=1")
+
+
+def test_stage_errors_fail_only_unhandled_jobs():
+    def flaky(jobs):
+        for job in jobs:
+            if job.value == 1:
+                raise ValueError("boom")
+            yield job
+
+    jobs = [_Job(n) for n in range(3)]
+    with pipeline.Pipeline([pipeline.Stage("flaky", flaky)]) as engine:
+        for job in jobs:
+            engine.put(job)
+        for job in jobs:
+            job._done.wait(5)
+
+    assert [job.error is None for job in jobs] == [True, False, True]
+    assert engine.stats()["flaky"]["errors"] == 1
+    with pytest.raises(RuntimeError):
+        engine.put(_Job(9))
+
+
+def test_ingest_pipeline_fetches_parses_persists_and_runs_ai(app, local_origin, mocker):
+    urls = [
+        local_origin.add_page(
+            f"/virtual-news/article/pipeline-{n}", ARTICLE_HTML.format(n=n), headers={"ETag": f'"{n}"'}
+        )
+        for n in range(5)
+    ]
+    ai_mock = mocker.patch(
+        "app.services.ai.summarize_and_score",
+        return_value=mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1"),
+    )
+    app.config["ENABLE_AI"] = True
+
+    with pipeline.IngestPipeline(app, ai_workers=2) as ingest:
+        jobs = [ingest.submit(url) for url in urls]
+        assert all(job.wait(10) for job in jobs)
+        again = [ingest.submit(url) for url in urls]
+        assert all(job.wait(10) for job in again)
+
+    assert [job.status for job in jobs] == ["created"] * 5
+    assert all(job.ok and job.ai_ran and job.article_id for job in jobs)
+    assert jobs[2].title == "パイプラインの記事2"
+    # 2回目は保存済みで推論もあるので、取得も AI も行わない
+    assert [job.status for job in again] == ["cached"] * 5
+    assert not any(job.ai_ran for job in again)
+    assert ai_mock.call_count == 5
+    assert len(local_origin.requests) == 5
+    with app.app_context():
+        assert db.session.query(Article).count() == 5
+        assert db.session.query(InferenceResult).count() == 5
+
+
+def test_ingest_pipeline_reports_errors_and_dedupes_in_flight(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/pipeline-dup", ARTICLE_HTML.format(n="dup"))
+    missing = f"{local_origin.base_url}/virtual-news/article/pipeline-missing"
+    local_origin.latency = 0.2
+
+    with pipeline.IngestPipeline(app) as ingest:
+        first = ingest.submit(url, run_ai=False)
+        second = ingest.submit(url, run_ai=False)
+        broken = ingest.submit(missing, run_ai=False)
+        with pytest.raises(article_service.ArticleIngestionError):
+            ingest.submit("")
+        assert first.wait(10) and broken.wait(10)
+
+    assert second is first and first.status == "created"
+    assert not broken.ok and broken.error.status_code == 502
+    assert ingest.stats()["fetch"]["processed"] == 2
+
+
+def test_api_batch_submits_to_shared_pipeline(app, client, auth_header, local_origin):
+    url = local_origin.add_page("/virtual-news/article/pipeline-api", ARTICLE_HTML.format(n="api"))
+
+    try:
+        resp = client.post(
+            "/api/articles/batch",
+            json={"urls": [url, "https://example.com/not-virtual"], "run_ai": False},
+            headers=auth_header,
+        )
+        metrics = client.get("/api/metrics/fetch", headers=auth_header).get_json()
+    finally:
+        pipeline.shutdown()
+
+    assert resp.status_code == 200
+    created, rejected = resp.get_json()["results"]
+    assert created["status"] == "created" and created["title"] == "パイプラインの記事api"
+    assert rejected["status"] == "error"
+    assert metrics["pipeline"]["persist"]["processed"] == 1
+    assert client.post("/api/articles/batch", json={"urls": "x"}, headers=auth_header).status_code == 400
+
+
+def test_scrape_feed_command_uses_pipeline(app, local_origin, mocker):
+    urls = [
+        local_origin.add_page(f"/virtual-news/article/pipeline-cli-{n}", ARTICLE_HTML.format(n=n)) for n in range(3)
+    ]
+    items = [
+        news_feed.NewsFeedItem(title=f"CLI{n}", url=url, published_at=None, source="Virtual", provider="yahoo")
+        for n, url in enumerate(urls + urls[:1])
+    ]
+    mocker.patch("app.cli.news_feed.fetch_latest_articles", return_value=items)
+
+    result = app.test_cli_runner().invoke(
+        args=["scrape", "feed", "--provider", "yahoo", "--skip-ai", "--pipeline", "--timings"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "created=3 updated=0 unchanged=0 cached=0 not_modified=0 errors=0" in result.output
+    assert "stage persist: workers=1" in result.output
+    with app.app_context():
+        assert db.session.query(Article).count() == 3
+
+
+def test_api_batch_enqueues_jobs_when_async(app, client, auth_header, local_origin):
+    app.config["INGEST_ASYNC"] = True
+    url = local_origin.add_page("/virtual-news/article/pipeline-async", ARTICLE_HTML.format(n="async"))
+
+    resp = client.post(
+        "/api/articles/batch",
+        json={"urls": [url, " "], "run_ai": False},
+        headers=auth_header,
+    )
+
+    assert resp.status_code == 202
+    queued, rejected = resp.get_json()["results"]
+    assert queued["status"] == "queued"
+    assert queued["status_url"] == f"/api/jobs/{queued['job']['id']}"
+    assert rejected["status"] == "error"
+    # リクエストの中では取得しない
+    assert local_origin.requests == []
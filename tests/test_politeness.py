@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+
+from app.services import politeness, scraping
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = politeness.TokenBucket(rate=10.0, capacity=2)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    delay = bucket.try_acquire()
+    assert 0 < delay <= 0.1
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = politeness.TokenBucket(rate=0.0, capacity=1)
+    assert all(bucket.try_acquire() == 0.0 for _ in range(100))
+
+
+def test_robots_is_cached_and_applied(app, local_origin):
+    local_origin.add_page(
+        "/robots.txt",
+        "User-agent: ScraperApp\nDisallow: /virtual-news/private/\nCrawl-delay: 2\n",
+        headers={"Content-Type": "text/plain"},
+    )
+    allowed = f"{local_origin.base_url}/virtual-news/article/1"
+    blocked = f"{local_origin.base_url}/virtual-news/private/1"
+
+    with app.app_context():
+        app.config["SCRAPE_RESPECT_ROBOTS"] = True
+        assert politeness.is_allowed(allowed, scraping._load_robots)
+        assert not politeness.is_allowed(blocked, scraping._load_robots)
+        bucket = politeness.bucket_for(allowed, scraping._load_robots)
+
+    assert bucket.rate == 0.5
+    assert bucket.capacity == 1.0
+    robots_requests = [path for path, _ in local_origin.requests if path == "/robots.txt"]
+    assert len(robots_requests) == 1
+
+
+def test_fetch_many_respects_host_budget_and_robots(app, local_origin):
+    local_origin.add_page("/robots.txt", "User-agent: *\nDisallow: /virtual-news/private/\n")
+    urls = [local_origin.add_page(f"/virtual-news/article/{i}", f"<h1>{i}</h1>") for i in range(4)]
+    blocked = local_origin.add_page("/virtual-news/private/1", "<h1>secret</h1>")
+
+    with app.app_context():
+        app.config["SCRAPE_RESPECT_ROBOTS"] = True
+        app.config["SCRAPE_HOST_RATE"] = 10.0
+        app.config["SCRAPE_HOST_BURST"] = 1
+        started = time.perf_counter()
+        results = {result.url: result for result in scraping.fetch_many(urls + [blocked], max_in_flight=4)}
+        elapsed = time.perf_counter() - started
+
+    assert isinstance(results[blocked].error, scraping.RobotsDisallowed)
+    assert all(results[url].ok for url in urls)
+    # 10 req/s・バースト1なので4件で少なくとも0.3秒かかる
+    assert elapsed >= 0.28
+    assert "/virtual-news/private/1" not in [path for path, _ in local_origin.requests]
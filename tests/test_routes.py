@@ -190,7 +190,10 @@ def test_scrape_creates_article(app, client, auth_header, mocker):
     url = "https://news.yahoo.co.jp/articles/example"
     parsed = parsing.ParsedArticle(url=url, title="タイトル", published_at=datetime.utcnow(), body="本文")
     mocker.patch("app.routes.scraping.is_allowed", return_value=True)
-    mocker.patch("app.services.articles.scraping.fetch", return_value=mocker.Mock(url=url, text="html"))
+    mocker.patch(
+        "app.services.articles.scraping.fetch",
+        return_value=mocker.Mock(url=url, text="html", status_code=200, headers={}),
+    )
     mocker.patch("app.services.articles.parsing.parse_article", return_value=parsed)
     mocker.patch(
         "app.services.articles.ai_service.summarize_and_score",
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import time
 from types import SimpleNamespace
 
+import pytest
+
 from app.services import scraping
 
 
@@ -36,3 +39,116 @@ def test_fetch_success(app, mocker):
     response = scraping.fetch("https://news.yahoo.co.jp/articles/example")
     assert response.text == "<html></html>"
     assert response.url.endswith("/example")
+
+
+def test_build_session_uses_config(app):
+    with app.app_context():
+        app.config["SCRAPE_RETRY_TOTAL"] = 4
+        app.config["SCRAPE_POOL_MAXSIZE"] = 7
+        app.config["USER_AGENT"] = "TestAgent/1.0"
+        session = scraping._build_session()
+
+    adapter = session.get_adapter("https://news.yahoo.co.jp/")
+    assert adapter.max_retries.total == 4
+    assert adapter._pool_maxsize == 7
+    assert session.headers["User-Agent"] == "TestAgent/1.0"
+
+
+def test_fetch_reuses_pooled_connection(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/1", "<html><h1>pooled</h1></html>")
+
+    with app.app_context():
+        for _ in range(3):
+            response = scraping.fetch(url)
+            assert "pooled" in response.text
+
+    host = f"127.0.0.1:{local_origin.server.server_port}"
+    stats = scraping.pool_stats()[host]
+    assert stats["requests"] == 3
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_fetch_raises_scrape_error_on_http_error(app, local_origin):
+    url = f"{local_origin.base_url}/virtual-news/article/missing"
+
+    with app.app_context(), pytest.raises(scraping.ScrapeError, match="404"):
+        scraping.fetch(url)
+
+
+def test_fetch_many_overlaps_latency_and_caps_per_host(app, local_origin):
+    local_origin.latency = 0.2
+    urls = [local_origin.add_page(f"/virtual-news/article/{i}", f"<h1>{i}</h1>") for i in range(6)]
+
+    with app.app_context():
+        started = time.perf_counter()
+        results = list(scraping.fetch_many(urls, max_in_flight=6, per_host=3))
+        elapsed = time.perf_counter() - started
+
+    assert sorted(result.url for result in results) == sorted(urls)
+    assert all(result.ok for result in results)
+    # 直列なら 1.2 秒、ホスト上限3なら 2 ラウンド
+    assert elapsed < 0.9
+    assert local_origin.max_concurrency <= 3
+
+
+def test_fetch_many_reports_errors_per_url(app, local_origin):
+    ok_url = local_origin.add_page("/virtual-news/article/ok", "<h1>ok</h1>")
+    missing_url = f"{local_origin.base_url}/virtual-news/article/missing"
+
+    with app.app_context():
+        results = {result.url: result for result in scraping.fetch_many([ok_url, missing_url])}
+
+    assert results[ok_url].ok
+    assert isinstance(results[missing_url].error, scraping.ScrapeError)
+
+
+def test_replay_mode_never_hits_network(app, local_origin, tmp_path):
+    url = f"{local_origin.base_url}/virtual-news/article/not-stored"
+
+    with app.app_context():
+        app.config["RAW_STORE_DIR"] = str(tmp_path)
+        app.config["SCRAPE_REPLAY"] = True
+        with pytest.raises(scraping.ScrapeError, match="replay"):
+            scraping.fetch(url)
+
+    assert local_origin.requests == []
+
+
+def test_fetch_aborts_oversized_body(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/huge", "<p>" + "x" * 4096 + "</p>")
+
+    with app.app_context():
+        app.config["SCRAPE_MAX_BYTES"] = 1024
+        before = scraping.abort_stats().get("too_large", {"count": 0})["count"]
+        with pytest.raises(scraping.ResponseTooLarge):
+            scraping.fetch(url)
+
+    assert scraping.abort_stats()["too_large"]["count"] == before + 1
+
+
+def test_fetch_aborts_streamed_body_past_limit(app, local_origin):
+    # Content-Length がない場合も読み込み中に打ち切る
+    url = local_origin.add_page(
+        "/virtual-news/article/chunked",
+        "a" * 200_000,
+        headers={"Content-Type": "text/html", "Transfer-Encoding": "chunked"},
+    )
+
+    with app.app_context():
+        app.config["SCRAPE_MAX_BYTES"] = 100_000
+        with pytest.raises(scraping.ResponseTooLarge) as excinfo:
+            scraping.fetch(url)
+
+    assert 100_000 < excinfo.value.bytes_read <= 100_000 + scraping.STREAM_CHUNK_SIZE
+
+
+def test_fetch_rejects_non_html_content_type(app, local_origin):
+    url = local_origin.add_page(
+        "/virtual-news/article/binary", b"\x89PNG....", headers={"Content-Type": "image/png"}
+    )
+
+    with app.app_context(), pytest.raises(scraping.UnsupportedContentType):
+        scraping.fetch(url)
+
+    assert isinstance(scraping.UnsupportedContentType("u", "m"), scraping.ScrapeError)
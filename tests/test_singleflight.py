@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from app.models.article import Article
+from app.models.db import db
+from app.services import articles as article_service
+from app.services import singleflight
+
+ARTICLE_HTML = """
+<html><body>
+    <h1 class="blog-post-title">同時取り込みの記事</h1>
+    <p class="blog-post-meta">2025年11月30日 10:00</p>
+    <div class="article_body"><p>本文</p></div>
+</body></html>
+"""
+
+
+def test_followers_share_the_leader_result_and_error():
+    flight, leader = singleflight.begin("key")
+    same, follower = singleflight.begin("key")
+    assert leader and not follower and same is flight
+
+    singleflight.finish(flight, value=42)
+    assert singleflight.wait(same) == 42
+    # 終わったキーは次の呼び出しで新しいフライトになる
+    failed, leader = singleflight.begin("key")
+    assert leader and failed is not flight
+    singleflight.finish(failed, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        singleflight.wait(failed)
+    slow, _ = singleflight.begin("slow")
+    with pytest.raises(TimeoutError):
+        singleflight.wait(slow, timeout=0.01)
+    singleflight.finish(slow)
+
+
+def _ingest_in_thread(app, url, results):
+    def run():
+        with app.app_context():
+            try:
+                result = article_service.ingest_article(url)
+                results.append((result.status, result.article.id, result.ai_ran))
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_concurrent_ingests_of_one_canonical_url_fetch_and_infer_once(app, local_origin, mocker):
+    url = local_origin.add_page("/virtual-news/article/single-flight", ARTICLE_HTML)
+    local_origin.latency = 0.3
+    ai_mock = mocker.patch(
+        "app.services.articles.ai_service.summarize_and_score",
+        return_value=mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1"),
+    )
+    app.config["ENABLE_AI"] = True
+
+    results: list = []
+    first = _ingest_in_thread(app, url + "?utm_source=rss", results)
+    time.sleep(0.1)
+    second = _ingest_in_thread(app, url + "#top", results)
+    first.join(5)
+    second.join(5)
+
+    assert len(results) == 2
+    assert results[0] == results[1]
+    assert results[0][0] == "created" and results[0][2]
+    assert len(local_origin.requests) == 1
+    assert ai_mock.call_count == 1
+    with app.app_context():
+        assert db.session.scalars(db.select(Article.url)).all() == [url]
+
+
+def test_ingest_many_waits_for_urls_in_flight_elsewhere(app, local_origin):
+    shared_url = local_origin.add_page("/virtual-news/article/in-flight", ARTICLE_HTML)
+    other_url = local_origin.add_page("/virtual-news/article/batch-other", ARTICLE_HTML.replace("同時", "別"))
+    with app.app_context():
+        article = Article(url=shared_url, title="取り込み中", body="本文")
+        db.session.add(article)
+        db.session.commit()
+        article_id = article.id
+
+    flight, _ = singleflight.begin(("ingest", shared_url))
+    outcome: list = []
+
+    def run():
+        with app.app_context():
+            outcome.extend(
+                article_service.ingest_many([shared_url + "?fbclid=abc", other_url], force=True, run_ai=False)
+            )
+            outcome.append([item.result.article.id for item in outcome])
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.3)
+    # 自分の分（other_url）は先に終わり、取り込み中の URL だけ待っている
+    assert thread.is_alive()
+    singleflight.finish(flight, value=(article_id, "updated", False, False, None))
+    thread.join(5)
+
+    shared, other = outcome[:2]
+    assert shared.url == shared_url and shared.result.status == "updated"
+    assert outcome[2][0] == article_id
+    assert other.result.status == "created"
+    assert [path for path, _ in local_origin.requests] == ["/virtual-news/article/batch-other"]
+
+
+def test_cross_process_lock_is_released_before_ai(app, local_origin, mocker):
+    url = local_origin.add_page("/virtual-news/article/lock-scope", ARTICLE_HTML)
+    events: list[str] = []
+
+    @contextmanager
+    def cross_process(key):
+        events.append("lock")
+        yield False
+        events.append("unlock")
+
+    def summarize_and_score(title, body):
+        events.append("ai")
+        return mocker.Mock(summary="要約", risk_score=40, model="gpt-test", prompt_version="v1")
+
+    mocker.patch("app.services.articles.singleflight.cross_process", cross_process)
+    mocker.patch("app.services.articles.ai_service.summarize_and_score", summarize_and_score)
+    app.config["ENABLE_AI"] = True
+
+    with app.app_context():
+        result = article_service.ingest_article(url)
+
+    assert result.status == "created" and result.ai_ran
+    assert events == ["lock", "unlock", "ai"]
+
+
+def test_followers_share_a_failed_ai_call_instead_of_retrying(app, local_origin, mocker):
+    url = local_origin.add_page("/virtual-news/article/single-flight-ai-error", ARTICLE_HTML)
+    local_origin.latency = 0.3
+    ai_mock = mocker.patch(
+        "app.services.articles.ai_service.summarize_and_score",
+        side_effect=article_service.ai_service.AIServiceUnavailable("AI が応答しません"),
+    )
+    app.config["ENABLE_AI"] = True
+
+    results: list = []
+    first = _ingest_in_thread(app, url, results)
+    time.sleep(0.1)
+    second = _ingest_in_thread(app, url, results)
+    first.join(5)
+    second.join(5)
+
+    assert len(results) == 2
+    assert [ai_ran for _, _, ai_ran in results] == [False, False]
+    assert ai_mock.call_count == 1
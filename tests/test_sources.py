@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import parsing, sources, virtual_news_parser
+from app.services.parsing import class_xpath
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://news.nifty.com/topics/domestic/240101000001/", "nifty_news"),
+        ("https://news.nifty.com/article/domestic/government/12145-4674454/", "nifty_news"),
+        ("http://news.nifty.com/topics/domestic/1/", "yahoo_news"),
+        ("https://news.nifty.com/rss/topics_pickup.xml", "yahoo_news"),
+        ("http://localhost:5000/virtual-news/article/1", "virtual_news"),
+        ("http://127.0.0.1:8800/virtual-news/article/42", "virtual_news"),
+        ("http://localhost:5000/virtual-news/", "yahoo_news"),
+        ("https://news.yahoo.co.jp/articles/abc123", "yahoo_news"),
+    ],
+)
+def test_resolve_dispatches_by_host_and_path(url, expected):
+    assert sources.resolve(url).name == expected
+
+
+def test_should_follow_only_nifty_topics():
+    nifty = sources.get("nifty_news")
+
+    assert nifty.should_follow("https://news.nifty.com/topics/domestic/1/")
+    assert not nifty.should_follow("https://news.nifty.com/article/domestic/1/")
+    assert not sources.get("virtual_news").should_follow("http://localhost/virtual-news/topics/1")
+
+
+def test_registered_source_reuses_parser_with_own_selectors():
+    selectors = dict(virtual_news_parser.SELECTORS, title=f"(//h2[{class_xpath('entry-title')}])[1]")
+    sources.register(
+        sources.SourceSpec(
+            name="blog_news",
+            parse=virtual_news_parser.VirtualNewsParser.parse_article,
+            hosts=("blog.example.com",),
+            selectors=selectors,
+        )
+    )
+    sources.reset_timings()
+    try:
+        source = sources.resolve("https://blog.example.com/2025/01/post")
+        assert source.name == "blog_news"
+
+        parsed = source.parse(
+            "https://blog.example.com/2025/01/post",
+            '<h2 class="entry-title">ブログ記事</h2><div class="article_body"><p>本文</p></div>',
+        )
+        assert parsed.title == "ブログ記事"
+        assert parsed.body == "本文"
+        assert sources.timing_stats()["blog_news"]["count"] == 1
+    finally:
+        sources.unregister("blog_news")
+
+    assert sources.resolve("https://blog.example.com/2025/01/post").name == "yahoo_news"
+
+
+def test_parse_timing_is_recorded_on_errors():
+    sources.reset_timings()
+
+    with pytest.raises(parsing.ParseError):
+        sources.get("yahoo_news").parse("https://news.yahoo.co.jp/articles/x", "<html></html>")
+
+    stats = sources.timing_stats()["yahoo_news"]
+    assert stats["count"] == 1
+    assert stats["max"] >= stats["mean"] > 0
+    assert sources.format_timings()[0].startswith("parse yahoo_news: count=1")
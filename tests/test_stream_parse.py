@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from app.services import articles as article_service
+from app.services import parsing, scraping, sources, synthetic_origin
+from app.services.virtual_news_parser import VirtualNewsParser
+
+ARTICLE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ストリーミング</title></head>
+<body>
+<article class="blog-post">
+    <h1 class="blog-post-title">ストリーミングの記事</h1>
+    <p class="blog-post-meta">2025年11月30日 10:00</p>
+    <div class="article_body"><p>本文その1</p><p>本文その2</p></div>
+</article>
+"""
+# コメント欄やフッターなど、記事の後ろにある重い部分
+FOOTER = "<section class='comments'>" + "<p>コメント本文です。</p>" * 20000 + "</section></body></html>"
+URL = "http://localhost:5000/virtual-news/article/1"
+
+
+@pytest.fixture(autouse=True)
+def _reset_stream_stats():
+    scraping.reset_stream_stats()
+    yield
+    scraping.reset_stream_stats()
+
+
+def _chunks(data: bytes, size: int):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def test_streaming_parse_stops_when_container_closes():
+    data = (ARTICLE + FOOTER).encode("utf-8")
+    stream = sources.get("virtual_news").streaming()
+    stream.start("text/html; charset=utf-8")
+
+    fed = 0
+    for chunk in _chunks(data, 1024):
+        fed += len(chunk)
+        if stream.feed(chunk):
+            break
+
+    assert stream.done
+    assert fed < len(data) // 10
+    parsed = sources.get("virtual_news").parse_stream(URL, stream)
+    assert parsed.title == "ストリーミングの記事"
+    assert parsed.published_at == datetime(2025, 11, 30, 10, 0)
+    assert parsed.body == "本文その1\n\n本文その2"
+
+
+@pytest.mark.parametrize("chunk_size", [7, 512, 64 * 1024])
+def test_streaming_parse_matches_full_parse_on_synthetic_pages(chunk_size):
+    settings = synthetic_origin.OriginSettings(body_bytes=3000, seed=17)
+    source = sources.get("virtual_news")
+    for article_id in range(1, 10):
+        html = synthetic_origin.render_article(synthetic_origin.article(settings, article_id))
+        stream = source.streaming()
+        stream.start("text/html; charset=utf-8")
+        for chunk in _chunks(html.encode("utf-8"), chunk_size):
+            if stream.feed(chunk):
+                break
+
+        assert source.parse_stream(URL, stream) == VirtualNewsParser.parse_article(html, URL)
+
+
+def test_streaming_parse_without_container_reads_whole_document():
+    html = "<html><body><h1 class='blog-post-title'>T</h1><div class='article_body'><p>本文</p></div></body></html>"
+    stream = parsing.StreamingParse(("article", "blog-post"))
+    stream.start("text/html; charset=utf-8")
+    for chunk in _chunks(html.encode("utf-8"), 16):
+        assert not stream.feed(chunk)
+
+    assert VirtualNewsParser.parse_root(stream.close(), URL) == VirtualNewsParser.parse_article(html, URL)
+    assert parsing.StreamingParse(("article", "blog-post")).close() is None
+
+
+def test_sources_without_root_parser_do_not_stream():
+    assert sources.get("yahoo_news").streaming() is None
+    assert sources.get("nifty_news").streaming() is None
+
+
+@pytest.mark.parametrize("headers", [{}, {"Transfer-Encoding": "chunked"}])
+def test_fetch_stops_downloading_after_article(app, local_origin, headers):
+    body = (ARTICLE + FOOTER).encode("utf-8")
+    url = local_origin.add_page(
+        "/virtual-news/article/stream", body, headers={"Content-Type": "text/html; charset=utf-8", **headers}
+    )
+    stream = sources.get("virtual_news").streaming()
+
+    with app.app_context():
+        response = scraping.fetch(url, stream=stream)
+
+    assert stream.done
+    assert len(response.content) < len(body)
+    stats = scraping.stream_stats()
+    assert stats["streamed"] == 1 and stats["stopped"] == 1
+    assert stats["bytes_read"] == len(response.content)
+    if headers:
+        assert stats["bytes_skipped"] == 0
+    else:
+        assert stats["bytes_skipped"] == len(body) - len(response.content)
+
+
+def test_ingest_article_streams_when_enabled(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/streamed", ARTICLE + FOOTER)
+
+    with app.app_context():
+        app.config["SCRAPE_STREAM_PARSE"] = True
+        try:
+            result = article_service.ingest_article(url, run_ai=False)
+        finally:
+            app.config["SCRAPE_STREAM_PARSE"] = False
+
+        assert result.status == "created"
+        assert result.article.title == "ストリーミングの記事"
+        assert result.article.body == "本文その1\n\n本文その2"
+    assert scraping.stream_stats()["stopped"] == 1
+
+
+def test_ingest_article_does_not_stream_by_default(app, local_origin):
+    url = local_origin.add_page("/virtual-news/article/full", ARTICLE + FOOTER)
+
+    with app.app_context():
+        result = article_service.ingest_article(url, run_ai=False)
+        assert result.article.title == "ストリーミングの記事"
+
+    assert scraping.stream_stats()["streamed"] == 0
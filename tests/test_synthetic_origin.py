@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+import requests
+
+from app.services import news_feed, scraping, synthetic_origin
+from app.services.virtual_news_parser import VirtualNewsParser
+
+
+@pytest.fixture
+def origin(request):
+    settings = getattr(request, "param", synthetic_origin.OriginSettings(articles=120, per_page=50))
+    server = synthetic_origin.SyntheticOriginServer(settings)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    scraping.reset_session()
+    yield server
+    server.shutdown()
+    server.server_close()
+    scraping.reset_session()
+
+
+def test_articles_are_deterministic_and_sized():
+    settings = synthetic_origin.OriginSettings(articles=5_000_000, body_bytes=4000, seed=7)
+
+    first = synthetic_origin.article(settings, 4_999_999)
+    again = synthetic_origin.article(settings, 4_999_999)
+    other_seed = synthetic_origin.article(
+        synthetic_origin.OriginSettings(articles=5_000_000, body_bytes=4000, seed=8), 4_999_999
+    )
+
+    assert first == again
+    assert first.title != other_seed.title or first.paragraphs != other_seed.paragraphs
+    assert sum(len(p.encode("utf-8")) for p in first.paragraphs) >= 4000
+
+
+def test_pages_cover_all_articles_newest_first():
+    settings = synthetic_origin.OriginSettings(articles=120, per_page=50)
+
+    pages = [list(synthetic_origin.page_ids(settings, page)) for page in (1, 2, 3, 4)]
+
+    assert pages[0][:2] == [120, 119]
+    assert [len(page) for page in pages] == [50, 50, 20, 0]
+    assert sorted(sum(pages, [])) == list(range(1, 121))
+
+
+def test_error_rate_is_applied_per_article():
+    settings = synthetic_origin.OriginSettings(articles=2000, error_rate=0.1)
+
+    errors = [synthetic_origin.is_error(settings, n) for n in range(1, 2001)]
+
+    failed = [status for status in errors if status is not None]
+    assert 120 < len(failed) < 280
+    assert set(failed) <= set(synthetic_origin.ERROR_STATUSES)
+    assert errors == [synthetic_origin.is_error(settings, n) for n in range(1, 2001)]
+
+
+def test_article_page_parses_with_virtual_news_parser(app, origin):
+    url = f"{origin.base_url}/virtual-news/article/42"
+    expected = synthetic_origin.article(origin.settings, 42)
+
+    with app.app_context():
+        response = scraping.fetch(url)
+
+    parsed = VirtualNewsParser.parse_article(response.text, url)
+    assert parsed.title == expected.title
+    assert parsed.published_at == expected.published_at.replace(tzinfo=None)
+
+    revalidated = requests.get(url, headers={"If-None-Match": response.headers["ETag"]}, timeout=5)
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "origin",
+    [synthetic_origin.OriginSettings(articles=10, error_rate=1.0, latency=0.01)],
+    indirect=True,
+)
+def test_error_articles_return_5xx(origin):
+    response = requests.get(f"{origin.base_url}/virtual-news/article/3", timeout=5)
+
+    assert response.status_code in synthetic_origin.ERROR_STATUSES
+    assert requests.get(f"{origin.base_url}/virtual-news/article/11", timeout=5).status_code == 404
+
+
+def test_news_feed_follows_synthetic_pages(app, origin):
+    with app.app_context():
+        app.config["VIRTUAL_NEWS_FEED_URLS"] = (f"{origin.base_url}/virtual-news/feed.xml",)
+        items = news_feed.fetch_latest_articles(limit=80)
+
+    assert len(items) == 80
+    assert items[0].url == f"{origin.base_url}/virtual-news/article/120"
+    assert items[-1].url == f"{origin.base_url}/virtual-news/article/41"
+    assert items[0].published_at > items[-1].published_at
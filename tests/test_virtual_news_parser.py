@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from app.services import synthetic_origin
+from app.services.virtual_news_parser import VirtualNewsParser
+
+URL = "http://localhost:5000/virtual-news/article/1"
+
+CASES = {
+    "template_markup": """
+        <html><body><article class="blog-post">
+        <h1 class="blog-post-title mb-3"> 記事<small>速報</small></h1>
+        <p class="blog-post-meta text-muted mb-4">2025年11月30日 10:00</p>
+        <div class="article-body mt-4"><p>本文</p></div>
+        </article></body></html>
+    """,
+    "article_body_class": """
+        <html><body>
+        <h1>別の見出し</h1><h1 class="blog-post-title">対象</h1>
+        <p class="blog-post-meta">日付なし</p>
+        <div class="article_body"><p>一</p><p> </p><div><p>二<!-- c --></p></div></div>
+        <div class="article_body"><p>三</p></div>
+        </body></html>
+    """,
+    "missing_everything": "<html><body><p>本文</p></body></html>",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_parse_article_matches_soup_implementation(name):
+    html = CASES[name]
+
+    assert VirtualNewsParser.parse_article(html, URL) == VirtualNewsParser.parse_article_soup(html, URL)
+
+
+def test_parse_article_reads_template_fields():
+    parsed = VirtualNewsParser.parse_article(CASES["article_body_class"], URL)
+
+    assert parsed.title == "対象"
+    assert parsed.published_at is None
+    assert parsed.body == "一\n\n二"
+
+    parsed = VirtualNewsParser.parse_article(CASES["template_markup"], URL)
+    assert parsed.title == "記事速報"
+    assert parsed.published_at == datetime(2025, 11, 30, 10, 0)
+
+
+def test_parse_article_matches_soup_on_synthetic_pages():
+    settings = synthetic_origin.OriginSettings(body_bytes=3000, seed=5)
+    for article_id in range(1, 20):
+        html = synthetic_origin.render_article(synthetic_origin.article(settings, article_id))
+        assert VirtualNewsParser.parse_article(html, URL) == VirtualNewsParser.parse_article_soup(html, URL)